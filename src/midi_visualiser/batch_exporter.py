@@ -0,0 +1,228 @@
+import os
+import json
+import time
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from .library_index import LibraryIndex
+from .song_cache import SongCache
+from .visualiser import Visualiser
+
+ExportJob = tuple[str, str, str, str | None, int, bool]
+
+class BatchExporter:
+    """
+    Class which renders every song in a library to video, with one job per song scheduled across
+    a pool of worker processes.
+
+    A manifest in the output directory records the source file and options each output was
+    rendered from, and is updated as each song finishes. Outputs are written under a temporary
+    name and only moved into place once complete, so an interrupted export can be resumed by
+    running it again, which skips every output that is already up to date.
+    """
+
+    VERSION = 1
+    """The version of the manifest format, which renders every song again when changed."""
+
+    MANIFEST_NAME = ".midi-visualiser-export.json"
+    """The name of the manifest file stored in the output directory."""
+
+    FRAME_FORMATS = ("png", "raw")
+    """The output formats which store frames directly, rather than being encoded by ffmpeg."""
+
+    def __init__(
+        self, output_directory: str, format: str = "mp4", fps: int = 60, audio: bool = False,
+        workers: int | None = None, use_cache: bool = True
+    ) -> None:
+        """
+        Initialises the exporter, which writes outputs in the given format to the output directory.
+        The format is a video file extension for ffmpeg, `png` for a directory of frames, or `raw` for raw RGB frames.
+        """
+        self.output_directory = os.path.abspath(output_directory)
+        self.format = format.lower().lstrip(".")
+        self.fps = fps
+        self.audio = audio
+        self.workers = workers or os.cpu_count() or 1
+        self.use_cache = use_cache
+
+        self.manifest_path = os.path.join(self.output_directory, self.MANIFEST_NAME)
+        self.manifest: dict[str, dict] = self._load_manifest()
+
+    @property
+    def options(self) -> dict:
+        """The options which affect the rendered outputs, stored with each output in the manifest."""
+        return {"format": self.format, "fps": self.fps, "audio": self.audio}
+
+    def _load_manifest(self) -> dict[str, dict]:
+        """Loads the outputs recorded in the manifest, or returns none if it is missing or unreadable."""
+        try:
+            with open(self.manifest_path) as f:
+                manifest = json.load(f)
+            return manifest["outputs"] if manifest.get("version") == self.VERSION else {}
+        except (OSError, ValueError, KeyError):
+            return {}
+
+    def _save_manifest(self) -> None:
+        """Writes the manifest, replacing it in a single step so it is never partially written."""
+        manifest = {"version": self.VERSION, "outputs": self.manifest}
+        fd, temp_path = tempfile.mkstemp(dir=self.output_directory, prefix=".tmp-", suffix=".json")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(manifest, f)
+            os.replace(temp_path, self.manifest_path)
+        except OSError:
+            os.remove(temp_path)
+
+    def output_path(self, song_file: str, root: str) -> str:
+        """Returns the path of the output for a song, mirroring its location relative to the library's root."""
+        name = os.path.splitext(os.path.relpath(song_file, root))[0]
+        if self.format == "png":
+            return os.path.join(self.output_directory, name)
+        return os.path.join(self.output_directory, f"{name}.{self.format}")
+
+    def _temporary_path(self, output_path: str) -> str:
+        """Returns the hidden path an output is rendered to before being moved into place, keeping its extension for ffmpeg."""
+        directory, name = os.path.split(output_path)
+        if self.format == "png":
+            return os.path.join(directory, f".{name}.partial", "")
+        return os.path.join(directory, f".{os.path.splitext(name)[0]}.partial.{self.format}")
+
+    def _audio_path(self, output_path: str) -> str | None:
+        """Returns the path of the WAV file rendered alongside an output, if audio is enabled."""
+        return f"{os.path.splitext(os.path.normpath(output_path))[0]}.wav" if self.audio else None
+
+    def _source_state(self, song_file: str) -> dict:
+        """Returns the size and modification time of a song file along with the export options."""
+        stat = os.stat(song_file)
+        return {"source": song_file, "size": stat.st_size, "modified": stat.st_mtime_ns, **self.options}
+
+    def is_up_to_date(self, song_file: str, output_path: str) -> bool:
+        """Returns whether an output exists and was rendered from the song file as it is now, with the same options."""
+        entry = self.manifest.get(os.path.relpath(output_path, self.output_directory))
+        outputs = [output_path, self._audio_path(output_path)] if self.audio else [output_path]
+        return entry == self._source_state(song_file) and all(os.path.exists(path) for path in outputs)
+
+    def export(self, path: str, library: LibraryIndex | None = None) -> dict[str, float]:
+        """Renders every song found at a path which doesn't have an up to date output, and returns throughput statistics.
+
+        Parameters
+        ----------
+        path : str
+            A MIDI file or a directory of MIDI files, as accepted by the visualiser.
+        library : LibraryIndex | None
+            The library index used to search directories recursively, if given.
+
+        Returns
+        -------
+        dict[str, float]
+            The number of songs found, skipped, exported and failed, the frames rendered, the
+            elapsed wall time, songs exported per minute, and frames rendered per second per worker.
+        """
+        if self.format not in self.FRAME_FORMATS and shutil.which("ffmpeg") is None:
+            raise RuntimeError(f"Could not find 'ffmpeg' to encode {self.format} videos; use the png or raw format instead.")
+        os.makedirs(self.output_directory, exist_ok=True)
+
+        # Plans an output for every song, skipping those already rendered from the current file
+        song_files = Visualiser.get_song_files(path, library)
+        root = path if os.path.isdir(path) else os.path.dirname(path)
+        outputs = [(song_file, self.output_path(song_file, root)) for song_file in song_files]
+        jobs = [
+            (
+                song_file, output_path, self._temporary_path(output_path),
+                self._audio_path(output_path), self.fps, self.use_cache
+            )
+            for song_file, output_path in outputs if not self.is_up_to_date(song_file, output_path)
+        ]
+        print(f"Exporting {len(jobs)} of {len(outputs)} songs, skipping {len(outputs) - len(jobs)} up to date.")
+
+        exported, failed, frames = 0, 0, 0
+        start_time = time.perf_counter()
+        try:
+            for (song_file, output_path, *_), (frame_count, elapsed, error) in self._run(jobs):
+                if error:
+                    failed += 1
+                    print(f"Failed to export '{song_file}': {error}")
+                    continue
+
+                # Records each output as soon as it is complete, so an interrupted export resumes after it
+                self.manifest[os.path.relpath(output_path, self.output_directory)] = self._source_state(song_file)
+                self._save_manifest()
+                exported += 1
+                frames += frame_count
+                print(f"[{exported + failed}/{len(jobs)}] Exported '{output_path}' ({frame_count} frames in {elapsed:.2f}s).")
+        except KeyboardInterrupt:
+            print(f"Export interrupted after {exported} songs; run it again to resume.")
+        wall_time = time.perf_counter() - start_time
+
+        workers = min(self.workers, max(1, len(jobs)))
+        return {
+            "songs": len(outputs),
+            "skipped": len(outputs) - len(jobs),
+            "exported": exported,
+            "failed": failed,
+            "frames": frames,
+            "elapsed": wall_time,
+            "songs_per_minute": exported / wall_time * 60 if wall_time else 0.0,
+            "fps_per_worker": frames / wall_time / workers if wall_time else 0.0,
+        }
+
+    def _run(self, jobs: list[ExportJob]):
+        """Yields each job along with its result as it finishes, using a pool of worker processes if there are several."""
+        if len(jobs) < 2 or self.workers < 2:
+            for job in jobs:
+                yield job, BatchExporter._export_song(job)
+            return
+
+        # Sends songs to the workers one at a time, since each takes far longer than scheduling it
+        executor = ProcessPoolExecutor(max_workers=min(self.workers, len(jobs)))
+        futures = {executor.submit(BatchExporter._export_song, job): job for job in jobs}
+        finished = set()
+        try:
+            for future in as_completed(futures):
+                finished.add(future)
+                yield futures[future], future.result()
+        except KeyboardInterrupt:
+            # Waits for the songs already being rendered, so those which complete are still recorded
+            executor.shutdown(wait=True, cancel_futures=True)
+            for future, job in futures.items():
+                if future not in finished and future.done() and not future.cancelled() and future.exception() is None:
+                    yield job, future.result()
+            raise
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    @staticmethod
+    def _export_song(job: ExportJob) -> tuple[int, float, str | None]:
+        """Renders a song to temporary outputs and moves them into place, returning its frame count, time and any error."""
+        song_file, output_path, temp_path, audio_path, fps, use_cache = job
+        temp_audio_path = f"{os.path.splitext(os.path.normpath(temp_path))[0]}.wav" if audio_path else None
+
+        # Imported here so the SDL video driver is only overridden in the processes that render
+        from .video_renderer import VideoRenderer
+
+        try:
+            # Discards any partial output left by an interrupted export
+            BatchExporter._remove(temp_path)
+            os.makedirs(os.path.dirname(os.path.normpath(temp_path)), exist_ok=True)
+            renderer = VideoRenderer(fps=fps, cache=SongCache() if use_cache else None)
+            stats = renderer.render(song_file, temp_path, temp_audio_path)
+
+            # Replaces any previous output only once the new one is complete
+            BatchExporter._remove(output_path)
+            os.replace(os.path.normpath(temp_path), output_path)
+            if audio_path:
+                os.replace(temp_audio_path, audio_path)
+            return stats["frames"], stats["elapsed"], None
+        except Exception as e:
+            BatchExporter._remove(temp_path)
+            if temp_audio_path:
+                BatchExporter._remove(temp_audio_path)
+            return 0, 0.0, str(e) or type(e).__name__
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        """Removes a file or a directory of frames, if it exists."""
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        elif os.path.exists(path):
+            os.remove(path)
@@ -0,0 +1,29 @@
+import mido
+
+class CapturedOutput(mido.ports.BaseOutput):
+    """
+    Mido output port which keeps the bytes of every message sent to it, either instead of playing
+    them or while also forwarding them to another port.
+    """
+
+    def __init__(self, port: mido.ports.BaseOutput | None = None) -> None:
+        """Initialises the port with no messages captured, forwarding messages to the given port if there is one."""
+        super().__init__("captured")
+        self.port = port
+        self.messages: list[list[int]] = []
+
+    def _send(self, message: mido.Message) -> None:
+        """Captures the bytes of a message, and forwards it."""
+        self.messages.append(message.bytes())
+        if self.port is not None:
+            self.port.send(message)
+
+    def _close(self) -> None:
+        """Closes the port messages are forwarded to."""
+        if self.port is not None:
+            self.port.close()
+
+    def take(self) -> list[list[int]]:
+        """Returns every message captured since this was last called."""
+        messages, self.messages = self.messages, []
+        return messages
@@ -0,0 +1,160 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+from dataclasses import asdict
+from collections.abc import Callable
+import numpy as np
+import mido
+import pygame
+from pygame._sdl2.video import Window, Renderer
+from ..song import Song
+from ..midi_file_parser import MidiFileParser
+from ..piano_display import PianoDisplay
+from ..piano_display_settings import PianoDisplaySettings
+from ..texture_display import TextureDisplay
+from .synthetic_midi import SyntheticMidiConfig, generate_synthetic_midi
+
+def time_calls(function: Callable[[], object], repeats: int) -> dict[str, float]:
+    """Calls a function repeatedly and returns statistics on its run time in milliseconds."""
+    durations = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return summarise(durations)
+
+def summarise(durations: list[float]) -> dict[str, float]:
+    """Returns statistics in milliseconds for a list of durations in seconds."""
+    values = np.array(durations) * 1000
+    return {
+        "count": len(values),
+        "mean": float(values.mean()),
+        "p50": float(np.percentile(values, 50)),
+        "p95": float(np.percentile(values, 95)),
+        "min": float(values.min()),
+        "max": float(values.max()),
+    }
+
+class Benchmark:
+    """Class which times each stage of loading and playing a MIDI file without a display."""
+
+    def __init__(self, midi_path: str, repeats: int = 3, frames: int = 600, fps: int = 60) -> None:
+        """Initialises the benchmark for the given MIDI file."""
+        self.midi_path = midi_path
+        self.repeats = repeats
+        self.frames = frames
+        self.fps = fps
+
+    def run(self) -> dict[str, dict[str, float]]:
+        """Runs all benchmark stages and returns their timing statistics."""
+        results = {}
+        results["mido_parse"] = time_calls(lambda: list(mido.MidiFile(self.midi_path, clip=True)), self.repeats)
+        results["file_parse"] = time_calls(lambda: MidiFileParser(self.midi_path).parse(), self.repeats)
+
+        settings = PianoDisplaySettings()
+        clock_time = [0.0]
+        song = Song(self.midi_path, mido.ports.BaseOutput(), settings, clock=lambda: clock_time[0])
+        results["song_initialise"] = time_calls(lambda: song._initialise_song_data(self.midi_path, None), self.repeats)
+
+        display = PianoDisplay(settings)
+        win = pygame.display.set_mode((display.width, display.height))
+
+        # Draws the same frames with the texture renderer backend, using SDL's software renderer so no GPU is needed
+        window = Window("Benchmark", size=(int(display.width), int(display.height)), hidden=True)
+        texture_display = TextureDisplay(PianoDisplay(settings), Renderer(window, accelerated=0))
+
+        # Times updates and draws from when the first notes reach the piano, on a simulated clock
+        update_times, draw_times, texture_draw_times, texture_present_times = [], [], [], []
+        song.seek(min(song.buffer_time, song.duration))
+        song.start()
+        for _ in range(self.frames):
+            clock_time[0] += 1 / self.fps
+            start = time.perf_counter()
+            song.update()
+            updated = time.perf_counter()
+            display.draw(win, song)
+            drawn = time.perf_counter()
+            texture_display.draw(song)
+            texture_drawn = time.perf_counter()
+            texture_display.present()
+            texture_presented = time.perf_counter()
+            update_times.append(updated - start)
+            draw_times.append(drawn - updated)
+            texture_draw_times.append(texture_drawn - drawn)
+            texture_present_times.append(texture_presented - texture_drawn)
+            if not song.playing:
+                song.start()
+        results["song_update"] = summarise(update_times)
+        results["display_draw"] = summarise(draw_times)
+        results["texture_draw"] = summarise(texture_draw_times)
+        results["texture_present"] = summarise(texture_present_times)
+        return results
+
+def compare(results: dict, baseline: dict) -> None:
+    """Prints the ratio of each mean time against a previous run."""
+    for name, stats in results.items():
+        if name in baseline:
+            ratio = stats["mean"] / baseline[name]["mean"] if baseline[name]["mean"] else float("inf")
+            print(f"  {name:<18} {baseline[name]['mean']:10.3f}ms -> {stats['mean']:10.3f}ms ({ratio:.2f}x)")
+
+def main():
+    """Parses command line arguments, runs the benchmark and writes the results as JSON."""
+    parser = argparse.ArgumentParser(description="Benchmarks loading, updating and drawing songs without a display.")
+    parser.add_argument("--midi", help="Benchmark an existing MIDI file instead of a synthetic one.")
+    parser.add_argument("--notes", type=int, default=SyntheticMidiConfig.note_count, help="Number of synthetic notes.")
+    parser.add_argument("--polyphony", type=int, default=SyntheticMidiConfig.polyphony, help="Notes started together in each chord.")
+    parser.add_argument("--channels", type=int, default=SyntheticMidiConfig.channels, help="Number of MIDI channels.")
+    parser.add_argument(
+        "--tempo-changes", type=float, default=SyntheticMidiConfig.tempo_changes_per_beat,
+        help="Tempo changes per beat."
+    )
+    parser.add_argument("--repeats", type=int, default=3, help="Number of times each load stage is repeated.")
+    parser.add_argument("--frames", type=int, default=600, help="Number of frames to update and draw.")
+    parser.add_argument("--output", default="benchmark.json", help="Path to write the JSON results to.")
+    parser.add_argument("--compare", help="Path to previous JSON results to compare against.")
+    args = parser.parse_args()
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+
+    config = SyntheticMidiConfig(
+        note_count=args.notes, polyphony=args.polyphony,
+        channels=args.channels, tempo_changes_per_beat=args.tempo_changes
+    )
+    with tempfile.TemporaryDirectory() as temp_dir:
+        midi_path = args.midi
+        if midi_path is None:
+            midi_path = os.path.join(temp_dir, "synthetic.mid")
+            generate_synthetic_midi(midi_path, config)
+
+        results = Benchmark(midi_path, args.repeats, args.frames).run()
+
+    report = {
+        "input": args.midi or asdict(config),
+        "environment": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "pygame": pygame.version.ver,
+            "mido": str(mido.version_info),
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for name, stats in results.items():
+        print(f"  {name:<18} mean {stats['mean']:10.3f}ms  p95 {stats['p95']:10.3f}ms")
+    print(f"Results written to '{args.output}'.")
+
+    if args.compare:
+        with open(args.compare) as f:
+            print(f"Compared with '{args.compare}':")
+            compare(results, json.load(f)["results"])
+
+if __name__ == "__main__":
+    main()
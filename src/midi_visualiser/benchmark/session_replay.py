@@ -0,0 +1,154 @@
+import os
+import sys
+import json
+import time
+import argparse
+import pygame
+from ..clock import SimulatedClock
+from ..library_index import LibraryIndex
+from ..session_recorder import SessionRecorder
+from ..visualiser import Visualiser
+from .captured_output import CapturedOutput
+from .runner import summarise
+
+class SessionReplay:
+    """
+    Class which re-runs a recorded visualiser session without a display, as fast as possible.
+
+    Every frame is run with the clock set to the time it was recorded at, with the same events,
+    song loads and rendering. Songs send their messages when updated rather than from a scheduler
+    thread, as they did while the session was recorded, so a replay's output depends only on the
+    recording. The MIDI messages sent and the keys pressed in each frame are hashed and checked
+    against the hashes recorded from the session, and the CPU time of each frame is measured.
+    """
+
+    def __init__(self, session_path: str) -> None:
+        """Loads the recorded session at the given path."""
+        self.session_path = session_path
+        with open(session_path) as f:
+            self.session = json.load(f)
+        if self.session.get("version") != SessionRecorder.VERSION:
+            raise ValueError(f"Unsupported session version: {self.session.get('version')}")
+
+    @property
+    def reference(self) -> list[str]:
+        """The hashes of each frame's output, as recorded from the session or stored by `save_reference`."""
+        return [frame[4] for frame in self.session["frames"]]
+
+    def run(self) -> dict:
+        """Replays every frame of the session and returns its output hashes and timing statistics.
+
+        Returns
+        -------
+        dict
+            The hash of each frame's output, the number of messages sent, the elapsed wall time,
+            the speed relative to the recorded session, the CPU time of each frame, and the
+            percentiles of each phase of the frame.
+        """
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        pygame.init()
+
+        frames = self.session["frames"]
+        clock = SimulatedClock(frames[0][0] if frames else 0.0)
+        output = CapturedOutput()
+        visualiser = Visualiser(
+            self.session["path"], streaming=self.session["streaming"],
+            library=LibraryIndex() if self.session["library"] else None,
+            clock=clock, output=output, threaded_output=False
+        )
+        if visualiser.song_files != self.session["song_files"]:
+            visualiser._cleanup()
+            raise RuntimeError("The songs found have changed since the session was recorded")
+
+        hashes, cpu_times, message_count = [], [], 0
+        start_time = time.perf_counter()
+        try:
+            for frame_time, events, song_loaded, rendered, _ in frames:
+                clock.time = frame_time
+                frame_events = [
+                    pygame.event.Event(event_type, key=key) if key is not None else pygame.event.Event(event_type)
+                    for event_type, key in events
+                ]
+
+                frame_start = time.thread_time()
+                visualiser.run_frame(frame_events, song_loaded, rendered)
+                cpu_times.append(time.thread_time() - frame_start)
+
+                messages = output.take()
+                message_count += len(messages)
+                hashes.append(SessionRecorder.hash_frame(messages, visualiser.song.notes_pressed if visualiser.song else {}))
+        finally:
+            elapsed = time.perf_counter() - start_time
+            phases = visualiser.stats.phase_percentiles()
+            visualiser._cleanup()
+
+        session_time = frames[-1][0] - frames[0][0] if frames else 0.0
+        return {
+            "frames": len(frames),
+            "messages": message_count,
+            "elapsed": elapsed,
+            "realtime_factor": session_time / elapsed if elapsed else 0.0,
+            "frame_cpu": summarise(cpu_times) if cpu_times else {},
+            "phases": {phase: list(percentiles) for phase, percentiles in phases.items()},
+            "hashes": hashes,
+        }
+
+    def first_mismatch(self, hashes: list[str]) -> int | None:
+        """Returns the index of the first frame whose output differs from the reference, or None if they all match."""
+        for i, (expected, actual) in enumerate(zip(self.reference, hashes)):
+            if expected != actual:
+                return i
+        return None if len(self.reference) == len(hashes) else min(len(self.reference), len(hashes))
+
+    def save_reference(self, hashes: list[str]) -> None:
+        """Stores the given frame hashes in the session file in place of the recorded output, for later replays."""
+        for frame, frame_hash in zip(self.session["frames"], hashes):
+            frame[4] = frame_hash
+        with open(self.session_path, "w") as f:
+            json.dump(self.session, f)
+
+def main():
+    """Parses command line arguments, replays a recorded session and checks its output against the reference."""
+    parser = argparse.ArgumentParser(description="Replays a recorded visualiser session without a display, as fast as possible.")
+    parser.add_argument("session", help="Path to a session recorded with `midi-visualiser --record`.")
+    parser.add_argument(
+        "--update-reference", action="store_true",
+        help="Replaces the recorded output with this replay's, after a change that is meant to alter it, instead of checking against it."
+    )
+    parser.add_argument("--output", help="Path to write the timing results to as JSON.")
+    args = parser.parse_args()
+
+    replay = SessionReplay(args.session)
+    results = replay.run()
+    hashes = results.pop("hashes")
+
+    print(
+        f"Replayed {results['frames']} frames in {results['elapsed']:.2f}s "
+        f"({results['realtime_factor']:.1f}x real time), sending {results['messages']} MIDI messages."
+    )
+    if results["frame_cpu"]:
+        cpu = results["frame_cpu"]
+        print(f"  frame cpu  mean {cpu['mean']:.3f}ms  p50 {cpu['p50']:.3f}ms  p95 {cpu['p95']:.3f}ms  max {cpu['max']:.3f}ms")
+    for phase, (p50, p95, p99) in results["phases"].items():
+        print(f"  {phase:<10} p50 {p50:.3f}ms  p95 {p95:.3f}ms  p99 {p99:.3f}ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to '{args.output}'.")
+
+    # Checks the output against the recorded session, unless it is being replaced
+    if args.update_reference:
+        replay.save_reference(hashes)
+        print(f"Reference output stored in '{args.session}'.")
+        return
+
+    mismatch = replay.first_mismatch(hashes)
+    if mismatch is None:
+        print("Sent MIDI and key states match the recorded session.")
+    else:
+        print(f"Sent MIDI or key states differ from the recorded session, starting at frame {mismatch}.")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import random
+import mido
+from dataclasses import dataclass
+
+@dataclass
+class SyntheticMidiConfig:
+    """Data class storing the parameters used to generate a synthetic MIDI file."""
+
+    note_count: int = 100_000
+    """The total number of notes in the file."""
+
+    polyphony: int = 16
+    """The number of notes started together in each chord."""
+
+    channels: int = 8
+    """The number of MIDI channels, each written to its own track."""
+
+    tempo_changes_per_beat: float = 0.25
+    """The number of tempo changes per beat, spread evenly through the file."""
+
+    notes_per_second: float = 400.0
+    """The approximate number of notes started per second at the initial tempo."""
+
+    ticks_per_beat: int = 480
+    """The file's resolution in ticks per beat."""
+
+    seed: int = 0
+    """The seed for the random number generator, so files are reproducible."""
+
+def generate_synthetic_midi(path: str, config: SyntheticMidiConfig) -> None:
+    """Writes a synthetic MIDI file of dense, overlapping chords to the given path.
+
+    Parameters
+    ----------
+    path : str
+        The path to write the MIDI file to.
+    config : SyntheticMidiConfig
+        The parameters describing the size and density of the file.
+    """
+    rng = random.Random(config.seed)
+    tempo = 500000
+    chords_per_beat = config.notes_per_second / config.polyphony * tempo / 1e6
+    chord_ticks = max(1, round(config.ticks_per_beat / chords_per_beat))
+
+    # Collects absolute (tick, message) events for each channel's track
+    events: list[list[tuple[int, mido.Message]]] = [[] for _ in range(config.channels)]
+    for i in range(config.note_count):
+        chord, voice = divmod(i, config.polyphony)
+        channel = voice % config.channels
+        note = rng.randrange(21, 109)
+        start = chord * chord_ticks
+        length = chord_ticks * rng.randint(1, 4)
+        events[channel].append((start, mido.Message('note_on', channel=channel, note=note, velocity=rng.randint(40, 127))))
+        events[channel].append((start + length, mido.Message('note_off', channel=channel, note=note, velocity=0)))
+
+    midi_file = mido.MidiFile(ticks_per_beat=config.ticks_per_beat)
+
+    # Writes tempo changes to a separate conductor track
+    end_tick = max((tick for track in events for tick, _ in track), default=0)
+    tempo_events = []
+    if config.tempo_changes_per_beat > 0:
+        interval = max(1, round(config.ticks_per_beat / config.tempo_changes_per_beat))
+        for tick in range(0, end_tick, interval):
+            tempo_events.append((tick, mido.MetaMessage('set_tempo', tempo=rng.randint(250000, 1000000))))
+    events.insert(0, tempo_events)
+
+    # Converts each track to delta times
+    for track_events in events:
+        track = mido.MidiTrack()
+        last_tick = 0
+        for tick, msg in sorted(track_events, key=lambda event: event[0]):
+            track.append(msg.copy(time=tick - last_tick))
+            last_tick = tick
+        midi_file.tracks.append(track)
+
+    midi_file.save(path)
@@ -0,0 +1,40 @@
+from collections.abc import Callable
+
+Clock = Callable[[], float]
+"""A clock is any function returning the current time in seconds, such as `time.perf_counter`.
+Only differences between times are used, so a clock can start from any value."""
+
+class SimulatedClock:
+    """A clock that only advances when told to, for running songs faster than real time or replaying them exactly."""
+
+    def __init__(self, time: float = 0.0) -> None:
+        """Initialises the clock at the given time."""
+        self.time = time
+
+    def __call__(self) -> float:
+        """Returns the current simulated time in seconds."""
+        return self.time
+
+    def tick(self, delta_time: float) -> None:
+        """Advances the simulated time by the given number of seconds."""
+        self.time += delta_time
+
+class FrameClock:
+    """
+    A clock that holds the time read from another clock at the start of each frame, so everything
+    within a frame sees the same time, as it does when a session is replayed on a simulated clock.
+    """
+
+    def __init__(self, clock: Clock) -> None:
+        """Initialises the clock, reading the time from the given clock."""
+        self.clock = clock
+        self.time = clock()
+
+    def __call__(self) -> float:
+        """Returns the time at the start of the current frame, in seconds."""
+        return self.time
+
+    def start_frame(self) -> float:
+        """Reads the time from the underlying clock for a new frame, and returns it."""
+        self.time = self.clock()
+        return self.time
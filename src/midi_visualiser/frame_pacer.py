@@ -0,0 +1,59 @@
+import time
+from collections.abc import Callable
+
+class FramePacer:
+    """
+    Class which paces the main loop to a target frame rate on a fixed schedule. When frames run
+    long, the rendering of the following frames is skipped until the loop has caught up with
+    the schedule, so song time keeps advancing without every later frame being late.
+    """
+
+    MAX_SKIPPED_FRAMES = 3
+    """The maximum number of consecutive frames whose rendering can be skipped, so the
+    window is still updated under sustained load."""
+
+    def __init__(
+        self, target_fps: float = 60, sleep: bool = True, frame_skipping: bool = True,
+        clock: Callable[[], float] = time.perf_counter
+    ) -> None:
+        """
+        Initialises the pacer for the given target frame rate, where a rate of zero leaves the loop uncapped.
+        If `sleep` is False the pacer never waits, for when presenting a frame already waits for the display.
+        """
+        self.target_fps = target_fps
+        self.sleep = sleep
+        self.frame_skipping = frame_skipping
+        self.clock = clock
+
+        self._next_frame: float | None = None
+        self._skipped_in_row = 0
+
+    @property
+    def frame_time(self) -> float:
+        """The target time in seconds between frames, or zero if the loop is uncapped."""
+        return 1 / self.target_fps if self.target_fps > 0 else 0.0
+
+    def should_render(self) -> bool:
+        """Returns whether the current frame should be rendered, or skipped as the loop is more than a frame behind schedule."""
+        if not self.frame_skipping or self.frame_time == 0 or self._next_frame is None:
+            return True
+        if self.clock() - self._next_frame > self.frame_time and self._skipped_in_row < self.MAX_SKIPPED_FRAMES:
+            self._skipped_in_row += 1
+            return False
+        self._skipped_in_row = 0
+        return True
+
+    def wait(self) -> None:
+        """Ends the current frame, waiting until the next frame is due if the loop is ahead of schedule."""
+        now = self.clock()
+        if self.frame_time == 0:
+            return
+
+        # Restarts the schedule after stalls too long to catch up with, or if the display runs faster than the target
+        drift = now - self._next_frame if self._next_frame is not None else 0.0
+        if self._next_frame is None or drift > self.frame_time * (self.MAX_SKIPPED_FRAMES + 1) or drift < -self.frame_time:
+            self._next_frame = now
+        self._next_frame += self.frame_time
+
+        if self.sleep and self._next_frame > now:
+            time.sleep(self._next_frame - now)
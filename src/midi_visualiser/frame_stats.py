@@ -0,0 +1,109 @@
+import json
+import time
+import numpy as np
+from collections import deque
+
+class FrameStats:
+    """
+    Class which records how long each phase of every frame takes, along with per-frame
+    counters, keeping a rolling window for live statistics and optionally a full trace.
+    """
+
+    def __init__(self, target_fps: float = 60, window: int = 600, trace: bool = False) -> None:
+        """
+        Initialises the recorder for the given target frame rate and rolling window size in frames.
+        A target frame rate of zero means the frame rate is uncapped, so no frames are counted as dropped.
+        """
+        self.target_fps = target_fps
+        self.trace = trace
+
+        self.frame_count = 0
+        self.dropped_frames = 0
+        """The number of frames which took more than one and a half times the target frame time."""
+
+        self.skipped_frames = 0
+        """The number of frames whose rendering was skipped to catch up with the target frame rate."""
+
+        self._phases: dict[str, deque[float]] = {}
+        self._counters: dict[str, deque[float]] = {}
+        self._frame_times: deque[float] = deque(maxlen=window)
+        self._frames_skipped: deque[bool] = deque(maxlen=window)
+        self._frame_skipped = False
+        self._window = window
+
+        self._trace_events: list[tuple[str, str, float, float]] = []
+        self._frame_start: float | None = None
+        self._mark_time = 0.0
+
+    def start_frame(self) -> None:
+        """Marks the start of a new frame."""
+        now = time.perf_counter()
+        if self._frame_start is not None:
+            frame_time = now - self._frame_start
+            self._frame_times.append(frame_time)
+            self._frames_skipped.append(self._frame_skipped)
+            if self.target_fps > 0 and frame_time > 1.5 / self.target_fps:
+                self.dropped_frames += 1
+        self._frame_skipped = False
+        self.frame_count += 1
+        self._frame_start = now
+        self._mark_time = now
+
+    def skip_frame(self) -> None:
+        """Records that the rendering of the current frame was skipped."""
+        self.skipped_frames += 1
+        self._frame_skipped = True
+        if self.trace:
+            self._trace_events.append(("C", "skipped_frames", self._mark_time, self.skipped_frames))
+
+    def mark(self, phase: str) -> None:
+        """Records the time since the previous mark, or the start of the frame, as the given phase."""
+        now = time.perf_counter()
+        duration = now - self._mark_time
+        self._phases.setdefault(phase, deque(maxlen=self._window)).append(duration)
+        if self.trace:
+            self._trace_events.append(("X", phase, self._mark_time, duration))
+        self._mark_time = now
+
+    def count(self, counter: str, value: float) -> None:
+        """Records the value of a counter for the current frame."""
+        self._counters.setdefault(counter, deque(maxlen=self._window)).append(value)
+        if self.trace:
+            self._trace_events.append(("C", counter, self._mark_time, value))
+
+    def phase_percentiles(self, percentiles: tuple[int, ...] = (50, 95, 99)) -> dict[str, list[float]]:
+        """Returns the given percentiles of each phase's duration in milliseconds over the rolling window."""
+        return {
+            phase: np.percentile(np.array(durations) * 1000, percentiles).tolist()
+            for phase, durations in self._phases.items() if durations
+        }
+
+    @property
+    def fps(self) -> float:
+        """The average frame rate over the rolling window."""
+        return len(self._frame_times) / sum(self._frame_times) if self._frame_times else 0.0
+
+    @property
+    def rendered_fps(self) -> float:
+        """The average rate of frames which were rendered over the rolling window, excluding skipped frames."""
+        if not self._frame_times:
+            return 0.0
+        return (len(self._frames_skipped) - sum(self._frames_skipped)) / sum(self._frame_times)
+
+    def latest(self, counter: str) -> float:
+        """Returns the most recent value of a counter, or zero if it hasn't been recorded."""
+        values = self._counters.get(counter)
+        return values[-1] if values else 0
+
+    def write_trace(self, path: str) -> None:
+        """Writes all recorded phases and counters as a Chrome trace event file, viewable in Perfetto."""
+        events = []
+        for event_type, name, start, value in self._trace_events:
+            event = {"name": name, "ph": event_type, "ts": start * 1e6, "pid": 0, "tid": 0}
+            if event_type == "X":
+                event["dur"] = value * 1e6
+            else:
+                event["args"] = {"value": value}
+            events.append(event)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
@@ -0,0 +1,107 @@
+import os
+import json
+import tempfile
+from dataclasses import asdict
+from concurrent.futures import ProcessPoolExecutor
+from .song_cache import default_cache_directory
+from .song_metadata import SongMetadata
+
+class LibraryIndex:
+    """
+    Class managing a small on-disk catalogue of metadata for every MIDI file in a library.
+    Files are indexed in parallel by a pool of worker processes, and only files which are new
+    or whose size or modification time has changed are indexed again on later scans.
+    """
+
+    VERSION = 1
+    """The version of the catalogue format, which discards old catalogues when changed."""
+
+    def __init__(self, path: str | None = None, workers: int | None = None) -> None:
+        """Initialises the index from the catalogue at the given path, if it exists."""
+        self.path = path or os.path.join(default_cache_directory(), "library.json")
+        self.workers = workers or os.cpu_count() or 1
+        self.metadata: dict[str, SongMetadata] = self._load()
+
+    def _load(self) -> dict[str, SongMetadata]:
+        """Loads the metadata stored in the catalogue, or returns no metadata if it is missing or unreadable."""
+        try:
+            with open(self.path) as f:
+                catalogue = json.load(f)
+            if catalogue.get("version") != self.VERSION:
+                return {}
+            return {path: SongMetadata(**entry) for path, entry in catalogue["files"].items()}
+        except (OSError, ValueError, TypeError, KeyError):
+            return {}
+
+    def save(self) -> None:
+        """Writes the metadata to the catalogue, replacing it in a single step so it is never partially written."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        catalogue = {"version": self.VERSION, "files": {path: asdict(entry) for path, entry in self.metadata.items()}}
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), prefix=".tmp-", suffix=".json")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(catalogue, f)
+            os.replace(temp_path, self.path)
+        except OSError:
+            os.remove(temp_path)
+
+    def clear(self) -> None:
+        """Forgets all indexed files, so every file is indexed again on the next scan."""
+        self.metadata = {}
+
+    def scan(self, root: str) -> list[str]:
+        """Finds every MIDI file under a directory, indexing any that are new or have changed.
+
+        Parameters
+        ----------
+        root : str
+            The directory to search, including all of its subdirectories.
+
+        Returns
+        -------
+        list[str]
+            The absolute paths of all MIDI files found, sorted by their path relative to the directory.
+        """
+        root = os.path.abspath(root)
+        files = self._find_files(root)
+
+        # Indexes files that haven't been seen before or have changed since they were indexed
+        stale = [
+            path for path, (size, modified) in files.items()
+            if (entry := self.metadata.get(path)) is None or entry.size != size or entry.modified != modified
+        ]
+        for path, metadata in zip(stale, self._index(stale)):
+            self.metadata[path] = metadata
+
+        # Forgets files that have been removed from the directory
+        removed = [path for path in self.metadata if path.startswith(os.path.join(root, "")) and path not in files]
+        for path in removed:
+            del self.metadata[path]
+
+        if stale or removed:
+            self.save()
+        return sorted(files, key=lambda path: os.path.relpath(path, root).lower())
+
+    def _find_files(self, root: str) -> dict[str, tuple[int, int]]:
+        """Returns the size and modification time of every MIDI file under a directory, keyed by absolute path."""
+        files = {}
+        for directory, _, file_names in os.walk(root):
+            for file_name in file_names:
+                if file_name.lower().endswith(".mid"):
+                    path = os.path.join(directory, file_name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    files[path] = (stat.st_size, stat.st_mtime_ns)
+        return files
+
+    def _index(self, paths: list[str]) -> list[SongMetadata]:
+        """Reads the metadata of the given files, using a pool of worker processes if there are several."""
+        if len(paths) < 2 or self.workers < 2:
+            return [SongMetadata.from_file(path) for path in paths]
+
+        # Sends files to the workers in batches, so the overhead of each task is small compared to reading files
+        workers = min(self.workers, len(paths))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(SongMetadata.from_file, paths, chunksize=max(1, len(paths) // (workers * 4))))
@@ -0,0 +1,178 @@
+import math
+import time
+import mido
+import numpy as np
+from collections import deque
+from .midi_event_buffer import MidiEventBuffer
+from .note_table import NOTE_DTYPE
+from .piano_display_settings import PianoDisplaySettings
+from .clock import Clock
+
+class LiveInput:
+    """
+    Class representing notes played live on a MIDI input, which can be drawn in place of a song.
+
+    Note messages are passed to `receive` on the input's thread and stored in a ring buffer,
+    then read in a single batch every frame. Notes appear at the piano when pressed and scroll
+    upwards, so the display shows the most recent `note_time` seconds of the performance.
+
+    To reuse the song drawing code, times are flipped: the display time decreases as real time
+    passes, and each note's start and end are swapped and negated, so newer notes are lower.
+    """
+
+    is_live = True
+    """Whether notes are being played live, rather than read from a file."""
+
+    def __init__(
+        self, display_settings: PianoDisplaySettings, clock: Clock = time.perf_counter,
+        buffer_capacity: int = MidiEventBuffer.DEFAULT_CAPACITY, max_samples: int = 10000
+    ) -> None:
+        """Initialises the live input with no notes played."""
+        self.display_settings = display_settings
+        self.clock = clock
+        self.buffer = MidiEventBuffer(buffer_capacity)
+        self.start_time = clock()
+
+        self.playing = True
+        self.note_table = self
+        self.loaded_until = -math.inf
+        """Notes can change anywhere on screen, so piano roll tiles are never cached."""
+
+        self.analytics = None
+        """Performances can't be analysed ahead of time, unlike songs."""
+
+        self._latencies: deque[float] = deque(maxlen=max_samples)
+        self._unpresented: list[np.ndarray] = []
+        self.reset()
+
+    def reset(self) -> None:
+        """Clears all notes that have been played."""
+        self.time = self.display_settings.note_time
+        self.notes_pressed: dict[int, tuple[int, bool]] = {}
+
+        # Notes in real time since the start, where held notes have no end yet
+        self._finished_notes = np.empty(0, dtype=NOTE_DTYPE)
+        self._held_notes = np.empty(0, dtype=NOTE_DTYPE)
+        self._display_notes = np.empty(0, dtype=NOTE_DTYPE)
+
+    @property
+    def dropped_events(self) -> int:
+        """The number of events which arrived too quickly to be read before being overwritten."""
+        return self.buffer.dropped_events
+
+    def receive(self, message: mido.Message) -> None:
+        """Stores a received message to be processed on the next update, ignoring messages other than notes."""
+        if message.type == "note_on":
+            self.buffer.push(self.clock(), 0x90 | message.channel, message.note, message.velocity)
+        elif message.type == "note_off":
+            self.buffer.push(self.clock(), 0x80 | message.channel, message.note, message.velocity)
+
+    def update(self) -> None:
+        """Processes all notes received since the last update and moves the display to the current time."""
+        now = self.clock() - self.start_time
+        events = self.buffer.read()
+        if len(events):
+            self._unpresented.append(events["time"])
+            self._apply_events(events)
+
+        # Discards notes that have scrolled past the top of the screen, along with the tile beyond it
+        cutoff = now - self.display_settings.note_time - self.display_settings.tile_seconds
+        self._finished_notes = self._finished_notes[self._finished_notes["end"] >= cutoff]
+
+        # Flips the notes into display time, with held notes extending down to the piano
+        held_notes = self._held_notes.copy()
+        held_notes["end"] = now
+        notes = np.concatenate((self._finished_notes, held_notes))
+        display_notes = np.empty(len(notes), dtype=NOTE_DTYPE)
+        display_notes["key"] = notes["key"]
+        display_notes["channel"] = notes["channel"]
+        display_notes["start"] = -notes["end"]
+        display_notes["end"] = -notes["start"]
+        display_notes["length"] = display_notes["end"] - display_notes["start"]
+        self._display_notes = display_notes
+
+        self.time = self.display_settings.note_time - now
+
+    def _apply_events(self, events: np.ndarray) -> None:
+        """Pairs received note on and off messages into notes, in bulk, and updates the key states."""
+        # Treats each held note as a note on message preceding the new events
+        held = self._held_notes
+        notes = np.concatenate((held["key"] + 21, events["data1"].astype(np.int16)))
+        channels = np.concatenate((held["channel"], (events["status"] & 0x0F).astype(np.int8)))
+        times = np.concatenate((held["start"], events["time"] - self.start_time))
+        starting = np.concatenate((
+            np.ones(len(held), dtype=bool),
+            ((events["status"] & 0xF0) == 0x90) & (events["data2"] > 0)
+        ))
+
+        # Groups the messages by note in the order they arrived, where each note ends at the next message for it
+        order = np.argsort(notes, kind='stable')
+        closed = np.zeros(len(order), dtype=bool)
+        closed[:-1] = notes[order[1:]] == notes[order[:-1]]
+        end_times = np.append(times[order[1:]], 0.0)
+
+        finished = order[starting[order] & closed]
+        finished_notes = np.empty(len(finished), dtype=NOTE_DTYPE)
+        finished_notes["key"] = notes[finished] - 21
+        finished_notes["channel"] = channels[finished]
+        finished_notes["start"] = times[finished]
+        finished_notes["end"] = end_times[(starting[order] & closed)]
+        finished_notes["length"] = finished_notes["end"] - finished_notes["start"]
+        self._finished_notes = np.concatenate((self._finished_notes, finished_notes))
+
+        still_held = np.sort(order[starting[order] & ~closed])
+        held_notes = np.zeros(len(still_held), dtype=NOTE_DTYPE)
+        held_notes["key"] = notes[still_held] - 21
+        held_notes["channel"] = channels[still_held]
+        held_notes["start"] = times[still_held]
+        self._held_notes = held_notes
+
+        # The last message for each note decides whether its key is pressed
+        last = order[~closed]
+        for note, channel, pressed in zip(notes[last].tolist(), channels[last].tolist(), starting[last].tolist()):
+            self.notes_pressed[note] = (channel, pressed)
+
+    def visible(self, time: float, note_time: float) -> np.ndarray:
+        """Returns all notes which are on screen at the given display time.
+
+        Parameters
+        ----------
+        time : float
+            The display time in seconds.
+        note_time : float
+            The time in seconds for a note to scroll through the display.
+
+        Returns
+        -------
+        np.ndarray
+            The visible notes in display time.
+        """
+        notes = self._display_notes
+        return notes[(notes["start"] <= time) & (notes["end"] >= time - note_time)]
+
+    def visible_note_count(self) -> int:
+        """Returns the number of notes currently on screen."""
+        if not self.display_settings.scrolling_notes:
+            return 0
+        return len(self.visible(self.time, self.display_settings.note_time))
+
+    def frame_presented(self) -> None:
+        """Records the latency of every note received since the last frame was presented, which it was the first to show."""
+        if not self._unpresented:
+            return
+        latencies = self.clock() - np.concatenate(self._unpresented)
+        self._latencies.extend(latencies.tolist())
+        self._unpresented = []
+
+    def latency_stats(self) -> dict[str, float]:
+        """Returns statistics in milliseconds on the time from notes being received to the frame showing them being presented."""
+        if not self._latencies:
+            return {"count": 0, "mean": 0.0, "p50": 0.0, "p99": 0.0, "max": 0.0}
+        latencies = np.array(self._latencies) * 1000
+        return {
+            "count": len(latencies),
+            "mean": float(latencies.mean()),
+            "p50": float(np.percentile(latencies, 50)),
+            "p99": float(np.percentile(latencies, 99)),
+            "max": float(latencies.max()),
+        }
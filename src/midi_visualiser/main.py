@@ -1,11 +1,10 @@
 import argparse
-import pygame
-import pygame.midi
-import mido
-from .visualiser import Visualiser
+from .startup_profile import StartupProfile
 
 def main():
     """Initializes Pygame and Mido, parses command line arguments, and runs the visualiser."""
+    profile = StartupProfile()
+
     # Parses the command line argument for the file path
     parser = argparse.ArgumentParser(
         description="A real-time MIDI player and visualiser."
@@ -16,17 +15,256 @@ def main():
         default=None,
         help="Optional path to a MIDI file or a directory of MIDI files."
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always parse MIDI files instead of loading preprocessed songs from the cache."
+    )
+    parser.add_argument(
+        "--clear-cache",
+        action="store_true",
+        help="Removes all preprocessed songs from the cache before starting."
+    )
+    parser.add_argument(
+        "--library",
+        action="store_true",
+        help="Searches directories recursively, indexing their MIDI files into a catalogue and skipping any that can't be loaded."
+    )
+    parser.add_argument(
+        "--rescan",
+        action="store_true",
+        help="Indexes every MIDI file in the directory again, rather than only new or changed files. Implies --library."
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Reads songs from their files while they play, for very large files that are slow to load."
+    )
+    parser.add_argument(
+        "--live",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="PORT",
+        help="Shows notes played live on a MIDI input port, using the default input if no port name is given."
+    )
+    parser.add_argument(
+        "--live-replay",
+        metavar="PATH",
+        default=None,
+        help="Replays a MIDI file as if it were being played live, to try live mode without an instrument."
+    )
+    parser.add_argument(
+        "--fps",
+        type=float,
+        default=None,
+        help="Target frame rate (60 by default), such as 120 or 144 for high refresh rate displays, or 0 to leave it uncapped."
+    )
+    parser.add_argument(
+        "--vsync",
+        action="store_true",
+        help="Waits for the display to refresh before each frame instead of sleeping to the target frame rate."
+    )
+    parser.add_argument(
+        "--no-frame-skip",
+        action="store_true",
+        help="Renders every frame, rather than skipping frames to catch up when the visualiser falls behind."
+    )
+    parser.add_argument(
+        "--renderer",
+        choices=("software", "texture"),
+        default="software",
+        help="Draws frames by blitting only the changed regions (software), or by compositing textures with an SDL renderer (texture)."
+    )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Prints how long each stage of starting up took, once the first song is shown."
+    )
+    parser.add_argument(
+        "--record",
+        metavar="PATH",
+        default=None,
+        help=(
+            "Records the session's timing, key presses and MIDI output to a file, which can be replayed and checked "
+            "with midi-visualiser-replay. MIDI is sent once per frame while recording, as it is when replayed."
+        )
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="PATH",
+        default=None,
+        help="Records the timing of every frame and writes it to a Chrome trace file on exit."
+    )
     args = parser.parse_args()
+    if args.record and (args.live is not None or args.live_replay is not None):
+        parser.error("sessions can't be recorded in live mode")
+    profile.enabled = args.profile_startup
+    profile.mark("arguments")
 
     try:
+        # Imported after parsing arguments, so help and argument errors are shown without waiting for them
+        import mido
+        from .visualiser import Visualiser
+        from .song_cache import SongCache
+        from .session_recorder import SessionRecorder
+        profile.mark("imports")
+
+        # Sets up the preprocessed song cache
+        cache = None if args.no_cache else SongCache()
+        if args.clear_cache:
+            (cache or SongCache()).clear()
+
+        # Loads the catalogue of indexed songs, if enabled
+        library = None
+        if args.library or args.rescan:
+            from .library_index import LibraryIndex
+            library = LibraryIndex()
+            if args.rescan:
+                library.clear()
+        profile.mark("cache and library")
+
         # Sets up Mido for audio playback
         mido.set_backend('mido.backends.pygame')
 
         # Runs the visualiser
-        app = Visualiser(args.path)
+        fps = Visualiser.TARGET_FPS if args.fps is None else args.fps
+        app = Visualiser(
+            args.path, cache=cache, trace_path=args.trace, streaming=args.stream, target_fps=fps,
+            vsync=args.vsync, frame_skipping=not args.no_frame_skip, live_port=args.live,
+            live_replay=args.live_replay, library=library, renderer=args.renderer, profile=profile,
+            recorder=SessionRecorder(args.record) if args.record else None
+        )
         app.run()
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
 
+def render():
+    """Parses command line arguments and renders a MIDI file to video without opening a window."""
+    parser = argparse.ArgumentParser(
+        description="Renders a MIDI visualisation offline to a video file or frame sequence."
+    )
+    parser.add_argument("path", help="Path to the MIDI file to render.")
+    parser.add_argument(
+        "output",
+        help="Output video file (encoded with ffmpeg), a directory for a PNG sequence, or a .raw file for raw RGB frames."
+    )
+    parser.add_argument("--fps", type=int, default=60, help="Frame rate of the rendered video.")
+    parser.add_argument("--queue-size", type=int, default=8, help="Maximum number of frames waiting to be encoded.")
+    parser.add_argument(
+        "--audio",
+        metavar="PATH",
+        help="Also renders the song's audio with the built-in synth to a WAV file at this path, which is included in encoded videos."
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always parse the MIDI file instead of loading the preprocessed song from the cache."
+    )
+    args = parser.parse_args()
+
+    # Imported here so the SDL video driver is only overridden when rendering
+    from .video_renderer import VideoRenderer
+    from .song_cache import SongCache
+
+    try:
+        cache = None if args.no_cache else SongCache()
+        renderer = VideoRenderer(fps=args.fps, queue_size=args.queue_size, cache=cache)
+        stats = renderer.render(args.path, args.output, args.audio)
+        print(
+            f"Rendered {stats['frames']} frames in {stats['elapsed']:.2f}s "
+            f"({stats['fps']:.1f} fps, {stats['realtime_factor']:.2f}x real time)."
+        )
+        if args.audio:
+            print(f"Rendered audio to '{args.audio}' in {stats['audio_elapsed']:.2f}s.")
+    except Exception as e:
+        print(f"An unexpected error occurred: {e}")
+
+def batch():
+    """Parses command line arguments and renders every song in a library to video, skipping those already up to date."""
+    parser = argparse.ArgumentParser(
+        description="Renders every MIDI file in a directory to video across a pool of worker processes."
+    )
+    parser.add_argument("path", help="Path to a MIDI file or a directory of MIDI files, searched recursively.")
+    parser.add_argument("output", help="Directory to write the outputs to, mirroring the layout of the songs.")
+    parser.add_argument(
+        "--format",
+        default="mp4",
+        help="Video file extension to encode with ffmpeg, 'png' for directories of frames, or 'raw' for raw RGB frames."
+    )
+    parser.add_argument("--fps", type=int, default=60, help="Frame rate of the rendered videos.")
+    parser.add_argument(
+        "--audio",
+        action="store_true",
+        help="Also renders each song's audio with the built-in synth to a WAV file, which is included in encoded videos."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Number of songs rendered at once by separate processes, or 0 to use one per CPU."
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always parse MIDI files instead of loading preprocessed songs from the cache."
+    )
+    args = parser.parse_args()
+
+    from .batch_exporter import BatchExporter
+    from .library_index import LibraryIndex
+
+    try:
+        exporter = BatchExporter(args.output, args.format, args.fps, args.audio, args.workers, not args.no_cache)
+        stats = exporter.export(args.path, LibraryIndex())
+        print(
+            f"Exported {stats['exported']} songs ({stats['skipped']} up to date, {stats['failed']} failed) "
+            f"in {stats['elapsed']:.2f}s: {stats['songs_per_minute']:.1f} songs per minute, "
+            f"{stats['fps_per_worker']:.1f} fps per worker."
+        )
+    except Exception as e:
+        print(f"An unexpected error occurred: {e}")
+
+def synth():
+    """Parses command line arguments and renders a MIDI file's audio to a WAV file with the built-in synth."""
+    parser = argparse.ArgumentParser(
+        description="Renders a MIDI file's audio offline to a WAV file, without a MIDI output device."
+    )
+    parser.add_argument("path", help="Path to the MIDI file to render.")
+    parser.add_argument("output", help="Path of the WAV file to write.")
+    parser.add_argument("--sample-rate", type=int, default=44100, help="Sample rate of the rendered audio.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of processes rendering segments of the song in parallel, or 0 to use one per CPU."
+    )
+    parser.add_argument(
+        "--segment-seconds",
+        type=float,
+        default=30.0,
+        help="Length of the segments of the song rendered by each process."
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always parse the MIDI file instead of loading the preprocessed song from the cache."
+    )
+    args = parser.parse_args()
+
+    from .software_synth import SoftwareSynth
+    from .song_cache import SongCache
+
+    try:
+        cache = None if args.no_cache else SongCache()
+        synth = SoftwareSynth(args.sample_rate, args.workers, args.segment_seconds)
+        stats = synth.render_file(args.path, args.output, cache=cache)
+        print(
+            f"Rendered {stats['seconds']:.1f}s of audio in {stats['elapsed']:.2f}s "
+            f"({stats['realtime_factor']:.1f}x real time)."
+        )
+    except Exception as e:
+        print(f"An unexpected error occurred: {e}")
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,131 @@
+import mido
+import numpy as np
+
+MESSAGE_DTYPE = np.dtype([
+    ("time", np.float64),
+    ("status", np.uint8),
+    ("data1", np.uint8),
+    ("data2", np.uint8),
+])
+"""Structured dtype for a single MIDI message: its time in seconds from the
+start of the file, status byte and up to two data bytes."""
+
+SYSEX = 0xF0
+"""The status byte of system exclusive messages, whose data is stored separately."""
+
+def _data_length(status: int) -> int:
+    """Returns the number of data bytes following the given status byte."""
+    if status < 0xF0:
+        return 1 if (status & 0xF0) in (0xC0, 0xD0) else 2
+    return {0xF1: 1, 0xF2: 2, 0xF3: 1}.get(status, 0)
+
+DATA_LENGTHS = [_data_length(status) for status in range(256)]
+"""The number of data bytes for each status byte."""
+
+class MessageTable:
+    """Class storing a song's playable MIDI messages as a compact NumPy structured array, sorted by time."""
+
+    def __init__(self, messages: np.ndarray, sysex_data: np.ndarray, sysex_offsets: np.ndarray, duration: float) -> None:
+        """Initialises the message table from a structured array using `MESSAGE_DTYPE`.
+
+        Parameters
+        ----------
+        messages : np.ndarray
+            The messages in the song, excluding meta messages.
+        sysex_data : np.ndarray
+            The concatenated bytes of all system exclusive messages.
+        sysex_offsets : np.ndarray
+            The start offset of each system exclusive message within `sysex_data`,
+            followed by the total length.
+        duration : float
+            The time in seconds from the start of the file to its final message.
+        """
+        self.messages = messages
+        self.times = messages["time"]
+        self.statuses = messages["status"]
+        self.data1 = messages["data1"]
+        self.data2 = messages["data2"]
+        self.sysex_data = sysex_data
+        self.sysex_offsets = sysex_offsets
+        self.duration = duration
+
+        # Masks of the messages which press and release keys, where note on messages with no velocity release them
+        kinds = self.statuses & 0xF0
+        self.note_on = (kinds == 0x90) & (self.data2 > 0)
+        self.note_off = (kinds == 0x80) | ((kinds == 0x90) & (self.data2 == 0))
+
+        # Row indices of system exclusive messages, used to find their data
+        self._sysex_rows = np.flatnonzero(self.statuses == SYSEX)
+
+    def __len__(self) -> int:
+        """Returns the number of messages in the table."""
+        return len(self.messages)
+
+    @property
+    def nbytes(self) -> int:
+        """The memory used by the table's arrays, in bytes."""
+        return (
+            self.messages.nbytes + self.sysex_data.nbytes + self.sysex_offsets.nbytes
+            + self.note_on.nbytes + self.note_off.nbytes + self._sysex_rows.nbytes
+        )
+
+    def message_bytes(self, index: int) -> list[int]:
+        """Returns the raw bytes of the message at the given index."""
+        _, status, data1, data2 = self.messages[index].tolist()
+        if status == SYSEX:
+            k = int(np.searchsorted(self._sysex_rows, index))
+            return self.sysex_data[self.sysex_offsets[k]:self.sysex_offsets[k + 1]].tolist()
+        return [status, data1, data2][:1 + DATA_LENGTHS[status]]
+
+    def encoded(self, start: int, stop: int) -> list[list[int]]:
+        """Returns the raw bytes of every message in the given range of indices, ready to be sent."""
+        rows = self.messages[start:stop][["status", "data1", "data2"]].tolist()
+        encoded = [list(row[:1 + DATA_LENGTHS[row[0]]]) for row in rows]
+        for i in np.flatnonzero(self.statuses[start:stop] == SYSEX).tolist():
+            encoded[i] = self.message_bytes(start + i)
+        return encoded
+
+    def message(self, index: int) -> mido.Message:
+        """Returns the message at the given index as a Mido message."""
+        return mido.Message.from_bytes(self.message_bytes(index))
+
+    @staticmethod
+    def from_bytes(rows: list[tuple[float, list[int]]], duration: float) -> 'MessageTable':
+        """Compiles raw MIDI messages into a message table.
+
+        Parameters
+        ----------
+        rows : list[tuple[float, list[int]]]
+            The time in seconds from the start of the file and raw bytes of each message, sorted by time.
+        duration : float
+            The time in seconds from the start of the file to its final event.
+
+        Returns
+        -------
+        MessageTable
+            A message table containing one row per message.
+        """
+        times, statuses, data1, data2 = [], [], [], []
+        sysex_data, sysex_offsets = [], [0]
+
+        for message_time, message_bytes in rows:
+            times.append(message_time)
+            statuses.append(message_bytes[0])
+            if message_bytes[0] == SYSEX:
+                sysex_data.extend(message_bytes)
+                sysex_offsets.append(len(sysex_data))
+                message_bytes = [SYSEX]
+            data1.append(message_bytes[1] if len(message_bytes) > 1 else 0)
+            data2.append(message_bytes[2] if len(message_bytes) > 2 else 0)
+
+        table = np.empty(len(times), dtype=MESSAGE_DTYPE)
+        table["time"] = times
+        table["status"] = statuses
+        table["data1"] = data1
+        table["data2"] = data2
+        return MessageTable(
+            table,
+            np.array(sysex_data, dtype=np.uint8),
+            np.array(sysex_offsets, dtype=np.int64),
+            duration
+        )
@@ -0,0 +1,58 @@
+import numpy as np
+
+EVENT_DTYPE = np.dtype([
+    ("time", np.float64),
+    ("status", np.uint8),
+    ("data1", np.uint8),
+    ("data2", np.uint8),
+])
+"""Structured dtype for a single received MIDI event: the clock time at which
+it was received, its status byte and up to two data bytes."""
+
+class MidiEventBuffer:
+    """
+    Class storing MIDI events received on one thread in a fixed-size ring buffer, so that
+    they can be read in batches on another thread without either thread ever waiting on a lock.
+
+    Only a single thread may push events, and a single thread may read them.
+    """
+
+    DEFAULT_CAPACITY = 1 << 16
+    """The default number of events the buffer can hold before unread events are overwritten."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        """Initialises an empty buffer with space for the given number of events."""
+        self.capacity = capacity
+        self._events = np.zeros(capacity, dtype=EVENT_DTYPE)
+
+        # Total counts of events pushed and read, where only the writer changes the write count
+        # and only the reader changes the read count
+        self._write_count = 0
+        self._read_count = 0
+
+        self.dropped_events = 0
+        """The number of events overwritten before they could be read."""
+
+    def push(self, time: float, status: int, data1: int = 0, data2: int = 0) -> None:
+        """Adds an event to the buffer, publishing it to the reader once it has been fully written."""
+        self._events[self._write_count % self.capacity] = (time, status, data1, data2)
+        self._write_count += 1
+
+    def read(self) -> np.ndarray:
+        """Returns every event pushed since the last read, in the order they were pushed.
+
+        Returns
+        -------
+        np.ndarray
+            The new events, using `EVENT_DTYPE`.
+        """
+        end = self._write_count
+        start = self._read_count
+
+        # Skips events that have already been overwritten by newer ones
+        if end - start > self.capacity:
+            self.dropped_events += end - start - self.capacity
+            start = end - self.capacity
+
+        self._read_count = end
+        return self._events[np.arange(start, end) % self.capacity]
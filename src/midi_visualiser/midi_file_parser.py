@@ -0,0 +1,115 @@
+import struct
+import numpy as np
+from .message_table import MessageTable, MESSAGE_DTYPE, SYSEX
+from .midi_track import DEFAULT_TEMPO, META, iter_track
+
+class MidiFileParser:
+    """
+    Class which loads every playable message of a MIDI file directly into a `MessageTable`.
+
+    Each track is read into flat columns of ticks and bytes, the tracks are merged with a single
+    stable sort, and ticks are converted to seconds for every message at once using the file's
+    tempo map. Messages have the same order, times and bytes as iterating over a `mido.MidiFile`
+    opened with `clip=True`.
+    """
+
+    def __init__(self, file_name: str) -> None:
+        """Initialises the parser for the given MIDI file."""
+        self.file_name = file_name
+
+    def parse(self) -> MessageTable:
+        """Reads the MIDI file and compiles its playable messages into a message table.
+
+        Returns
+        -------
+        MessageTable
+            A message table containing one row per playable message.
+        """
+        with open(self.file_name, "rb") as f:
+            data = f.read()
+
+        if data[:4] != b"MThd" or len(data) < 14:
+            raise OSError("MThd not found. Probably not a MIDI file")
+        size = struct.unpack(">L", data[4:8])[0]
+        file_type, track_count, ticks_per_beat = struct.unpack(">hhh", data[8:8 + size][:6])
+        if file_type == 2:
+            raise TypeError("can't merge tracks in type 2 (asynchronous) file")
+
+        # Reads every event of every track into shared columns, in track order
+        self._ticks: list[int] = []
+        self._statuses: list[int] = []
+        self._data1: list[int] = []
+        self._data2: list[int] = []
+        self._tempos: dict[int, int] = {}
+        self._sysex: dict[int, list[int]] = {}
+        end_tick = 0
+        position = 8 + size
+        for _ in range(track_count):
+            if data[position:position + 4] != b"MTrk" or len(data) < position + 8:
+                raise OSError("no MTrk header at start of track")
+            size = struct.unpack(">L", data[position + 4:position + 8])[0]
+            try:
+                end_tick = max(end_tick, self._read_track(data, position + 8, position + 8 + size))
+            except IndexError:
+                raise EOFError("unexpected end of file") from None
+            position += 8 + size
+
+        # Merges the tracks by tick, keeping ties in track order. The stable sort finds the
+        # runs of events already sorted within each track and merges them.
+        ticks = np.array(self._ticks, dtype=np.int64)
+        order = np.argsort(ticks, kind='stable')
+        ticks = ticks[order]
+        statuses = np.array(self._statuses, dtype=np.uint8)[order]
+
+        # Finds the tempo in effect before each event, as a tempo change only applies to the ticks after it
+        tempo_values = np.full(len(ticks) + 1, DEFAULT_TEMPO, dtype=np.int64)
+        tempo_positions = np.zeros(len(ticks) + 1, dtype=np.int64)
+        if self._tempos:
+            inverse = np.empty_like(order)
+            inverse[order] = np.arange(len(order))
+            changes = inverse[list(self._tempos)]
+            tempo_values[changes + 1] = list(self._tempos.values())
+            tempo_positions[changes + 1] = changes + 1
+        tempos = tempo_values[np.maximum.accumulate(tempo_positions)]
+
+        # Converts tick deltas to seconds and accumulates them in order, exactly as Mido does for each message
+        deltas = np.diff(ticks, prepend=0) * (tempos[:-1] * 1e-6 / ticks_per_beat)
+        times = np.cumsum(deltas)
+        last_tick = int(ticks[-1]) if len(ticks) else 0
+        last_time = float(times[-1]) if len(times) else 0.0
+        duration = last_time + (end_tick - last_tick) * (int(tempos[-1]) * 1e-6 / ticks_per_beat) if end_tick > last_tick else last_time
+
+        # Keeps every event except meta events
+        playable = np.flatnonzero(statuses != META)
+        table = np.empty(len(playable), dtype=MESSAGE_DTYPE)
+        table["time"] = times[playable]
+        table["status"] = statuses[playable]
+        table["data1"] = np.array(self._data1, dtype=np.uint8)[order][playable]
+        table["data2"] = np.array(self._data2, dtype=np.uint8)[order][playable]
+
+        # Concatenates system exclusive messages in the order they are played
+        sysex_data, sysex_offsets = [], [0]
+        for event in order[playable[table["status"] == SYSEX]].tolist():
+            sysex_data.extend(self._sysex[event])
+            sysex_offsets.append(len(sysex_data))
+
+        return MessageTable(table, np.array(sysex_data, dtype=np.uint8), np.array(sysex_offsets, dtype=np.int64), duration)
+
+    def _read_track(self, data: bytes, position: int, end: int) -> int:
+        """Appends every event of a track except end of track events to the columns, returning the track's final tick."""
+        ticks, statuses, data1, data2 = self._ticks, self._statuses, self._data1, self._data2
+        end_ticks: list[int] = []
+        for tick, status, message in iter_track(data, position, end, end_ticks):
+            if status == META:
+                if message is not None and len(message) == 3:
+                    self._tempos[len(ticks)] = (message[0] << 16) | (message[1] << 8) | message[2]
+                message = (META,)
+            elif status == SYSEX:
+                self._sysex[len(ticks)] = message
+                message = (SYSEX,)
+
+            ticks.append(tick)
+            statuses.append(status)
+            data1.append(message[1] if len(message) > 1 else 0)
+            data2.append(message[2] if len(message) > 2 else 0)
+        return end_ticks[0]
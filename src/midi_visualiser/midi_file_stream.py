@@ -0,0 +1,66 @@
+import mmap
+import heapq
+import struct
+from collections.abc import Iterator
+from .midi_track import DEFAULT_TEMPO, META, iter_track
+
+class MidiFileStream:
+    """
+    Class which parses a MIDI file incrementally, merging its tracks on the fly
+    and yielding each playable message with its time in seconds, so that files
+    can be played without first loading every message into memory.
+
+    Messages are yielded in the same order and with the same times as iterating
+    over a `mido.MidiFile` opened with `clip=True`.
+    """
+
+    def __init__(self, file_name: str) -> None:
+        """Initialises the stream for the given MIDI file, reading only its header."""
+        self.file_name = file_name
+
+        self.end_time: float | None = None
+        """The time in seconds of the file's final event, known once the stream has been fully read."""
+
+        with open(file_name, "rb") as f:
+            name, size = struct.unpack(">4sL", f.read(8))
+            if name != b"MThd":
+                raise OSError("MThd not found. Probably not a MIDI file")
+            self.type, self.track_count, self.ticks_per_beat = struct.unpack(">hhh", f.read(size)[:6])
+            self._first_track = 8 + size
+
+        if self.type == 2:
+            raise TypeError("can't merge tracks in type 2 (asynchronous) file")
+
+    def __iter__(self) -> Iterator[tuple[float, list[int]]]:
+        """Yields the time in seconds from the start of the file and raw bytes of each playable message."""
+        with open(self.file_name, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            # Finds the chunk of each track
+            tracks = []
+            end_ticks: list[int] = []
+            position = self._first_track
+            for _ in range(self.track_count):
+                name, size = struct.unpack(">4sL", data[position:position + 8])
+                if name != b"MTrk":
+                    raise OSError("no MTrk header at start of track")
+                tracks.append(iter_track(data, position + 8, position + 8 + size, end_ticks))
+                position += 8 + size
+
+            # Merges tracks by tick, with ties kept in track order, converting ticks to seconds at the current tempo
+            tempo = DEFAULT_TEMPO
+            current_time = 0.0
+            last_tick = 0
+            for tick, status, message in heapq.merge(*tracks, key=lambda event: event[0]):
+                if tick > last_tick:
+                    current_time += (tick - last_tick) * (tempo * 1e-6 / self.ticks_per_beat)
+                    last_tick = tick
+
+                if status != META:
+                    yield current_time, message
+                elif message is not None and len(message) == 3:
+                    tempo = (message[0] << 16) | (message[1] << 8) | message[2]
+
+            # The file ends at its final event, which may be an end of track event after the last message
+            end_tick = max(end_ticks, default=0)
+            if end_tick > last_tick:
+                current_time += (end_tick - last_tick) * (tempo * 1e-6 / self.ticks_per_beat)
+            self.end_time = current_time
@@ -0,0 +1,35 @@
+import time
+import threading
+import mido
+from collections.abc import Callable
+
+class MidiInputListener:
+    """
+    Class which calls a callback with every message received on a Mido input port from a
+    background thread, as not every Mido backend can call callbacks for its ports itself.
+    """
+
+    POLL_INTERVAL = 0.0005
+    """The time in seconds between checks for new messages on the port."""
+
+    def __init__(self, port: mido.ports.BaseInput, callback: Callable[[mido.Message], None]) -> None:
+        """Starts listening for messages on the given port, passing each one to the callback."""
+        self.port = port
+        self.callback = callback
+
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="midi-input", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        """Passes every pending message to the callback, then sleeps briefly, until closed."""
+        while not self._stop_event.is_set():
+            for message in self.port.iter_pending():
+                self.callback(message)
+            time.sleep(self.POLL_INTERVAL)
+
+    def close(self) -> None:
+        """Stops listening and closes the port."""
+        self._stop_event.set()
+        self._thread.join()
+        self.port.close()
@@ -0,0 +1,171 @@
+import sys
+import time
+import threading
+import numpy as np
+from collections import deque
+from typing import TYPE_CHECKING
+from .clock import Clock
+
+if TYPE_CHECKING:
+    from .song import Song
+
+class MidiScheduler:
+    """
+    Class which sends a song's MIDI messages at their exact timestamps from a dedicated
+    thread, so audio timing is independent of the frame rate of the render loop.
+    """
+
+    SPIN_THRESHOLD = 0.002
+    """The time in seconds before a message is due at which the thread stops sleeping and
+    yields in a loop instead, as sleeps are not precise enough for accurate timing."""
+
+    MAX_SLEEP = 0.05
+    """The maximum time in seconds the thread sleeps for before checking for changes."""
+
+    DENSE_MESSAGE_RATE = 1000
+    """The number of messages per second above which a passage is dense enough for messages to be batched."""
+
+    BATCH_WINDOW = 0.001
+    """The time in seconds after the next message within which messages are sent with it during dense passages."""
+
+    SWITCH_INTERVAL = 0.001
+    """The interpreter's thread switch interval while scheduling, so that the render
+    loop can't hold onto the interpreter for long when a message is due."""
+
+    _switch_interval_lock = threading.Lock()
+    _switch_interval_users = 0
+    _previous_switch_interval: float | None = None
+
+    def __init__(self, song: 'Song', clock: Clock = time.perf_counter, max_samples: int = 10000) -> None:
+        """Initialises the scheduler for the given song."""
+        self.song = song
+        self.clock = clock
+
+        self.message_index = 0
+        """The index of the next message to be sent."""
+
+        self.notes_pressed: dict[int, tuple[int, bool]] = {}
+        """A snapshot of the channel and pressed state of each note, replaced after every batch of messages."""
+
+        self._timing_errors: deque[float] = deque(maxlen=max_samples)
+        self._thread: threading.Thread | None = None
+        self._stop_event = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        """Whether the scheduler thread is currently running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, message_index: int, notes_pressed: dict[int, tuple[int, bool]]) -> None:
+        """Starts sending messages from the given index on the scheduler thread."""
+        self.stop()
+        self.message_index = message_index
+        self.notes_pressed = dict(notes_pressed)
+
+        self._stop_event.clear()
+        self._shorten_switch_interval()
+        self._thread = threading.Thread(target=self._run_thread, name="midi-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops the scheduler thread, waiting for it to finish sending any current messages."""
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+
+    @classmethod
+    def _shorten_switch_interval(cls) -> None:
+        """Shortens the interpreter's thread switch interval while any scheduler thread is running."""
+        with cls._switch_interval_lock:
+            if cls._switch_interval_users == 0:
+                cls._previous_switch_interval = sys.getswitchinterval()
+                sys.setswitchinterval(min(cls._previous_switch_interval, cls.SWITCH_INTERVAL))
+            cls._switch_interval_users += 1
+
+    @classmethod
+    def _restore_switch_interval(cls) -> None:
+        """Restores the interpreter's previous thread switch interval once every scheduler thread has finished."""
+        with cls._switch_interval_lock:
+            cls._switch_interval_users -= 1
+            if cls._switch_interval_users == 0:
+                sys.setswitchinterval(cls._previous_switch_interval)
+
+    def _run_thread(self) -> None:
+        """Runs the scheduler thread, restoring the switch interval when it finishes for any reason."""
+        try:
+            self._run()
+        finally:
+            self._restore_switch_interval()
+
+    def timing_stats(self) -> dict[str, float]:
+        """Returns statistics in milliseconds on how late messages were sent compared to their intended timestamps."""
+        if not self._timing_errors:
+            return {"count": 0, "mean": 0.0, "p50": 0.0, "p99": 0.0, "max": 0.0}
+        errors = np.array(self._timing_errors) * 1000
+        return {
+            "count": len(errors),
+            "mean": float(errors.mean()),
+            "p50": float(np.percentile(errors, 50)),
+            "p99": float(np.percentile(errors, 99)),
+            "max": float(errors.max()),
+        }
+
+    def _run(self) -> None:
+        """Sends each message once its time arrives, until stopped or the end of the song is reached."""
+        song = self.song
+        notes_pressed = dict(self.notes_pressed)
+
+        while not self._stop_event.is_set():
+            # Finds the loaded block of messages containing the next message
+            chunk = song.message_chunk(self.message_index)
+            if chunk is None:
+                break
+            first, messages = chunk
+            times = messages.times
+            index = self.message_index - first
+
+            # Waits until the next message has been loaded and the song has been updated,
+            # which maps song time to clock time
+            reference = song.time_reference
+            if index >= len(times) or reference is None:
+                self._stop_event.wait(self.SPIN_THRESHOLD)
+                continue
+            clock_offset = reference[0] - reference[1] + song.buffer_time
+
+            # Sleeps until shortly before the next message is due, then yields until it is
+            wait_time = clock_offset + times[index] - self.clock()
+            if wait_time > self.SPIN_THRESHOLD:
+                self._stop_event.wait(min(wait_time - self.SPIN_THRESHOLD, self.MAX_SLEEP))
+                continue
+            if wait_time > 0:
+                time.sleep(0)
+                continue
+
+            # Sends messages due shortly after in the same batch during dense passages, known from the
+            # song's analytics, so the thread wakes less often when messages are only moments apart
+            analytics = song.analytics
+            window = 0.0
+            if analytics is not None and analytics.message_rate_at(times[index]) > self.DENSE_MESSAGE_RATE:
+                window = self.BATCH_WINDOW
+
+            # Finds the due messages with scalar comparisons, as array searches can release the
+            # interpreter lock and leave the thread waiting for the render loop to hand it back
+            now = self.clock() + window
+            stop = index + 1
+            while stop < len(times) and clock_offset + times[stop] <= now:
+                stop += 1
+
+            # Sends the due messages as pre-encoded bytes, using the note masks to update the key states
+            due_times = times[index:stop].tolist()
+            note_on = messages.note_on[index:stop].tolist()
+            note_off = messages.note_off[index:stop].tolist()
+            for i, message_bytes in enumerate(messages.encoded(index, stop)):
+                song.raw_output.send(message_bytes)
+                if note_on[i] or note_off[i]:
+                    notes_pressed[message_bytes[1]] = (message_bytes[0] & 0x0F, note_on[i])
+                self._timing_errors.append(self.clock() - clock_offset - due_times[i])
+
+            # Publishes the new state by replacing references, so readers never need a lock
+            self.notes_pressed = dict(notes_pressed)
+            self.message_index = first + stop
@@ -0,0 +1,92 @@
+from collections.abc import Iterator, Sequence
+from mido.messages.specs import SPEC_BY_STATUS
+
+DEFAULT_TEMPO = 500000
+"""The tempo in microseconds per beat used until the first tempo change."""
+
+META = 0xFF
+"""The status byte of meta events, which are never played but may change the tempo."""
+
+SET_TEMPO = 0x51
+END_OF_TRACK = 0x2F
+
+MESSAGE_LENGTHS = [SPEC_BY_STATUS[status]["length"] if status in SPEC_BY_STATUS else None for status in range(256)]
+"""The length in bytes of each channel or system message by its status byte, or None for undefined status bytes."""
+
+def read_variable_length(data: Sequence[int], position: int) -> tuple[int, int]:
+    """Reads a variable length quantity, returning its value and the position after it."""
+    value = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value = (value << 7) | (byte & 0x7F)
+        if byte < 0x80:
+            return value, position
+
+def iter_track(
+    data: Sequence[int], start: int, end: int, end_ticks: list[int]
+) -> Iterator[tuple[int, int, list[int] | bytes | None]]:
+    """
+    Yields the absolute tick, status byte and data of every event in a track chunk, except end of
+    track events, decoding messages as `mido.MidiFile` does with `clip=True`. Messages are given as
+    their raw bytes with data bytes clipped to the valid range, system exclusive messages with
+    their data clipped and wrapped in start and end bytes, and meta events only carry data for
+    tempo changes. The track's final tick is appended to `end_ticks` once it has been fully read.
+    """
+    position = start
+    tick = 0
+    last_status = None
+
+    while position < end:
+        delta, position = read_variable_length(data, position)
+        tick += delta
+
+        # Handles running status, where the status byte is omitted and the previous one reused
+        status = data[position]
+        position += 1
+        peek = None
+        if status < 0x80:
+            if last_status is None:
+                raise OSError("running status without last_status")
+            peek = status
+            status = last_status
+        elif status != META:
+            last_status = status
+
+        if status == META:
+            meta_type = data[position]
+            length, position = read_variable_length(data, position + 1)
+            if meta_type != END_OF_TRACK:
+                yield tick, META, data[position:position + length] if meta_type == SET_TEMPO else None
+            position += length
+        elif status == 0xF0 or status == 0xF7:
+            length, position = read_variable_length(data, position)
+            sysex = data[position:position + length]
+            position += length
+
+            # Stores system exclusive messages in the form Mido sends them
+            if sysex and sysex[0] == 0xF0:
+                sysex = sysex[1:]
+            if sysex and sysex[-1] == 0xF7:
+                sysex = sysex[:-1]
+            yield tick, 0xF0, [0xF0] + [byte if byte < 127 else 127 for byte in sysex] + [0xF7]
+        else:
+            length = MESSAGE_LENGTHS[status]
+            if length is None:
+                raise OSError(f"undefined status byte 0x{status:02x}")
+
+            # Clips data bytes to the valid range, as Mido does when opening files with `clip=True`
+            if length == 1:
+                yield tick, status, [status]
+                continue
+            if peek is None:
+                peek = data[position]
+                position += 1
+            if length == 2:
+                yield tick, status, [status, peek if peek < 127 else 127]
+                continue
+            byte = data[position]
+            position += 1
+            yield tick, status, [status, peek if peek < 127 else 127, byte if byte < 127 else 127]
+
+    end_ticks.append(tick)
@@ -0,0 +1,124 @@
+import math
+import numpy as np
+from .message_table import MessageTable
+
+NOTE_DTYPE = np.dtype([
+    ("key", np.int16),
+    ("channel", np.int8),
+    ("start", np.float64),
+    ("length", np.float64),
+    ("end", np.float64),
+])
+"""Structured dtype for a single note: its piano key index, MIDI channel,
+and start time, length and end time in seconds."""
+
+class NoteTable:
+    """Class storing every note of a song as a columnar NumPy structured array, sorted by start time."""
+
+    MIN_CLASS_LENGTH = 0.125
+    """The maximum note length in seconds of the shortest length class in the interval index."""
+
+    loaded_until = math.inf
+    """The time in seconds before which every note is known, which is unbounded as the table holds the whole song."""
+
+    def __init__(self, notes: np.ndarray) -> None:
+        """Initialises the note table from a structured array using `NOTE_DTYPE`."""
+        self.notes = notes
+        self.keys = notes["key"]
+        self.channels = notes["channel"]
+        self.starts = notes["start"]
+        self.lengths = notes["length"]
+        self.ends = notes["end"]
+        self._generate_interval_index()
+
+    def __len__(self) -> int:
+        """Returns the number of notes in the table."""
+        return len(self.notes)
+
+    @property
+    def nbytes(self) -> int:
+        """The memory used by the table and its interval index, in bytes."""
+        return self.notes.nbytes + sum(indices.nbytes + starts.nbytes for indices, starts, _ in self._length_classes)
+
+    def _generate_interval_index(self) -> None:
+        """
+        Groups notes into classes of similar length, each sorted by start time with
+        a maximum length bound, so that overlap queries only scan nearby notes.
+        """
+        # Class k contains notes no longer than MIN_CLASS_LENGTH * 2^k
+        ratios = np.maximum(self.lengths / self.MIN_CLASS_LENGTH, 1)
+        classes = np.ceil(np.log2(ratios)).astype(np.int64)
+
+        self._length_classes: list[tuple[np.ndarray, np.ndarray, float]] = []
+        for k in np.unique(classes).tolist():
+            indices = np.flatnonzero(classes == k)
+            self._length_classes.append((indices, self.starts[indices], self.MIN_CLASS_LENGTH * 2 ** k))
+
+    def visible(self, time: float, note_time: float) -> np.ndarray:
+        """Returns all notes that are on screen at the given time.
+
+        A note is on screen once it has started scrolling, until it has scrolled fully
+        past the piano, so its interval [start, end + note_time] must contain the time.
+
+        Parameters
+        ----------
+        time : float
+            The current song time in seconds.
+        note_time : float
+            The time in seconds for a note to scroll through the display.
+
+        Returns
+        -------
+        np.ndarray
+            The visible rows of the note table, sorted by start time.
+        """
+        scrolled_time = time - note_time
+        found = []
+        for indices, starts, max_length in self._length_classes:
+            # Only notes starting within the length bound of the scrolled time can overlap it
+            first = np.searchsorted(starts, scrolled_time - max_length, side='left')
+            last = np.searchsorted(starts, time, side='right')
+            candidates = indices[first:last]
+            found.append(candidates[self.ends[candidates] >= scrolled_time])
+
+        if not found:
+            return self.notes[:0]
+        if len(found) == 1:
+            return self.notes[found[0]]
+        return self.notes[np.sort(np.concatenate(found))]
+
+    @staticmethod
+    def from_message_table(messages: MessageTable) -> 'NoteTable':
+        """Builds a table of all notes from a message table.
+
+        A note starts at a note on message and lasts until the next note on or off
+        message for the same key, or until the end of the song if there is none.
+
+        Parameters
+        ----------
+        messages : MessageTable
+            The song's playable MIDI messages.
+
+        Returns
+        -------
+        NoteTable
+            A note table containing one row per note, sorted by start time.
+        """
+        # Groups note messages by key, keeping them in the order they are played
+        kinds = messages.statuses & 0xF0
+        note_rows = np.flatnonzero((kinds == 0x80) | (kinds == 0x90))
+        note_rows = note_rows[np.argsort(messages.data1[note_rows], kind='stable')]
+
+        # Ends each note at the next message for the same key
+        same_key = messages.data1[note_rows[1:]] == messages.data1[note_rows[:-1]]
+        end_times = np.full(len(messages), messages.duration)
+        end_times[note_rows[:-1][same_key]] = messages.times[note_rows[1:][same_key]]
+
+        starting = np.flatnonzero(messages.note_on)
+        notes = np.empty(len(starting), dtype=NOTE_DTYPE)
+        notes["key"] = messages.data1[starting].astype(np.int16) - 21
+        notes["channel"] = messages.statuses[starting] & 0x0F
+        notes["start"] = messages.times[starting]
+        notes["length"] = end_times[starting] - notes["start"]
+        notes["end"] = notes["start"] + notes["length"]
+        return NoteTable(notes)
@@ -0,0 +1,117 @@
+import pygame
+from typing import TYPE_CHECKING
+from .frame_stats import FrameStats
+
+if TYPE_CHECKING:
+    from .song import Song
+    from .live_input import LiveInput
+
+class PerformanceHud:
+    """Class which draws live frame timing statistics in the corner of the window."""
+
+    REFRESH_INTERVAL = 15
+    """The number of frames between updates of the displayed text, as rendering text every frame is costly."""
+
+    def __init__(self, stats: FrameStats, font_size: int = 16) -> None:
+        """Initialises the HUD for the given frame statistics."""
+        self.stats = stats
+        self.font_size = font_size
+        self.surface: pygame.Surface | None = None
+        self._font: pygame.font.Font | None = None
+
+    @property
+    def font(self) -> pygame.font.Font:
+        """The font used for the HUD's text, which is only loaded once the HUD is first shown as finding system fonts can be slow."""
+        if self._font is None:
+            self._font = pygame.font.SysFont("monospace", self.font_size)
+        return self._font
+
+    def _lines(
+        self, midi_timing: dict[str, float] | None, live_input: 'LiveInput | None', song: 'Song | None' = None
+    ) -> list[str]:
+        """Returns the lines of text describing the current statistics, and the analytics of the song if it has them."""
+        stats = self.stats
+        target = f"{stats.target_fps:g}" if stats.target_fps > 0 else "uncapped"
+        lines = [
+            f"fps {stats.fps:6.1f} / {target}  rendered {stats.rendered_fps:6.1f}",
+            f"dropped {stats.dropped_frames}  skipped {stats.skipped_frames}",
+            "phase       p50     p95     p99 ms",
+        ]
+        for phase, (p50, p95, p99) in stats.phase_percentiles().items():
+            lines.append(f"{phase:<8} {p50:7.2f} {p95:7.2f} {p99:7.2f}")
+        lines.append(f"notes {stats.latest('visible_notes'):.0f}  pixels {stats.latest('pixels_pushed'):.0f}")
+        if midi_timing is not None:
+            lines.append(f"midi lag p50 {midi_timing['p50']:.2f} p99 {midi_timing['p99']:.2f} ms")
+        if live_input is not None:
+            latency = live_input.latency_stats()
+            lines.append(f"input lag p50 {latency['p50']:.2f} p99 {latency['p99']:.2f} ms")
+            lines.append(f"dropped events {live_input.dropped_events}")
+        if song is not None and song.analytics is not None:
+            analytics = song.analytics
+            ahead = analytics.notes_on_screen_between(song.time, song.time + song.display_settings.note_time)
+            lines.append(f"song peak notes {analytics.peak_notes_on_screen}  polyphony {analytics.peak_polyphony}")
+            lines.append(
+                f"msgs/s {analytics.message_rate_at(song.time - song.buffer_time)} "
+                f"peak {analytics.peak_messages_per_second}  notes ahead {ahead}"
+            )
+        return lines
+
+    def _render(
+        self, midi_timing: dict[str, float] | None, live_input: 'LiveInput | None', song: 'Song | None' = None
+    ) -> pygame.Surface:
+        """Renders the statistics text onto a new opaque surface."""
+        lines = self._lines(midi_timing, live_input, song)
+        line_surfaces = [self.font.render(line, True, (255, 255, 255)) for line in lines]
+        line_height = self.font.get_linesize()
+        width = max(line.get_width() for line in line_surfaces) + 8
+        height = line_height * len(line_surfaces) + 8
+
+        # Never shrinks, so the previous text is always fully covered
+        if self.surface is not None:
+            width = max(width, self.surface.get_width())
+            height = max(height, self.surface.get_height())
+
+        surface = pygame.Surface((width, height))
+        surface.fill((0, 0, 0))
+        for i, line in enumerate(line_surfaces):
+            surface.blit(line, (4, 4 + i * line_height))
+        return surface
+
+    def render(self, song: 'Song | LiveInput | None') -> pygame.Surface:
+        """Returns the HUD surface, rendering the statistics again if it is due to be refreshed.
+
+        Parameters
+        ----------
+        song : Song | LiveInput | None
+            The song currently being played, whose MIDI send lag is shown if it uses a scheduler,
+            or the live input being shown, whose input to display latency is shown. A song's
+            analytics are also shown, along with the most notes on screen in the coming seconds.
+
+        Returns
+        -------
+        pygame.Surface
+            The HUD surface, which is a new surface whenever the text has changed.
+        """
+        if self.surface is None or self.stats.frame_count % self.REFRESH_INTERVAL == 0:
+            # Only live input measures its latency
+            live_input = song if song and song.is_live else None
+            midi_timing = song.scheduler.timing_stats() if song and not live_input and song.scheduler else None
+            self.surface = self._render(midi_timing, live_input, None if live_input else song)
+        return self.surface
+
+    def draw(self, target: pygame.Surface, song: 'Song | LiveInput | None') -> pygame.Rect:
+        """Draws the HUD to the top left of the target surface.
+
+        Parameters
+        ----------
+        target : pygame.Surface
+            The surface to draw the HUD to.
+        song : Song | LiveInput | None
+            The song currently being played or the live input being shown, as passed to `render`.
+
+        Returns
+        -------
+        pygame.Rect
+            The region of the target that was drawn to.
+        """
+        return target.blit(self.render(song), (0, 0))
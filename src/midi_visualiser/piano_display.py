@@ -1,7 +1,12 @@
 import os
+import numpy as np
 import pygame
-from .song import Song
+from typing import TYPE_CHECKING
 from .piano_display_settings import PianoDisplaySettings
+from .piano_roll_tiles import PianoRollTiles
+
+if TYPE_CHECKING:
+    from .song import Song
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -23,15 +28,47 @@ class PianoDisplay:
 
         self._pre_render_surfaces()
 
+        if self.settings.scrolling_notes:
+            self.piano_roll = PianoRollTiles(
+                self.settings, self.width, self.scrolling_unit, self.key_x, self.key_w, self.octave_positions
+            )
+
+        # Change tracking state used to only redraw regions that have changed
+        self.pixels_pushed = 0
+        self._redraw_all = True
+        self._last_target: tuple[pygame.Surface, tuple[int, int]] | None = None
+        self._last_song: 'Song | None' = None
+        self._last_song_time = 0.0
+        self._last_playing = False
+        self._last_key_states: list[int | None] = [None] * 88
+
+    @staticmethod
+    def window_size(settings: PianoDisplaySettings) -> tuple[float, float]:
+        """Calculates the size of the display for the given settings, without pre-rendering anything.
+
+        Parameters
+        ----------
+        settings : PianoDisplaySettings
+            The settings of the display.
+
+        Returns
+        -------
+        tuple[float, float]
+            The width and height of the display in pixels.
+        """
+        piano_width = settings.key_width * 52
+        return piano_width, piano_width * settings.scroll_height_ratio + settings.key_width * 5
+
     def _calculate_dimensions(self):
         """Calculates the dimensions of the piano and scrolling note area."""
         self.piano_width = self.settings.key_width * 52
         self.key_height = self.settings.key_width * 5
         self.scrolling_height = self.piano_width * self.settings.scroll_height_ratio
         
-        self.width = self.piano_width
-        self.height = self.scrolling_height + self.key_height
+        self.width, self.height = PianoDisplay.window_size(self.settings)
         self.piano_position = (0, self.scrolling_height)
+        self.scrolling_rect = pygame.Rect(0, 0, self.width, self.scrolling_height)
+        self.piano_rect = pygame.Rect(self.piano_position, (self.piano_width, self.key_height))
         
         if self.settings.scrolling_notes:
             self.scrolling_unit = self.scrolling_height / self.settings.note_time
@@ -53,6 +90,10 @@ class PianoDisplay:
                 self.key_rects[i] = pygame.Rect(left, 0, self.settings.key_width, self.key_height)
                 left += self.settings.key_width
 
+        # Stores key positions as arrays so note rectangles can be calculated in bulk
+        self.key_x = np.array([self.key_rects[i].x for i in range(88)])
+        self.key_w = np.array([self.key_rects[i].w for i in range(88)])
+
     def _pre_render_surfaces(self):
         """Pre-renders all static surfaces that do not change frame-to-frame."""
         self.white_fill_surface, self.white_outline_surface = self._generate_key_surfaces(self.white_key_indices, (255, 255, 255), 5)
@@ -60,9 +101,14 @@ class PianoDisplay:
 
         self.octave_divider_surface = self._generate_octave_dividers()
         self.piano_divider_surface = self._generate_piano_divider()
+
+        # Cached piano layer, recomposited only when key states change
+        self.piano_surface = pygame.Surface((self.piano_width, self.key_height))
+        self._key_sprites: dict[tuple[bool, tuple[int, int, int]], pygame.Surface] = {}
         
         if self.settings.show_play_icon:
             icon_size = (self.settings.key_width * 2, self.settings.key_width * 2)
+            self.icon_rect = pygame.Rect((self.settings.key_width // 8, self.settings.key_width // 8), icon_size)
             self.play_icon = pygame.transform.scale(pygame.image.load(os.path.join(BASE_DIR, "imgs", "play.png")), icon_size)
             self.pause_icon = pygame.transform.scale(pygame.image.load(os.path.join(BASE_DIR, "imgs", "pause.png")), icon_size)
 
@@ -107,90 +153,159 @@ class PianoDisplay:
         if self.settings.show_octave_divider:
             self.surface.blit(self.octave_divider_surface, (0, 0))
 
-    def _draw_scrolling_notes(self, song: Song):
-        """Draws all active scrolling notes."""
-        # Iterate backwards to safely remove items while looping
-        for note in song.active_scrolling_notes:
-            if note.note not in self.key_rects:
-                continue
-
-            base_rect = self.key_rects[note.note]
-            height = note.length * self.scrolling_unit
-            y_pos = note.scroll_percentage * self.scrolling_height - height
-            
-            note_rect = pygame.Rect(base_rect.x, y_pos, base_rect.w, height)
-            
-            colour = self.settings.channel_colours[note.channel].scrolling_note_colour
-            pygame.draw.rect(self.surface, colour, note_rect, border_radius=5)
-            pygame.draw.rect(self.surface, (0, 0, 0), note_rect, border_radius=5, width=1)
-
-    def _draw_piano(self, song: Song | None):
-        """Draws the piano itself, including all actively coloured keys."""
-        # Draws white key backgrounds
-        self.surface.blit(self.white_fill_surface, self.piano_position)
+    def _draw_scrolling_notes(self, song: 'Song'):
+        """Draws all visible scrolling notes from the pre-rendered piano roll tiles."""
+        self.piano_roll.draw(self.surface, song.note_table, song.time, self.scrolling_height, song.analytics)
 
-        # Draws active white keys
-        if song:
-            for key in self.white_key_indices:
-                note = key + 21
-                channel, pressed = song.notes_pressed[note]
-                if not pressed:
-                    continue
-                rect = self.key_rects[key]
-                colour = self.settings.channel_colours[channel].white_key_pressed_colour
-                pygame.draw.rect(
-                    self.surface, colour, rect.move(self.piano_position), 
-                    border_bottom_left_radius=5, border_bottom_right_radius=5
-                )
+    def _pressed_key_sprite(self, key: int, colour: tuple[int, int, int]) -> pygame.Surface:
+        """Returns a pre-rendered surface of the given key pressed in the given colour."""
+        # All white keys share a shape, as do all black keys, so sprites are shared between them
+        black = key in self.black_key_indices
+        if (black, colour) not in self._key_sprites:
+            sprite = pygame.Surface(self.key_rects[key].size, pygame.SRCALPHA)
+            border = 2 if black else 5
+            pygame.draw.rect(
+                sprite, colour, sprite.get_rect(),
+                border_bottom_left_radius=border, border_bottom_right_radius=border
+            )
+            self._key_sprites[(black, colour)] = sprite
+        return self._key_sprites[(black, colour)]
 
-        # Draws white key outlines
-        self.surface.blit(self.white_outline_surface, self.piano_position)
+    def _composite_piano(self, key_states: list[int | None], rect: pygame.Rect):
+        """Recomposites the cached piano layer within the given region, relative to the piano."""
+        surface = self.piano_surface
+        surface.set_clip(rect)
 
-        # Draws black key background
-        self.surface.blit(self.black_fill_surface, self.piano_position)
+        # Draws the background visible around the key corners
+        surface.fill(self.settings.background_colour)
+        if self.settings.show_octave_divider:
+            surface.blit(self.octave_divider_surface, (0, -self.scrolling_height))
 
-        # Draws active black keys
-        if song:
-            for key in self.black_key_indices:
-                note = key + 21
-                channel, pressed = song.notes_pressed[note]
-                if not pressed:
+        # Draws white keys, followed by black keys on top
+        channel_colours = self.settings.channel_colours
+        for key_indices, fill_surface, outline_surface, black in (
+            (self.white_key_indices, self.white_fill_surface, self.white_outline_surface, False),
+            (self.black_key_indices, self.black_fill_surface, self.black_outline_surface, True),
+        ):
+            surface.blit(fill_surface, (0, 0))
+            for key in key_indices:
+                channel = key_states[key]
+                if channel is None:
                     continue
-                rect = self.key_rects[key]
-                colour = self.settings.channel_colours[channel].black_key_pressed_colour
-                pygame.draw.rect(
-                    self.surface, colour, rect.move(self.piano_position), 
-                    border_bottom_left_radius=2, border_bottom_right_radius=2
-                )
-                
-        # Draws black key outlines
-        self.surface.blit(self.black_outline_surface, self.piano_position)
+                colours = channel_colours[channel]
+                colour = colours.black_key_pressed_colour if black else colours.white_key_pressed_colour
+                surface.blit(self._pressed_key_sprite(key, colour), self.key_rects[key])
+            surface.blit(outline_surface, (0, 0))
 
         # Draws piano divider
         if self.settings.show_piano_divider:
-            self.surface.blit(self.piano_divider_surface, self.piano_position)
+            surface.blit(self.piano_divider_surface, (0, 0))
+
+        surface.set_clip(None)
 
-    def _draw_ui(self, song: Song):
+    def _draw_piano(self):
+        """Draws the cached piano layer, including all actively coloured keys."""
+        self.surface.blit(self.piano_surface, self.piano_position)
+
+    def _draw_ui(self, song: 'Song'):
         """Draws UI elements like the play/pause icon."""
         icon = self.play_icon if song.playing else self.pause_icon
-        pos = (self.settings.key_width // 8, self.settings.key_width // 8)
-        self.surface.blit(icon, pos)
+        self.surface.blit(icon, self.icon_rect)
+
+    def invalidate(self):
+        """Forces the entire display to be redrawn on the next frame."""
+        self._redraw_all = True
+
+    def _key_states(self, song: 'Song | None') -> list[int | None]:
+        """Returns the channel pressing each of the 88 keys, or None for keys that aren't pressed."""
+        if not song:
+            return [None] * 88
+        states = []
+        for key in range(88):
+            channel, pressed = song.notes_pressed.get(key + 21, (0, False))
+            states.append(channel if pressed else None)
+        return states
+
+    def _find_dirty_rects(self, song: 'Song | None', target: pygame.Surface, pos: tuple[int, int]) -> list[pygame.Rect]:
+        """Compares the song's state against the last drawn frame to find the regions that need redrawing."""
+        key_states = self._key_states(song)
+        song_time = song.time if song else 0.0
+        playing = bool(song and song.playing)
+
+        if self._redraw_all or song is not self._last_song or (target, pos) != self._last_target:
+            dirty_rects = [self.scrolling_rect, self.piano_rect]
+        else:
+            dirty_rects = []
+
+            # Redraws the scrolling area if time has moved, or just the icon if it has changed
+            if song_time != self._last_song_time:
+                dirty_rects.append(self.scrolling_rect)
+            elif playing != self._last_playing and self.settings.show_play_icon:
+                dirty_rects.append(self.icon_rect)
+
+            # Redraws the smallest region containing all keys whose state has changed
+            changed_keys = [
+                self.key_rects[key].move(self.piano_position)
+                for key in range(88) if key_states[key] != self._last_key_states[key]
+            ]
+            if changed_keys:
+                dirty_rects.append(changed_keys[0].unionall(changed_keys[1:]))
+
+        self._redraw_all = False
+        self._last_target = (target, pos)
+        self._last_song = song
+        self._last_song_time = song_time
+        self._last_playing = playing
+        self._last_key_states = key_states
+        return dirty_rects
+
+    def _draw_region(self, song: 'Song | None', rect: pygame.Rect):
+        """Redraws everything that overlaps the given region of the display surface."""
+        # The piano roll tiles and piano layer include the background, so it is only drawn when neither covers it
+        if not (song and self.settings.scrolling_notes):
+            self.surface.set_clip(rect.clip(self.scrolling_rect))
+            self._draw_background()
+        self.surface.set_clip(rect)
 
-    def draw(self, target: pygame.Surface, song: Song | None, pos: tuple[int, int] = (0, 0)):
-        """
-        Draws the entire piano display for a given song to a target surface.
-        This is the main rendering method called every frame.
-        """
-        self._draw_background()
-        
         if song:
-            if self.settings.scrolling_notes:
+            if self.settings.scrolling_notes and rect.colliderect(self.scrolling_rect):
+                # Scrolling notes are clipped to the scrolling area so they never overlap the piano
+                self.surface.set_clip(rect.clip(self.scrolling_rect))
                 self._draw_scrolling_notes(song)
-            self._draw_piano(song)
-            if self.settings.show_play_icon:
+                self.surface.set_clip(rect)
+            if rect.colliderect(self.piano_rect):
+                self._draw_piano()
+            if self.settings.show_play_icon and rect.colliderect(self.icon_rect):
                 self._draw_ui(song)
-        else:
+        elif rect.colliderect(self.piano_rect):
             # If no song, draws a static, empty piano
-            self._draw_piano(None)
+            self._draw_piano()
+
+        self.surface.set_clip(None)
+
+    def draw(self, target: pygame.Surface, song: 'Song | None', pos: tuple[int, int] = (0, 0)) -> list[pygame.Rect]:
+        """
+        Draws the piano display for a given song to a target surface, only redrawing
+        the regions that have changed since the last frame.
+        This is the main rendering method called every frame.
+
+        Returns the list of regions of the target surface that were updated,
+        which can be passed to `pygame.display.update`.
+        """
+        dirty_rects = self._find_dirty_rects(song, target, pos)
+
+        # Recomposites the piano layer where keys have changed
+        for rect in dirty_rects:
+            if rect.colliderect(self.piano_rect):
+                piano_region = rect.clip(self.piano_rect).move(-self.piano_rect.x, -self.piano_rect.y)
+                self._composite_piano(self._last_key_states, piano_region)
+
+        for rect in dirty_rects:
+            self._draw_region(song, rect)
 
-        target.blit(self.surface, pos)
+        # Copies only the changed regions to the target
+        target_rects = []
+        for rect in dirty_rects:
+            target_rects.append(target.blit(self.surface, rect.move(pos), rect))
+        self.pixels_pushed = sum(rect.w * rect.h for rect in target_rects)
+        return target_rects
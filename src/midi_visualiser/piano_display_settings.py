@@ -67,6 +67,19 @@ class PianoDisplaySettings:
     scrolling_notes: bool = True
     """If True, scrolling notes will be displayed."""
 
+    tile_seconds: float = 1.0
+    """The span of song time in seconds covered by each pre-rendered tile of 
+    the scrolling piano roll."""
+
+    max_cached_tiles: int = 8
+    """The maximum number of pre-rendered piano roll tiles kept in memory. 
+    Tiles that have already scrolled past the piano are always discarded."""
+
+    lod_note_threshold: int = 4000
+    """The number of notes on screen above which scrolling notes are drawn as 
+    a flat raster of each key's occupancy, coloured by channel, instead of as 
+    individual outlined notes, which can't be distinguished at that density."""
+
     show_piano_divider: bool = True
     """If True, a horizontal line is drawn separating the piano from the 
     scrolling note area."""
@@ -0,0 +1,255 @@
+import math
+import numpy as np
+import pygame
+from collections import OrderedDict
+from .note_table import NoteTable
+from .piano_display_settings import PianoDisplaySettings
+from .song_analytics import SongAnalytics
+
+class PianoRollTiles:
+    """
+    Class which rasterises a song's piano roll ahead of time into tall tiles, each
+    covering a fixed span of song time, so scrolling notes can be drawn with a few blits.
+
+    When a song's analytics show a heavy passage ahead, its tiles are rendered early, one on each
+    frame that doesn't otherwise render a tile, and the cache is enlarged to hold the whole passage,
+    so the cost of rendering dense tiles is spread over the lighter frames before it arrives.
+    """
+
+    PREPARE_NOTE_THRESHOLD = 1000
+    """The number of notes on screen above which a tile is rendered ahead of time."""
+
+    MAX_PREPARED_TILES = 32
+    """The maximum number of tiles the cache is enlarged to hold for a heavy passage."""
+
+    def __init__(
+        self, settings: PianoDisplaySettings, width: int, scrolling_unit: float,
+        key_x: np.ndarray, key_w: np.ndarray, octave_positions: list[int]
+    ) -> None:
+        """Initialises the tile cache for a scrolling area with the given dimensions and key layout."""
+        self.settings = settings
+        self.width = width
+        self.scrolling_unit = scrolling_unit
+        self.key_x = key_x
+        self.key_w = key_w
+
+        # Rounds the tile height to whole pixels so consecutive tiles line up exactly
+        self.tile_height = max(1, round(settings.tile_seconds * scrolling_unit))
+        self.tile_seconds = self.tile_height / scrolling_unit
+
+        self.background = self._generate_background(octave_positions)
+        self._column_keys = self._generate_column_keys()
+        self._divider_columns = [x for x in octave_positions if 0 <= x < width] if settings.show_octave_divider else []
+        self._note_table: NoteTable | None = None
+        self._tiles: OrderedDict[int, pygame.Surface] = OrderedDict()
+
+        self.cache_size = settings.max_cached_tiles
+        """The maximum number of tiles kept in memory for the current song."""
+
+        self.tiles_rendered = 0
+        """The total number of tiles rendered."""
+
+        self._heavy_tiles = np.empty(0, dtype=np.int64)
+
+    def _generate_background(self, octave_positions: list[int]) -> pygame.Surface:
+        """Generates the empty tile background, including octave dividers."""
+        surface = pygame.Surface((self.width, self.tile_height))
+        surface.fill(self.settings.background_colour)
+        if self.settings.show_octave_divider:
+            for x_pos in octave_positions:
+                pygame.draw.line(surface, self.settings.octave_divider_colour, (x_pos, 0), (x_pos, self.tile_height))
+        return surface
+
+    def _generate_column_keys(self) -> np.ndarray:
+        """
+        Finds the key above each pixel column of the scrolling area, with the narrower black keys
+        in a second layer over the white keys. Columns without a key use the index 88.
+        """
+        columns = np.full((2, self.width), 88, dtype=np.int64)
+        layers = (self.key_w < self.key_w.max()).astype(np.int64)
+        for key in range(88):
+            left = max(self.key_x[key], 0)
+            columns[layers[key], left:self.key_x[key] + self.key_w[key]] = key
+        return columns
+
+    def _rasterise_notes(
+        self, tile: pygame.Surface, keys: np.ndarray, channels: np.ndarray, y_positions: np.ndarray, heights: np.ndarray
+    ) -> None:
+        """Draws notes onto a tile as a raster of the channel occupying each key at each pixel row, in a single blit."""
+        # Every note covers at least one row, so even the shortest notes stay visible
+        tops = np.clip(np.floor(y_positions).astype(np.int64), 0, self.tile_height)
+        bottoms = np.clip(np.maximum(np.floor(y_positions + heights).astype(np.int64), tops + 1), 0, self.tile_height)
+
+        # Counts the notes of each channel covering each key and row, from the rows where notes start and stop
+        present_channels, channel_indices = np.unique(channels, return_inverse=True)
+        channel_count = len(present_channels)
+        rows = self.tile_height + 1
+        offsets = (channel_indices * 89 + keys) * rows
+        coverage = (
+            np.bincount(offsets + tops, minlength=channel_count * 89 * rows)
+            - np.bincount(offsets + bottoms, minlength=channel_count * 89 * rows)
+        )
+        occupied = np.cumsum(coverage.reshape(channel_count, 89, rows), axis=2)[:, :, :-1] > 0
+
+        # Finds the highest channel occupying each key and row, offsetting black keys so they take priority
+        owners = (occupied * np.arange(1, channel_count + 1)[:, None, None]).max(axis=0).astype(np.uint8)
+        black_owners = owners + np.uint8(channel_count) * (owners > 0)
+        pixel_owners = np.maximum(
+            np.take(owners, self._column_keys[0], axis=0),
+            np.take(black_owners, self._column_keys[1], axis=0)
+        )
+
+        # Maps owners to colours, then restores the octave dividers wherever no note covers them
+        channel_colours = self.settings.channel_colours
+        colours = [tile.map_rgb(channel_colours[c].scrolling_note_colour) for c in present_channels.tolist()]
+        palette = np.array([tile.map_rgb(self.settings.background_colour)] + colours + colours, dtype=np.uint32)
+        pixels = np.take(palette, pixel_owners)
+        divider = tile.map_rgb(self.settings.octave_divider_colour)
+        for x in self._divider_columns:
+            pixels[x][pixel_owners[x] == 0] = divider
+        pygame.surfarray.blit_array(tile, pixels)
+
+    def _render_tile(self, index: int) -> pygame.Surface:
+        """Rasterises all notes overlapping the tile's span of song time onto a new surface."""
+        self.tiles_rendered += 1
+        tile = self.background.copy()
+        top_time = (index + 1) * self.tile_seconds
+
+        notes = self._note_table.visible(top_time, self.tile_seconds)
+        notes = notes[(notes["key"] >= 0) & (notes["key"] < 88)]
+
+        # Calculates all note rectangles within the tile in one vectorized step
+        keys = notes["key"]
+        heights = notes["length"] * self.scrolling_unit
+        y_positions = (top_time - notes["end"]) * self.scrolling_unit
+
+        # Rasterises tiles dense enough to put too many notes on screen to draw individually
+        if len(notes) * self.settings.note_time / self.tile_seconds > self.settings.lod_note_threshold:
+            self._rasterise_notes(tile, keys, notes["channel"], y_positions, heights)
+            return tile
+
+        channel_colours = self.settings.channel_colours
+        for x, y, w, h, channel in zip(
+            self.key_x[keys].tolist(), y_positions.tolist(), self.key_w[keys].tolist(),
+            heights.tolist(), notes["channel"].tolist()
+        ):
+            note_rect = pygame.Rect(x, y, w, h)
+            colour = channel_colours[channel].scrolling_note_colour
+            pygame.draw.rect(tile, colour, note_rect, border_radius=5)
+            pygame.draw.rect(tile, (0, 0, 0), note_rect, border_radius=5, width=1)
+
+        return tile
+
+    def _get_tile(self, index: int) -> pygame.Surface:
+        """
+        Returns the tile with the given index, rendering it if it isn't cached.
+        Tiles are only cached once every note within them is known.
+        """
+        if index in self._tiles:
+            return self._tiles[index]
+        tile = self._render_tile(index)
+        if (index + 1) * self.tile_seconds < self._note_table.loaded_until:
+            self._tiles[index] = tile
+        return tile
+
+    def _evict_tiles(self, first_visible: int) -> None:
+        """Removes tiles that have already been played, then the oldest tiles until the cache fits its size limit."""
+        for index in [i for i in self._tiles if i < first_visible]:
+            del self._tiles[index]
+        while len(self._tiles) > self.cache_size:
+            self._tiles.popitem(last=False)
+
+    def _plan_heavy_tiles(self, analytics: SongAnalytics | None, height: float) -> None:
+        """Finds the tiles of a song's heavy passages, and sizes the cache to hold the longest along with the visible tiles."""
+        self.cache_size = self.settings.max_cached_tiles
+        self._heavy_tiles = np.empty(0, dtype=np.int64)
+        if analytics is None:
+            return
+
+        heavy = analytics.notes_on_screen_per_span(self.tile_seconds) > self.PREPARE_NOTE_THRESHOLD
+        self._heavy_tiles = np.flatnonzero(heavy)
+        if len(self._heavy_tiles) == 0:
+            return
+
+        # Finds the longest run of consecutive heavy tiles from where each run starts and ends
+        run_edges = np.flatnonzero(np.diff(np.concatenate(([0], heavy.astype(np.int8), [0]))))
+        longest_run = int((run_edges[1::2] - run_edges[::2]).max())
+        visible_tiles = math.ceil(height / self.tile_height) + 1
+        self.cache_size = max(self.cache_size, min(visible_tiles + longest_run + 1, self.MAX_PREPARED_TILES))
+
+    def _prepare_heavy_tile(self, first: int, last: int) -> None:
+        """Renders the next heavy tile ahead of the playhead that isn't cached, if there is one that will fit in the cache."""
+        ahead = self._heavy_tiles[np.searchsorted(self._heavy_tiles, last + 2):]
+        for index in ahead[ahead < first + self.cache_size].tolist():
+            if index not in self._tiles and (index + 1) * self.tile_seconds < self._note_table.loaded_until:
+                self._get_tile(index)
+                return
+
+    def tiles(
+        self, note_table: NoteTable, time: float, height: float, analytics: SongAnalytics | None = None
+    ) -> list[tuple[pygame.Surface, int]]:
+        """Returns the tiles visible at the given song time, rendering any that aren't cached.
+
+        Parameters
+        ----------
+        note_table : NoteTable
+            The note table of the song being drawn.
+        time : float
+            The song time in seconds shown at the top of the scrolling area.
+        height : float
+            The height in pixels of the scrolling area.
+        analytics : SongAnalytics | None
+            The analytics of the song being drawn, used to render heavy passages ahead of time, if it has them.
+
+        Returns
+        -------
+        list[tuple[pygame.Surface, int]]
+            Each visible tile with the y position of its top edge within the scrolling area.
+        """
+        # Clears the cache when the song changes
+        if note_table is not self._note_table:
+            self._note_table = note_table
+            self._tiles.clear()
+            self._plan_heavy_tiles(analytics, height)
+        tiles_rendered = self.tiles_rendered
+
+        bottom_time = time - height / self.scrolling_unit
+        first = math.floor(bottom_time / self.tile_seconds)
+        last = math.floor(time / self.tile_seconds)
+        self._evict_tiles(first)
+
+        visible_tiles = []
+        for index in range(first, last + 1):
+            y = round((time - (index + 1) * self.tile_seconds) * self.scrolling_unit)
+            visible_tiles.append((self._get_tile(index), y))
+
+        # Renders the next tile just ahead of the playhead so it is ready before it scrolls into view, if it can be cached
+        if (last + 2) * self.tile_seconds < note_table.loaded_until:
+            self._get_tile(last + 1)
+
+        # Renders a tile of an upcoming heavy passage instead on frames that haven't rendered one
+        if self.tiles_rendered == tiles_rendered and len(self._heavy_tiles):
+            self._prepare_heavy_tile(first, last)
+        return visible_tiles
+
+    def draw(
+        self, surface: pygame.Surface, note_table: NoteTable, time: float, height: float,
+        analytics: SongAnalytics | None = None
+    ) -> None:
+        """Draws the piano roll for the given song time by blitting the visible tiles.
+
+        Parameters
+        ----------
+        surface : pygame.Surface
+            The surface to draw to, whose top edge shows the given time.
+        note_table : NoteTable
+            The note table of the song being drawn.
+        time : float
+            The song time in seconds shown at the top of the scrolling area.
+        height : float
+            The height in pixels of the scrolling area.
+        analytics : SongAnalytics | None
+            The analytics of the song being drawn, if it has them.
+        """
+        for tile, y in self.tiles(note_table, time, height, analytics):
+            surface.blit(tile, (0, y))
@@ -0,0 +1,139 @@
+import mido
+import numpy as np
+from dataclasses import dataclass, field
+from .message_table import MessageTable
+
+SETTING_TYPES = {0xC0: "program_change", 0xD0: "aftertouch", 0xE0: "pitchwheel"}
+"""The type of each channel message, by the upper half of its status byte, stored as a single setting of its channel."""
+
+@dataclass
+class PlaybackState:
+    """Data class representing a snapshot of a song's playback state, used as a seeking checkpoint."""
+
+    message_index: int = 0
+    """The index of the next message to be processed."""
+
+    notes_pressed: dict[int, tuple[int, bool]] = field(default_factory=dict)
+    """The channel and pressed state of each note that has been played so far."""
+
+    held_notes: dict[int, mido.Message] = field(default_factory=dict)
+    """The note on messages for all notes currently held down, keyed by note."""
+
+    channel_messages: dict[tuple, mido.Message] = field(default_factory=dict)
+    """The most recent program, control and pitch messages for each channel,
+    needed to restore the sound of the song after seeking."""
+
+    def apply(self, msg: mido.Message) -> None:
+        """Updates the state with the effects of a single MIDI message."""
+        if msg.is_meta:
+            return
+
+        if msg.type.startswith("note"):
+            pressed = msg.type == "note_on" and msg.velocity > 0
+            self.notes_pressed[msg.note] = (msg.channel, pressed)
+            if pressed:
+                self.held_notes[msg.note] = msg
+            else:
+                self.held_notes.pop(msg.note, None)
+        elif msg.type == "control_change":
+            self.channel_messages[(msg.channel, msg.type, msg.control)] = msg
+        elif msg.type in SETTING_TYPES.values():
+            self.channel_messages[(msg.channel, msg.type)] = msg
+
+    def copy(self) -> 'PlaybackState':
+        """Returns an independent copy of this playback state."""
+        return PlaybackState(
+            message_index=self.message_index,
+            notes_pressed=self.notes_pressed.copy(),
+            held_notes=self.held_notes.copy(),
+            channel_messages=self.channel_messages.copy(),
+        )
+
+    @staticmethod
+    def from_message_table(message_table: MessageTable, indices: list[int]) -> list['PlaybackState']:
+        """Computes the playback states before each of the given messages directly from a message table's columns.
+
+        This gives the same states as applying every earlier message in turn, but only the messages
+        which are still in effect at each index are converted to Mido messages.
+
+        Parameters
+        ----------
+        message_table : MessageTable
+            The song's playable MIDI messages.
+        indices : list[int]
+            The indices of the messages to compute the states before, in increasing order.
+
+        Returns
+        -------
+        list[PlaybackState]
+            The playback state before each of the given messages.
+        """
+        statuses = message_table.statuses
+        kinds = statuses & 0xF0
+        message_count = len(message_table)
+
+        # Groups the messages by what they change: a key, a channel's controller, or another channel setting
+        groups = np.full(message_count, -1, dtype=np.int64)
+        notes = message_table.note_on | message_table.note_off
+        controls = kinds == 0xB0
+        settings = np.isin(kinds, list(SETTING_TYPES))
+        groups[notes] = message_table.data1[notes]
+        groups[controls] = 128 + (statuses[controls].astype(np.int64) & 0x0F) * 128 + message_table.data1[controls]
+        groups[settings] = 128 + 16 * 128 + statuses[settings].astype(np.int64)
+
+        # Sorts the messages by group and then index, so the last of each group before an index can be searched for
+        rows = np.flatnonzero(groups >= 0)
+        rows = rows[np.argsort(groups[rows], kind='stable')]
+        row_groups = groups[rows]
+        codes = row_groups * message_count + rows
+        present, first_positions = np.unique(row_groups, return_index=True)
+
+        # Finds the last message of every group before each index, ordering groups by when they first appear
+        order = np.argsort(rows[first_positions], kind='stable')
+        present, first_positions = present[order], first_positions[order]
+        targets = present[None, :] * message_count + np.asarray(indices, dtype=np.int64)[:, None]
+        positions = np.searchsorted(codes, targets) - 1
+        in_effect = positions >= first_positions[None, :]
+        last_rows = np.where(in_effect, rows[np.maximum(positions, 0)], -1)
+
+        # Finds the press that started each key's current hold, as pressing a held key again doesn't reorder it
+        pressed = message_table.note_on[rows]
+        held_before = np.concatenate(([False], pressed[:-1] & (row_groups[1:] == row_groups[:-1])))
+        hold_starts = pressed & ~held_before
+        hold_start_rows = rows[np.maximum.accumulate(np.where(hold_starts, np.arange(len(rows)), 0))]
+        held_since = np.where(in_effect, hold_start_rows[np.maximum(positions, 0)], -1)
+
+        channels = (statuses & 0x0F).tolist()
+        kinds = kinds.tolist()
+        data1 = message_table.data1.tolist()
+        note_on = message_table.note_on.tolist()
+        present = present.tolist()
+        messages: dict[int, mido.Message] = {}
+        states = []
+        for index, group_rows, group_held_since in zip(indices, last_rows.tolist(), held_since.tolist()):
+            state = PlaybackState(message_index=index)
+            held = []
+            for group, row, since in zip(present, group_rows, group_held_since):
+                if row < 0:
+                    continue
+                if group < 128:
+                    state.notes_pressed[group] = (channels[row], note_on[row])
+                    if note_on[row]:
+                        held.append((since, group, row))
+                    continue
+
+                # Messages still in effect at several indices are only converted once
+                if row not in messages:
+                    messages[row] = message_table.message(row)
+                if kinds[row] == 0xB0:
+                    state.channel_messages[(channels[row], "control_change", data1[row])] = messages[row]
+                else:
+                    state.channel_messages[(channels[row], SETTING_TYPES[kinds[row]])] = messages[row]
+
+            # Notes are held in the order they were first pressed
+            for _, note, row in sorted(held):
+                if row not in messages:
+                    messages[row] = message_table.message(row)
+                state.held_notes[note] = messages[row]
+            states.append(state)
+        return states
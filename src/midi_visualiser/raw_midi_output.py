@@ -0,0 +1,28 @@
+import mido
+import pygame.midi
+from mido.backends.pygame import Output as PygameOutput
+
+class RawMidiOutput:
+    """
+    Class which sends raw MIDI message bytes to a Mido output port. Ports opened with
+    Mido's pygame backend are written to directly, so no message objects need to be
+    created; any other port is sent converted Mido messages instead.
+    """
+
+    def __init__(self, port: mido.ports.BaseOutput) -> None:
+        """Initialises the raw output for the given Mido output port."""
+        self.port = port
+        self._device: pygame.midi.Output | None = port._port if isinstance(port, PygameOutput) else None
+
+    def send(self, message_bytes: list[int]) -> None:
+        """Sends a single message given as its raw bytes."""
+        if self._device is None:
+            self.port.send(mido.Message.from_bytes(message_bytes))
+            return
+
+        # Holds the port's lock, as Mido does, so messages from different threads are never interleaved
+        with self.port._lock:
+            if message_bytes[0] == 0xF0:
+                self._device.write_sys_ex(pygame.midi.time(), bytes(message_bytes))
+            else:
+                self._device.write_short(*message_bytes)
@@ -0,0 +1,59 @@
+import time
+import threading
+import mido
+from collections.abc import Callable
+from .midi_file_parser import MidiFileParser
+from .clock import Clock
+
+class ScriptedMidiInput:
+    """
+    Class which stands in for a MIDI input port by replaying the messages of a MIDI file to a
+    callback at their original times, so live input can be tried and tested without an instrument.
+    """
+
+    MAX_SLEEP = 0.05
+    """The maximum time in seconds the thread sleeps for before checking if it has been closed."""
+
+    def __init__(
+        self, file_name: str, callback: Callable[[mido.Message], None], clock: Clock = time.perf_counter
+    ) -> None:
+        """Loads the given MIDI file and starts replaying it to the callback."""
+        self.messages = MidiFileParser(file_name).parse()
+        self.callback = callback
+        self.clock = clock
+
+        # Times the replay from when the input is created, before the thread starts
+        self.start_time = clock()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="scripted-midi-input", daemon=True)
+        self._thread.start()
+
+    @property
+    def finished(self) -> bool:
+        """Whether every message in the file has been replayed."""
+        return not self._thread.is_alive()
+
+    def _run(self) -> None:
+        """Passes each message to the callback once its time arrives, until closed or the end of the file is reached."""
+        messages = self.messages
+        times = messages.times.tolist()
+        start = self.start_time
+        index = 0
+
+        while index < len(times) and not self._stop_event.is_set():
+            # Sleeps until the next message is due
+            wait_time = start + times[index] - self.clock()
+            if wait_time > 0:
+                self._stop_event.wait(min(wait_time, self.MAX_SLEEP))
+                continue
+
+            # Passes on every message that is due, so dense passages arrive in bursts as they would from a port
+            now = self.clock() - start
+            while index < len(times) and times[index] <= now:
+                self.callback(messages.message(index))
+                index += 1
+
+    def close(self) -> None:
+        """Stops replaying the file."""
+        self._stop_event.set()
+        self._thread.join()
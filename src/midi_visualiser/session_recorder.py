@@ -0,0 +1,91 @@
+import os
+import json
+import hashlib
+import pygame
+
+class SessionRecorder:
+    """
+    Class which records everything that drives a visualiser session, so it can be replayed exactly:
+    the songs it could play, the clock time at the start of each frame, the window and key events
+    handled in the frame, whether the selected song finished loading, and whether it was rendered.
+    A hash of the MIDI messages sent and the keys pressed in each frame is also recorded, so a
+    replay can be checked against what the session actually played.
+
+    Sessions are written as JSON, with each frame stored as `[time, events, song_loaded, rendered, output]`
+    and each event as `[type, key]`.
+    """
+
+    VERSION = 2
+    """The version of the session format, checked when a session is replayed."""
+
+    RECORDED_EVENTS = (
+        pygame.QUIT, pygame.KEYDOWN, pygame.WINDOWMOVED,
+        pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED, pygame.VIDEOEXPOSE,
+    )
+    """The types of events which the visualiser handles, and so which are recorded."""
+
+    def __init__(self, path: str) -> None:
+        """Initialises the recorder, which writes the session to the given path when saved."""
+        self.path = path
+        self.path_argument: str | None = None
+        self.song_files: list[str] = []
+        self.streaming = False
+        self.library = False
+        self.frames: list[list] = []
+
+    def begin(self, path_argument: str | None, song_files: list[str], streaming: bool, library: bool) -> None:
+        """Records how the visualiser found and loads its songs, so the replay can do the same."""
+        self.path_argument = path_argument
+        self.song_files = list(song_files)
+        self.streaming = streaming
+        self.library = library
+
+    def record_frame(
+        self, time: float, events: list[pygame.event.Event], song_loaded: bool, rendered: bool, output: str
+    ) -> None:
+        """Records a single frame of the session.
+
+        Parameters
+        ----------
+        time : float
+            The clock time in seconds at the start of the frame.
+        events : list[pygame.event.Event]
+            The events handled in the frame, of which only those the visualiser responds to are kept.
+        song_loaded : bool
+            Whether the selected song finished loading and was switched to in the frame.
+        rendered : bool
+            Whether the frame was rendered, rather than skipped to catch up.
+        output : str
+            The hash of the frame's output, from `hash_frame`.
+        """
+        recorded_events = [
+            [event.type, getattr(event, "key", None)] for event in events if event.type in self.RECORDED_EVENTS
+        ]
+        self.frames.append([time, recorded_events, song_loaded, rendered, output])
+
+    @staticmethod
+    def hash_frame(messages: list[list[int]], notes_pressed: dict[int, tuple[int, bool]]) -> str:
+        """Returns a short hash of the messages sent in a frame and the keys pressed at its end."""
+        frame_hash = hashlib.blake2b(digest_size=8)
+        for message in messages:
+            frame_hash.update(bytes(message) + b"\xff")
+        pressed = sorted((note, channel) for note, (channel, is_pressed) in notes_pressed.items() if is_pressed)
+        frame_hash.update(repr(pressed).encode())
+        return frame_hash.hexdigest()
+
+    def save(self) -> None:
+        """Writes the recorded session to its path."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        session = {
+            "version": self.VERSION,
+            "pygame": pygame.version.ver,
+            "path": self.path_argument,
+            "song_files": self.song_files,
+            "streaming": self.streaming,
+            "library": self.library,
+            "frames": self.frames,
+        }
+        with open(self.path, "w") as f:
+            json.dump(session, f)
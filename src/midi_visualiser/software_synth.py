@@ -0,0 +1,238 @@
+import os
+import time
+import wave
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from .midi_file_parser import MidiFileParser
+from .note_table import NoteTable
+from .song_cache import SongCache
+
+class SoftwareSynth:
+    """
+    Class which renders a song's notes to audio without a MIDI output, so audio can be produced
+    alongside rendered videos on machines without a synthesiser.
+
+    Each note is a few decaying harmonics with a short attack and a release after the note ends,
+    read from a wavetable with a fixed point phase accumulator. Notes are grouped by how long they
+    sound, and each block of similar notes is synthesised as a single 2D array with one row per
+    note, so the cost per note is a handful of NumPy operations.
+    Long songs can be split into segments of time, which are rendered in parallel by a pool of
+    worker processes and summed.
+    """
+
+    HARMONICS = np.array([1.0, 0.5, 0.25, 0.12, 0.06], dtype=np.float32)
+    """The relative amplitude of each harmonic of a note, starting from the fundamental."""
+
+    TABLE_BITS = 12
+    """The number of bits of a note's phase used to index the wavetables, which each hold one cycle."""
+
+    ATTACK_TIME = 0.005
+    """The time in seconds for a note to reach full volume."""
+
+    RELEASE_TIME = 0.05
+    """The time constant in seconds of a note's decay after it is released."""
+
+    DRUM_CHANNEL = 9
+    """The General MIDI percussion channel, whose notes are given a short decay instead of being sustained."""
+
+    SILENCE = 3e-3
+    """The envelope level below which a note is treated as silent and stops being synthesised."""
+
+    MIN_CLASS_SAMPLES = 4096
+    """The length in samples of the shortest notes grouped together into a block."""
+
+    BLOCK_SAMPLES = 1 << 21
+    """The maximum number of samples synthesised at once in a block of notes, which bounds memory use."""
+
+    def __init__(self, sample_rate: int = 44100, workers: int = 1, segment_seconds: float = 30.0) -> None:
+        """
+        Initialises the synth. With more than one worker, songs longer than a segment are split into
+        segments of the given length, which are rendered in parallel by worker processes.
+        """
+        self.sample_rate = sample_rate
+        self.workers = workers or os.cpu_count() or 1
+        self.segment_seconds = segment_seconds
+
+        # One wavetable for each number of harmonics, so high notes can leave out those that would alias
+        table_size = 1 << self.TABLE_BITS
+        angles = 2 * np.pi * np.arange(table_size) / table_size
+        harmonics = np.array([amplitude * np.sin((h + 1) * angles) for h, amplitude in enumerate(self.HARMONICS)])
+        self.wavetables = np.cumsum(harmonics, axis=0).astype(np.float32).ravel()
+
+    def render(
+        self, note_table: NoteTable, duration: float, velocities: np.ndarray | None = None, start_delay: float = 0.0
+    ) -> np.ndarray:
+        """Renders every note of a song to mono audio.
+
+        Parameters
+        ----------
+        note_table : NoteTable
+            The notes to play.
+        duration : float
+            The length of the song in seconds. The audio continues after it until every note has faded out.
+        velocities : np.ndarray | None
+            The MIDI velocity of each note in the note table, or None to play every note at the same volume.
+        start_delay : float
+            The silence in seconds added before the song, such as the visualiser's starting buffer.
+
+        Returns
+        -------
+        np.ndarray
+            The audio samples as 32-bit floats between -1 and 1.
+        """
+        notes = note_table.notes
+        if velocities is None:
+            velocities = np.full(len(notes), 100, dtype=np.uint8)
+
+        # Calculates each note's pitch, volume and decay, with lower notes ringing for longer
+        midi_notes = notes["key"].astype(np.float64) + 21
+        frequencies = 440.0 * 2.0 ** ((midi_notes - 69) / 12)
+        gains = (np.asarray(velocities, dtype=np.float64) / 127) ** 1.5
+        decay_times = np.interp(midi_notes, (21, 108), (4.0, 0.6))
+        decay_times[notes["channel"] == self.DRUM_CHANNEL] = 0.15
+
+        # Chooses the wavetable with every harmonic below half the sample rate, silencing notes with none
+        harmonic_counts = np.minimum(np.ceil(self.sample_rate / 2 / frequencies) - 1, len(self.HARMONICS))
+        gains[harmonic_counts < 1] = 0
+        table_offsets = (np.maximum(harmonic_counts, 1).astype(np.uint32) - 1) << self.TABLE_BITS
+        phase_steps = np.round(frequencies / self.sample_rate * 2 ** 32) % 2 ** 32
+
+        # Each note sounds until its envelope has decayed to silence, after it is released or while it is held
+        fade = -np.log(self.SILENCE)
+        sounding = np.minimum(notes["length"] + self.RELEASE_TIME * fade, decay_times * fade)
+        note_data = (
+            np.round((notes["start"] + start_delay) * self.sample_rate).astype(np.int64),
+            np.ceil(sounding * self.sample_rate).astype(np.int64) + 1,
+            notes["length"].astype(np.float32),
+            phase_steps.astype(np.uint32),
+            table_offsets,
+            gains.astype(np.float32),
+            (1 / decay_times).astype(np.float32),
+        )
+        total_samples = int(np.ceil((duration + start_delay) * self.sample_rate))
+        if len(notes):
+            total_samples = max(total_samples, int((note_data[0] + note_data[1]).max()))
+
+        # Renders segments of the song in parallel, each containing the notes that start within it
+        segment_samples = max(1, int(self.segment_seconds * self.sample_rate))
+        segment_count = -(-total_samples // segment_samples)
+        if self.workers < 2 or segment_count < 2:
+            segments = [self._render_segment(note_data)]
+        else:
+            segment_indices = note_data[0] // segment_samples
+            tasks = []
+            for segment in range(segment_count):
+                selected = segment_indices == segment
+                if selected.any():
+                    tasks.append(tuple(column[selected] for column in note_data))
+            workers = min(self.workers, len(tasks))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                segments = list(executor.map(self._render_segment, tasks))
+
+        # Mixes the segments, then normalises the peak volume
+        samples = np.zeros(total_samples, dtype=np.float32)
+        for offset, segment_audio in segments:
+            samples[offset:offset + len(segment_audio)] += segment_audio
+        peak = np.abs(samples).max() if len(samples) else 0
+        if peak > 0:
+            samples *= 0.9 / peak
+        return samples
+
+    def _render_segment(self, note_data: tuple[np.ndarray, ...]) -> tuple[int, np.ndarray]:
+        """Renders the given notes into a buffer, returning the sample it starts at and its samples."""
+        starts, lengths, *note_parameters = note_data
+        if len(starts) == 0:
+            return 0, np.zeros(0, dtype=np.float32)
+        offset = int(starts.min())
+        audio = np.zeros(int((starts + lengths).max()) - offset, dtype=np.float32)
+
+        # Groups notes into classes of similar length, so little is wasted padding them to the same length
+        classes = np.ceil(2 * np.log2(np.maximum(lengths / self.MIN_CLASS_SAMPLES, 1))).astype(np.int64)
+        for k in np.unique(classes).tolist():
+            indices = np.flatnonzero(classes == k)
+            class_length = int(lengths[indices].max())
+            block_size = max(1, self.BLOCK_SAMPLES // class_length)
+            for first in range(0, len(indices), block_size):
+                block = indices[first:first + block_size]
+                notes = self._synthesise(class_length, *(parameter[block] for parameter in note_parameters))
+                for row, start, length in zip(notes, (starts[block] - offset).tolist(), lengths[block].tolist()):
+                    audio[start:start + length] += row[:length]
+        return offset, audio
+
+    def _synthesise(
+        self, length: int, held_times: np.ndarray, phase_steps: np.ndarray,
+        table_offsets: np.ndarray, gains: np.ndarray, decay_rates: np.ndarray
+    ) -> np.ndarray:
+        """Synthesises a block of notes as a 2D array of samples, with one row per note padded to the given length."""
+        sample_indices = np.arange(length, dtype=np.uint32)
+
+        # Reads each note's wavetable at its phase, which wraps around as the unsigned integers overflow
+        phases = sample_indices[None, :] * phase_steps[:, None]
+        phases >>= 32 - self.TABLE_BITS
+        if table_offsets.any():
+            phases += table_offsets[:, None]
+        tone = self.wavetables[phases]
+
+        # Applies the decay while held and the faster decay once released as a single exponential
+        t = sample_indices.astype(np.float32) / np.float32(self.sample_rate)
+        exponent = t[None, :] * decay_rates[:, None]
+        released = t[None, :] - held_times[:, None]
+        np.maximum(released, 0, out=released)
+        released *= np.float32(1 / self.RELEASE_TIME)
+        exponent += released
+        np.negative(exponent, out=exponent)
+        np.exp(exponent, out=exponent)
+        exponent *= gains[:, None]
+        tone *= exponent
+
+        # Fades each note in over the attack, to avoid clicks
+        attack_samples = min(length, max(1, int(self.ATTACK_TIME * self.sample_rate)))
+        tone[:, :attack_samples] *= np.linspace(0, 1, attack_samples, endpoint=False, dtype=np.float32)
+        return tone
+
+    def render_file(
+        self, midi_path: str, output_path: str, start_delay: float = 0.0, cache: SongCache | None = None
+    ) -> dict[str, float]:
+        """Renders a MIDI file to a WAV file and returns throughput statistics.
+
+        Parameters
+        ----------
+        midi_path : str
+            The path to the MIDI file to render.
+        output_path : str
+            The path of the WAV file to write.
+        start_delay : float
+            The silence in seconds added before the song.
+        cache : SongCache | None
+            The cache of preprocessed songs to load the song from, if given.
+
+        Returns
+        -------
+        dict[str, float]
+            The length of the audio in seconds, the elapsed wall time, and the speed relative to real time.
+        """
+        start_time = time.perf_counter()
+        key = cache.key(midi_path) if cache else None
+        if cache and (cached := cache.load(key)):
+            message_table, note_table = cached
+        else:
+            message_table = MidiFileParser(midi_path).parse()
+            note_table = NoteTable.from_message_table(message_table)
+
+        # Note tables list notes in the order of their note on messages, so velocities line up with them
+        velocities = message_table.data2[message_table.note_on]
+        samples = self.render(note_table, message_table.duration, velocities, start_delay)
+        self.write_wav(output_path, samples)
+        elapsed = time.perf_counter() - start_time
+
+        audio_seconds = len(samples) / self.sample_rate
+        return {"seconds": audio_seconds, "elapsed": elapsed, "realtime_factor": audio_seconds / elapsed}
+
+    def write_wav(self, output_path: str, samples: np.ndarray) -> None:
+        """Writes mono samples between -1 and 1 to a 16-bit WAV file."""
+        pcm = np.clip(samples * 32767, -32768, 32767).astype("<i2")
+        with wave.open(output_path, "wb") as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(self.sample_rate)
+            f.writeframes(pcm.tobytes())
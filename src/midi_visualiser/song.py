@@ -1,128 +1,195 @@
 import mido
 import time
-from collections import defaultdict
+import numpy as np
+from bisect import bisect_right
 from .piano_display_settings import PianoDisplaySettings
-from .scrolling_note import ScrollingNote
+from .message_table import MessageTable
+from .midi_file_parser import MidiFileParser
+from .note_table import NoteTable
+from .playback_state import PlaybackState
+from .song_cache import SongCache
+from .song_analytics import SongAnalytics
+from .midi_scheduler import MidiScheduler
+from .raw_midi_output import RawMidiOutput
+from .clock import Clock
 
 class Song:
     """Class representing a song loaded from a MIDI file."""
 
-    def __init__(self, file_name: str, audio_output: mido.ports.IOPort, display_settings: PianoDisplaySettings) -> None:
-        """Initialises the Song object by loading and processing the given MIDI file."""
+    CHECKPOINT_INTERVAL = 5.0
+    """The interval in seconds between stored playback state checkpoints used for seeking."""
+
+    is_live = False
+    """Whether notes are being played live, rather than read from a file."""
+
+    def __init__(
+        self, file_name: str, audio_output: mido.ports.IOPort, display_settings: PianoDisplaySettings,
+        clock: Clock = time.perf_counter, cache: SongCache | None = None,
+        threaded_output: bool = False
+    ) -> None:
+        """
+        Initialises the Song object by loading and processing the given MIDI file.
+        If `threaded_output` is True, MIDI messages are sent at their exact times by
+        a scheduler thread, rather than when the song is updated each frame.
+        """
         self.audio_output = audio_output
+        self.raw_output = RawMidiOutput(audio_output)
         self.display_settings = display_settings
-        self.midi_file = mido.MidiFile(file_name, clip=True)
+        self.clock = clock
+        self.scheduler = MidiScheduler(self, clock) if threaded_output else None
 
-        self.messages: list[mido.Message] = []
-        
-        self.scrolling_notes: list[ScrollingNote] = []
-        self.active_scrolling_notes: list[ScrollingNote] = []
-        self.notes_pressed = defaultdict(lambda : (0, False))
+        # The clock time and song time at the last update, used by the scheduler to time messages
+        self.time_reference: tuple[float, float] | None = None
+
+        # Delays the song start so notes can scroll to the piano
+        self.buffer_time = display_settings.note_time
+        self._initialise_song_data(file_name, cache)
 
+        # Analyses how heavy the song is over time, so heavy passages can be prepared for before they arrive
+        self.analytics = self._analyse()
+
+        self.notes_pressed: dict[int, tuple[int, bool]] = {}
+        self._checkpoints: list[PlaybackState] | None = None
+
+        # Resets progress without touching the audio output, so songs can be loaded on any thread
         self.playing = False
-        self._initialise_song_data()
-        self.reset()
+        self._clear_progress()
 
     def __len__(self) -> int:
         """Returns the number of MIDI messages in the song."""
-        return len(self.messages)
+        return len(self.message_table)
     
     def __getitem__(self, index: int) -> mido.Message:
         """Returns the message at a given index."""
-        return self.messages[index]
-    
-    def __next__(self) -> mido.Message:
-        """Returns the next message to execute based on the current message index."""
-        return self[self._message_index]
+        return self.message_table.message(index)
+
+    @property
+    def duration(self) -> float:
+        """The total length of the song in seconds, including the starting buffer."""
+        return self.buffer_time + self.message_table.duration
+
+    @property
+    def nbytes(self) -> int:
+        """The approximate memory used by the song's preprocessed data, in bytes."""
+        return self.message_table.nbytes + self.note_table.nbytes
+
+    @property
+    def checkpoints(self) -> list[PlaybackState]:
+        """Snapshots of the song's playback state at regular intervals, generated on first use."""
+        if self._checkpoints is None:
+            self._checkpoints = self._generate_checkpoints()
+        return self._checkpoints
+
+    def _initialise_song_data(self, file_name: str, cache: SongCache | None) -> None:
+        """Loads the message and note tables representing the song data, using the cache if given."""
+        key = cache.key(file_name) if cache else None
+        if cache and (cached := cache.load(key)):
+            self.message_table, self.note_table = cached
+            return
 
-    def _initialise_song_data(self) -> None:
-        """Generates messages and scrolling notes lists to represent the song data."""
-        # Prepends a buffer message to delay the song start so notes can scroll to the piano
-        buffer_time = self.display_settings.note_time
-        self.messages = [mido.Message('note_off', time=buffer_time)] + list(self.midi_file)
+        # Parses the MIDI file and compiles its messages and notes
+        self.message_table = MidiFileParser(file_name).parse()
+        self.note_table = NoteTable.from_message_table(self.message_table)
+        if cache:
+            cache.store(key, self.message_table, self.note_table)
 
-        # Generates scrolling note data
-        if self.display_settings.scrolling_notes:
-            self.scrolling_notes = self._generate_scrolling_notes()
+    def _analyse(self) -> SongAnalytics | None:
+        """Analyses the song's notes and messages ahead of time."""
+        return SongAnalytics.from_tables(self.message_table, self.note_table, self.display_settings.note_time)
 
-    def _generate_scrolling_notes(self) -> list[ScrollingNote]:
+    def message_chunk(self, index: int) -> tuple[int, MessageTable] | None:
         """
-        Pre-processes MIDI messages to gnereate a list of all notes with
-        their start times and calculated durations.
+        Returns the index of the first message and the messages of the loaded block of messages
+        containing the given index, or None if the index is past the end of the song.
         """
-        open_notes: dict[int, ScrollingNote] = defaultdict(lambda : None)
-        notes = []
-        current_time = 0
-        delta_time = 0
-
-        # Loops through all messages except the buffer message to create scrolling notes
-        for msg in self.messages[1:]:
-            # Add to current and delta time
-            current_time += msg.time 
-            delta_time += msg.time
-
-            # Ignores non-note entries
-            if not msg.type.startswith("note"):
-                continue
-
-            # Checks if the note is starting or ending
-            if msg.type == "note_on" and msg.velocity > 0:
-                # If the same note was already playing, ends the previous one before starting the new one
-                if existing_note := open_notes[msg.note]:
-                    existing_note.length = current_time - existing_note.start_time
-
-                # Creates the new scrolling note object
-                new_note = ScrollingNote(
-                    note=msg.note - 21,
-                    channel=msg.channel,
-                    delta_time=delta_time,
-                    start_time=current_time,
-                    note_time=self.display_settings.note_time
-                )
-
-                # Stores new note and resets delta time
-                open_notes[msg.note] = new_note
-                notes.append(new_note)
-                delta_time = 0
-            elif note_to_end := open_notes[msg.note]:
-                # If a note has ended, calculates its length and closes it
-                note_to_end.length = current_time - note_to_end.start_time
-                open_notes[msg.note] = None
-
-        # Calculates lengths for all remaining open notes
-        for note in open_notes.values():
-            if note:
-                note.length = current_time - note.start_time
-
-        return notes
-    
+        if index >= len(self.message_table):
+            return None
+        return 0, self.message_table
+
+    def _generate_checkpoints(self) -> list[PlaybackState]:
+        """Computes snapshots of the song's playback state at regular intervals from its message table."""
+        interval_count = int(self.message_table.duration // self.CHECKPOINT_INTERVAL) + 1
+        checkpoint_times = np.arange(interval_count) * self.CHECKPOINT_INTERVAL
+        indices = np.unique(np.searchsorted(self.message_table.times, checkpoint_times, side='left')).tolist()
+        if not indices or indices[-1] != len(self):
+            indices.append(len(self))
+        return PlaybackState.from_message_table(self.message_table, indices)
+
     def reset(self) -> None:
         """Stops and resets the song."""
-        # Stops song and clears display information
         self.stop()
-        self.notes_pressed.clear()
-        self.active_scrolling_notes.clear()
+        self._clear_progress()
+
+    def _clear_progress(self) -> None:
+        """Clears display information and progress indicators."""
+        self.notes_pressed = {}
 
         # Resets timing and progress indicators
+        self.time = 0
         self._message_index = 0
-        self._scrolling_note_index = 0
-        self._message_delta_time = 0
-        self._scrolling_note_delta_time = 0
 
     def start(self) -> None:
         """Starts playing the song."""
         self.playing = True
         self._last_frame_time = None
+        self.time_reference = None
+        if self.scheduler:
+            self.scheduler.start(self._message_index, self.notes_pressed)
 
     def stop(self) -> None:
         """Stops playing the song."""
+        self._stop_scheduler()
         self.playing = False
         self.audio_output.reset()
 
+    def _stop_scheduler(self) -> None:
+        """Stops the scheduler thread, if running, and takes back ownership of the song's progress."""
+        if self.scheduler and self.scheduler.running:
+            self.scheduler.stop()
+            self._message_index = self.scheduler.message_index
+            self.notes_pressed = self.scheduler.notes_pressed
+
     def toggle_playing(self) -> None:
         """Toggles if the song is playing or not."""
         (self.stop if self.playing else self.start)()
 
+    def seek(self, target_time: float) -> None:
+        """
+        Moves playback to the given time in seconds, restoring the pressed keys
+        and audio state from the nearest preceding checkpoint.
+        """
+        self._stop_scheduler()
+        target_time = min(max(target_time, 0), self.duration)
+        state = self._playback_state_at(target_time)
+
+        # Restores the song's progress and display information
+        self.time = target_time
+        self._message_index = state.message_index
+        self.notes_pressed = dict(state.notes_pressed)
+
+        # Restores the audio output, resuming any notes that are held down
+        self.audio_output.reset()
+        for msg in state.channel_messages.values():
+            self.audio_output.send(msg)
+        if self.playing:
+            for msg in state.held_notes.values():
+                self.audio_output.send(msg)
+
+            # Restarts the scheduler from the new position once the song is next updated
+            self.time_reference = None
+            if self.scheduler:
+                self.scheduler.start(self._message_index, self.notes_pressed)
+
+    def _playback_state_at(self, target_time: float) -> PlaybackState:
+        """Returns the playback state at the given time, replaying messages from the nearest preceding checkpoint."""
+        message_index = self._message_index_at(target_time)
+        checkpoint = self.checkpoints[bisect_right(self.checkpoints, message_index, key=lambda c: c.message_index) - 1]
+        state = checkpoint.copy()
+        for i in range(state.message_index, message_index):
+            state.apply(self[i])
+        state.message_index = message_index
+        return state
+
     def update(self) -> None:
         """
         Updates the song's state by processing events based on elapsed time.
@@ -134,42 +201,54 @@ class Song:
             return
         
         # Initialises or calculates delta time
-        now = time.perf_counter()
+        now = self.clock()
         if self._last_frame_time is None:
             delta_time = 0
         else:
             delta_time = now - self._last_frame_time
         self._last_frame_time = now
 
-        self._message_delta_time += delta_time
-        self._scrolling_note_delta_time += delta_time
-
-        # Updates all currently visible scrolling notes and removes inactive ones
-        active_notes = []
-        for note in self.active_scrolling_notes:
-            note.update(delta_time)
-            if note.active:
-                active_notes.append(note)
-        self.active_scrolling_notes = active_notes
-
-        # Activates new scrolling notes as their time arrives
-        while self.display_settings.scrolling_notes and self._scrolling_note_index < len(self.scrolling_notes) \
-                and self.scrolling_notes[self._scrolling_note_index].delta_time <= self._scrolling_note_delta_time:
-            next_scrolling_note = self.scrolling_notes[self._scrolling_note_index]
-            self._scrolling_note_delta_time -= next_scrolling_note.delta_time
-            self.active_scrolling_notes.append(next_scrolling_note)
-            next_scrolling_note.activate(self._scrolling_note_delta_time)
-            self._scrolling_note_index += 1
-        
-        # Processes and sends MIDI messages as their time arrives
-        while self._message_index < len(self) and next(self).time <= self._message_delta_time:
-            self._message_delta_time -= next(self).time
-            if not next(self).is_meta:
-                self.audio_output.send(next(self))
-                if next(self).type.startswith('note'):
-                    self.notes_pressed[next(self).note] = (next(self).channel, next(self).type == 'note_on' and next(self).velocity > 0)
-            self._message_index += 1
+        self.time += delta_time
+        self.time_reference = (now, self.time)
+
+        if self.scheduler:
+            # Reads the latest progress from the scheduler thread
+            self._message_index = self.scheduler.message_index
+            self.notes_pressed = self.scheduler.notes_pressed
+        else:
+            # Processes and sends all MIDI messages whose time has arrived
+            self._send_messages(self._message_index_at(self.time))
         
         # Resets the song if the end has been reached
-        if self._message_index >= len(self):
+        if self.time >= self.duration:
             self.reset()
+
+    def _send_messages(self, stop: int) -> None:
+        """Sends all messages from the current index up to the given index, updating the key states."""
+        index = self._message_index
+        while index < stop:
+            first, messages = self.message_chunk(index)
+            end = min(stop - first, len(messages))
+            start = index - first
+            if end <= start:
+                break
+
+            # Sends pre-encoded bytes, using the note masks to find which keys change
+            note_on = messages.note_on[start:end].tolist()
+            note_off = messages.note_off[start:end].tolist()
+            for i, message_bytes in enumerate(messages.encoded(start, end)):
+                self.raw_output.send(message_bytes)
+                if note_on[i] or note_off[i]:
+                    self.notes_pressed[message_bytes[1]] = (message_bytes[0] & 0x0F, note_on[i])
+            index = first + end
+        self._message_index = index
+
+    def _message_index_at(self, song_time: float) -> int:
+        """Returns the index of the first message that should be sent after the given song time."""
+        return int(np.searchsorted(self.message_table.times, song_time - self.buffer_time, side='right'))
+
+    def visible_note_count(self) -> int:
+        """Returns the number of notes that have started scrolling and have not yet scrolled past the piano."""
+        if not self.display_settings.scrolling_notes:
+            return 0
+        return len(self.note_table.visible(self.time, self.display_settings.note_time))
@@ -0,0 +1,131 @@
+import math
+import numpy as np
+from dataclasses import dataclass
+from .message_table import MessageTable
+from .note_table import NoteTable
+
+@dataclass
+class SongAnalytics:
+    """
+    Data class storing how heavy a song is to draw and play over time, computed ahead of time
+    from its note and message tables, so the display and scheduler can prepare for heavy passages.
+    """
+
+    RESOLUTION = 0.1
+    """The default span of song time in seconds covered by each sample of the notes on screen curve."""
+
+    resolution: float
+    """The span of song time in seconds covered by each sample of the notes on screen curve."""
+
+    notes_on_screen: np.ndarray
+    """The greatest number of notes on screen within each span of song time, starting from the start of the song."""
+
+    peak_polyphony: int
+    """The greatest number of notes sounding at once."""
+
+    messages_per_second: np.ndarray
+    """The number of MIDI messages sent within each second of the song, excluding the starting buffer."""
+
+    channel_note_counts: np.ndarray
+    """The number of notes played on each of the 16 MIDI channels."""
+
+    channel_message_counts: np.ndarray
+    """The number of channel messages sent on each of the 16 MIDI channels."""
+
+    @property
+    def peak_notes_on_screen(self) -> int:
+        """The greatest number of notes on screen at once."""
+        return int(self.notes_on_screen.max(initial=0))
+
+    @property
+    def peak_messages_per_second(self) -> int:
+        """The greatest number of MIDI messages sent within a single second."""
+        return int(self.messages_per_second.max(initial=0))
+
+    def notes_on_screen_between(self, start: float, end: float) -> int:
+        """Returns the greatest number of notes on screen at any song time between the given times in seconds."""
+        first = max(math.floor(start / self.resolution), 0)
+        last = min(math.floor(end / self.resolution), len(self.notes_on_screen) - 1)
+        return int(self.notes_on_screen[first:last + 1].max(initial=0))
+
+    def notes_on_screen_per_span(self, span: float) -> np.ndarray:
+        """Returns the greatest number of notes on screen within each consecutive span of song time of the given length in seconds."""
+        span_count = math.ceil(len(self.notes_on_screen) * self.resolution / span)
+        edges = np.arange(span_count + 1) * span / self.resolution
+        starts = np.minimum(np.floor(edges[:-1]).astype(np.int64), len(self.notes_on_screen) - 1)
+        ends = np.minimum(np.floor(edges[1:]).astype(np.int64), len(self.notes_on_screen) - 1)
+
+        # Includes the sample containing the end of each span, which is shared with the next span
+        peaks = np.maximum.reduceat(self.notes_on_screen, starts)
+        return np.maximum(peaks, self.notes_on_screen[ends])
+
+    def message_rate_at(self, time: float) -> int:
+        """Returns the number of MIDI messages sent within the second containing the given time in seconds, excluding the starting buffer."""
+        second = math.floor(time)
+        return int(self.messages_per_second[second]) if 0 <= second < len(self.messages_per_second) else 0
+
+    @staticmethod
+    def _sweep(starts: np.ndarray, ends: np.ndarray, closed: bool) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the times at which the given intervals start and end in order, and the number of intervals
+        overlapping after each. Closed intervals include their end times, so starts are counted first at equal times.
+        """
+        times = np.concatenate((starts, ends))
+        changes = np.concatenate((np.ones(len(starts), dtype=np.int64), -np.ones(len(ends), dtype=np.int64)))
+        order = np.lexsort((-changes if closed else changes, times))
+        return times[order], np.cumsum(changes[order])
+
+    @staticmethod
+    def _peak_counts(times: np.ndarray, counts: np.ndarray, bin_count: int, resolution: float) -> np.ndarray:
+        """Returns the greatest count within each span of the given resolution, from the counts after each change."""
+        # Each span's peak is the count entering it or the count after any change within it
+        bins = np.clip(np.floor(times / resolution).astype(np.int64), 0, bin_count - 1)
+        peaks = np.zeros(bin_count, dtype=np.int64)
+        np.maximum.at(peaks, bins, counts)
+        entering = np.searchsorted(times, np.arange(bin_count) * resolution, side='left')
+        return np.maximum(peaks, np.concatenate(([0], counts))[entering])
+
+    @staticmethod
+    def from_tables(
+        message_table: MessageTable, note_table: NoteTable, note_time: float, resolution: float = RESOLUTION
+    ) -> 'SongAnalytics':
+        """Analyses a song's notes and messages.
+
+        Parameters
+        ----------
+        message_table : MessageTable
+            The song's playable MIDI messages.
+        note_table : NoteTable
+            The song's notes.
+        note_time : float
+            The time in seconds for a note to scroll through the display, which is how long
+            notes stay on screen in addition to their length.
+        resolution : float
+            The span of song time in seconds covered by each sample of the notes on screen curve.
+
+        Returns
+        -------
+        SongAnalytics
+            The song's analytics.
+        """
+        # A note is on screen from its start until it has scrolled past the piano, as in `NoteTable.visible`
+        bin_count = math.floor((message_table.duration + note_time) / resolution) + 1
+        times, counts = SongAnalytics._sweep(note_table.starts, note_table.ends + note_time, closed=True)
+        notes_on_screen = SongAnalytics._peak_counts(times, counts, bin_count, resolution)
+
+        # Notes stop sounding at their end times, when the same key may start again
+        _, sounding = SongAnalytics._sweep(note_table.starts, note_table.ends, closed=False)
+
+        # Counts messages within each second, and notes and channel messages on each channel
+        seconds = math.floor(message_table.duration) + 1
+        messages_per_second = np.bincount(message_table.times.astype(np.int64), minlength=seconds)
+        channel_messages = message_table.statuses[message_table.statuses < 0xF0]
+
+        return SongAnalytics(
+            resolution=resolution,
+            notes_on_screen=notes_on_screen.astype(np.int32),
+            peak_polyphony=int(sounding.max(initial=0)),
+            messages_per_second=messages_per_second.astype(np.int32),
+            channel_note_counts=np.bincount(note_table.channels, minlength=16),
+            channel_message_counts=np.bincount(channel_messages & 0x0F, minlength=16),
+        )
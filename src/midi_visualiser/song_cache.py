@@ -0,0 +1,113 @@
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import numpy as np
+from .message_table import MessageTable
+from .note_table import NoteTable
+
+def default_cache_directory() -> str:
+    """Returns the platform's user cache directory for the visualiser."""
+    base = os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME") \
+        or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "midi-visualiser")
+
+class SongCache:
+    """
+    Class managing a persistent on-disk cache of preprocessed songs, keyed by the
+    hash of each MIDI file's contents. Cached arrays are loaded with memory mapping.
+    """
+
+    VERSION = 1
+    """The version of the cached data format, which invalidates old entries when changed."""
+
+    DEFAULT_MAX_SIZE = 512 * 1024 * 1024
+    """The default maximum total size in bytes of all cached songs."""
+
+    def __init__(self, directory: str | None = None, max_size: int = DEFAULT_MAX_SIZE) -> None:
+        """Initialises the cache in the given directory, creating it if necessary."""
+        self.directory = directory or default_cache_directory()
+        self.max_size = max_size
+        os.makedirs(self.directory, exist_ok=True)
+
+    def key(self, file_name: str) -> str:
+        """Returns the cache key for a MIDI file, from its contents and the data format version."""
+        digest = hashlib.sha256()
+        with open(file_name, "rb") as f:
+            while chunk := f.read(1 << 20):
+                digest.update(chunk)
+        return f"{digest.hexdigest()[:32]}-v{self.VERSION}"
+
+    def load(self, key: str) -> tuple[MessageTable, NoteTable] | None:
+        """Loads the preprocessed song data stored under the given key, or returns None if it is not cached."""
+        entry = os.path.join(self.directory, key)
+        if not os.path.isdir(entry):
+            return None
+
+        try:
+            with open(os.path.join(entry, "info.json")) as f:
+                info = json.load(f)
+            arrays = {
+                name: np.load(os.path.join(entry, f"{name}.npy"), mmap_mode="r")
+                for name in ("messages", "sysex_data", "sysex_offsets", "notes")
+            }
+        except (OSError, ValueError):
+            # Removes corrupt or truncated entries, so the song is stored again once it has been parsed
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+
+        # Marks the entry as recently used for eviction
+        os.utime(entry)
+
+        message_table = MessageTable(arrays["messages"], arrays["sysex_data"], arrays["sysex_offsets"], info["duration"])
+        return message_table, NoteTable(arrays["notes"])
+
+    def store(self, key: str, message_table: MessageTable, note_table: NoteTable) -> None:
+        """Stores preprocessed song data under the given key, evicting old entries if the cache is full."""
+        entry = os.path.join(self.directory, key)
+        if os.path.isdir(entry):
+            return
+
+        # Writes to a temporary directory first so partially written entries are never loaded
+        temp_entry = tempfile.mkdtemp(dir=self.directory, prefix=".tmp-")
+        try:
+            np.save(os.path.join(temp_entry, "messages.npy"), message_table.messages)
+            np.save(os.path.join(temp_entry, "sysex_data.npy"), message_table.sysex_data)
+            np.save(os.path.join(temp_entry, "sysex_offsets.npy"), message_table.sysex_offsets)
+            np.save(os.path.join(temp_entry, "notes.npy"), note_table.notes)
+            with open(os.path.join(temp_entry, "info.json"), "w") as f:
+                json.dump({"duration": message_table.duration}, f)
+            os.rename(temp_entry, entry)
+        except OSError:
+            shutil.rmtree(temp_entry, ignore_errors=True)
+            return
+
+        self._evict(keep=key)
+
+    def clear(self) -> None:
+        """Removes all entries from the cache."""
+        for name in os.listdir(self.directory):
+            shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+
+    def _entry_size(self, entry: str) -> int:
+        """Returns the total size in bytes of the files in a cache entry."""
+        return sum(entry_file.stat().st_size for entry_file in os.scandir(entry) if entry_file.is_file())
+
+    def _evict(self, keep: str) -> None:
+        """Removes the least recently used entries until the cache fits within its maximum size."""
+        entries = [e for e in os.scandir(self.directory) if e.is_dir() and not e.name.startswith(".")]
+        sizes = {e.path: self._entry_size(e.path) for e in entries}
+        total_size = sum(sizes.values())
+
+        for entry in sorted(entries, key=lambda e: e.stat().st_mtime):
+            if total_size <= self.max_size:
+                break
+            if entry.name == keep:
+                continue
+            try:
+                shutil.rmtree(entry.path)
+            except OSError:
+                # Entries that are still memory mapped may not be removable on some platforms
+                continue
+            total_size -= sizes[entry.path]
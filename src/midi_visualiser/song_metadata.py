@@ -0,0 +1,64 @@
+import os
+import numpy as np
+from dataclasses import dataclass, field
+from .midi_file_parser import MidiFileParser
+from .note_table import NoteTable
+
+@dataclass
+class SongMetadata:
+    """Data class storing summary information about a MIDI file, and whether it can be loaded."""
+
+    size: int
+    """The size of the file in bytes when it was indexed."""
+
+    modified: int
+    """The modification time of the file in nanoseconds when it was indexed."""
+
+    valid: bool = True
+    """Whether the file could be loaded as a song."""
+
+    error: str | None = None
+    """The reason the file couldn't be loaded, if it is invalid."""
+
+    duration: float = 0.0
+    """The length of the song in seconds, excluding the starting buffer."""
+
+    note_count: int = 0
+    """The number of notes in the song."""
+
+    message_count: int = 0
+    """The number of playable MIDI messages in the song."""
+
+    channels: list[int] = field(default_factory=list)
+    """The MIDI channels which play notes in the song."""
+
+    @staticmethod
+    def from_file(file_name: str) -> 'SongMetadata':
+        """Reads a MIDI file and summarises it, recording the error if it can't be loaded.
+
+        Parameters
+        ----------
+        file_name : str
+            The path of the MIDI file.
+
+        Returns
+        -------
+        SongMetadata
+            The file's metadata.
+        """
+        size, modified = 0, 0
+        try:
+            stat = os.stat(file_name)
+            size, modified = stat.st_size, stat.st_mtime_ns
+            message_table = MidiFileParser(file_name).parse()
+            note_table = NoteTable.from_message_table(message_table)
+        except Exception as e:
+            return SongMetadata(size, modified, valid=False, error=str(e) or type(e).__name__)
+
+        return SongMetadata(
+            size, modified,
+            duration=message_table.duration,
+            note_count=len(note_table),
+            message_count=len(message_table),
+            channels=np.unique(note_table.channels).tolist()
+        )
@@ -0,0 +1,78 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+from concurrent.futures import Future, ThreadPoolExecutor
+
+if TYPE_CHECKING:
+    from .song import Song
+
+class SongPool:
+    """
+    Class which loads songs on background worker threads and keeps loaded songs
+    in a least recently used pool bounded by a memory budget.
+    """
+
+    DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+    """The default memory budget in bytes for all songs held in the pool."""
+
+    def __init__(
+        self, loader: Callable[[str], 'Song | None'], max_bytes: int = DEFAULT_MAX_BYTES, workers: int = 2
+    ) -> None:
+        """Initialises the pool with a function that loads a song from a file path, or returns None on failure."""
+        self.loader = loader
+        self.max_bytes = max_bytes
+
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="song-loader")
+        self._lock = threading.Lock()
+        self._songs: OrderedDict[str, 'Song'] = OrderedDict()
+        self._futures: dict[str, Future] = {}
+
+    def request(self, file_path: str) -> Future:
+        """Returns a future for the song at the given path, starting to load it if it isn't already loaded or loading."""
+        with self._lock:
+            if file_path in self._songs:
+                self._songs.move_to_end(file_path)
+                future = Future()
+                future.set_result(self._songs[file_path])
+                return future
+
+            if file_path in self._futures:
+                return self._futures[file_path]
+            future = self._executor.submit(self._load, file_path)
+            self._futures[file_path] = future
+            return future
+
+    def preload(self, file_paths: list[str]) -> None:
+        """Starts loading all of the given songs in the background."""
+        for file_path in file_paths:
+            self.request(file_path)
+
+    def shutdown(self) -> None:
+        """Stops the worker threads, cancelling any songs that haven't started loading."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _load(self, file_path: str) -> 'Song | None':
+        """Loads a song on a worker thread, storing it in the pool before its future finishes."""
+        song = None
+        try:
+            song = self.loader(file_path)
+            return song
+        finally:
+            self._store(file_path, song)
+
+    def _store(self, file_path: str, song: 'Song | None') -> None:
+        """Stores a loaded song in the pool and evicts the least recently used songs if over budget."""
+        with self._lock:
+            self._futures.pop(file_path, None)
+
+            # Songs that failed to load aren't stored, so they are loaded again when next requested
+            if song is None:
+                return
+            self._songs[file_path] = song
+
+            # Evicts old songs until the pool fits its memory budget, always keeping the newest
+            total_bytes = sum(pooled.nbytes for pooled in self._songs.values())
+            while total_bytes > self.max_bytes and len(self._songs) > 1:
+                _, evicted = self._songs.popitem(last=False)
+                total_bytes -= evicted.nbytes
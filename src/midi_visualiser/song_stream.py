@@ -0,0 +1,280 @@
+import math
+import threading
+import mido
+import numpy as np
+from bisect import bisect_right
+from itertools import islice
+from collections.abc import Iterator
+from .midi_file_stream import MidiFileStream
+from .message_table import MessageTable
+from .note_table import NoteTable, NOTE_DTYPE
+from .playback_state import PlaybackState
+
+class SongStream:
+    """
+    Class which reads a song's messages and notes from its MIDI file in fixed-size chunks
+    on a background thread, keeping only the chunks within a window around the playhead
+    so memory use is bounded regardless of the size of the file.
+
+    Provides the same `visible` query as a `NoteTable`, so it can be drawn in place of one.
+    """
+
+    CHUNK_SIZE = 4096
+    """The number of messages in each chunk."""
+
+    READ_AHEAD = 10.0
+    """The time in seconds ahead of the top of the screen up to which chunks are read."""
+
+    KEEP_BEHIND = 2.0
+    """The time in seconds for which notes are kept after scrolling past the piano,
+    so piano roll tiles extending below it can still be rendered."""
+
+    def __init__(self, file_name: str, chunk_size: int = CHUNK_SIZE, read_ahead: float = READ_AHEAD) -> None:
+        """Initialises the stream for the given MIDI file without reading any messages."""
+        self.file_name = file_name
+        self.chunk_size = chunk_size
+        self.read_ahead = read_ahead
+
+        self._empty_chunk = MessageTable.from_bytes([], 0.0)
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._stop_event = threading.Event()
+        self._playhead = 0.0
+        self._discarded = True
+
+        # Opens the file on this thread, so errors for invalid files are raised immediately rather than on the reader thread
+        self.restart()
+
+    @property
+    def exhausted(self) -> bool:
+        """Whether every message in the file has been read."""
+        return self.end_time is not None
+
+    @property
+    def message_count(self) -> int:
+        """The number of messages read so far."""
+        return self._read_count
+
+    @property
+    def nbytes(self) -> int:
+        """The approximate memory used by the chunks currently held, in bytes."""
+        with self._lock:
+            return sum(messages.nbytes + notes.nbytes for _, messages, notes, _ in self._chunks)
+
+    def restart(self, time: float = -math.inf, note_time: float = 0.0) -> PlaybackState:
+        """Reads the file again from the start, so that playback can continue from the given song time.
+
+        Messages that reached the piano before the given time are applied to a playback state
+        rather than kept, and every note on screen at the given time is read before returning.
+
+        Parameters
+        ----------
+        time : float
+            The song time in seconds, shown at the top of the screen, that playback will continue from.
+        note_time : float
+            The time in seconds for a note to scroll through the display.
+
+        Returns
+        -------
+        PlaybackState
+            The playback state after every message before the piano.
+        """
+        cutoff = time - note_time
+
+        # Keeps the chunks already read if none have been discarded since the start of the file
+        if cutoff < 0 and not self._discarded:
+            self._playhead = max(time, 0.0)
+            self._start_reader()
+            return PlaybackState()
+
+        self._stop_reader()
+        self._discarded = False
+        self._file_stream = MidiFileStream(self.file_name)
+        self._messages: Iterator[tuple[float, list[int]]] = iter(self._file_stream)
+        self._open_notes: dict[int, tuple[int, int, float]] = {}
+        self._read_count = 0
+        self.end_time: float | None = None
+        self.loaded_until = 0.0
+        """The time in seconds before which every message and note has been read."""
+
+        # Each chunk stores the index of its first message, its messages, the notes that
+        # ended within it, and the time up to which it was read
+        self._chunks: list[tuple[int, MessageTable, NoteTable, float]] = []
+        self._open_snapshot = np.empty(0, dtype=NOTE_DTYPE)
+
+        # Reads up to the top of the screen, applying and discarding messages before the piano
+        state = PlaybackState()
+        while self.loaded_until <= time and not self.exhausted:
+            first, messages, _, _ = self._read_chunk()
+            end = int(np.searchsorted(messages.times, cutoff, side='right'))
+            for i in range(end):
+                state.apply(messages.message(i))
+            if end:
+                state.message_index = first + end
+            self._discard(cutoff, state.message_index)
+
+        self._playhead = max(time, 0.0)
+        self._start_reader()
+        return state
+
+    def advance(self, time: float, note_time: float, message_index: int) -> None:
+        """
+        Moves the playhead to the given song time in seconds, shown at the top of the screen, discarding
+        chunks that have been played and reading further ahead in the background if needed.
+        """
+        self._playhead = time
+        self._discard(time - note_time, message_index)
+        if self.loaded_until < time + self.read_ahead / 2:
+            self._start_reader()
+
+    def message_chunk(self, index: int) -> tuple[int, MessageTable] | None:
+        """Returns the index of the first message and the messages of the chunk containing the given index.
+
+        An empty chunk is returned if the message hasn't been read yet, and None if the file has no more messages.
+        """
+        with self._lock:
+            if index >= self._read_count:
+                if self.exhausted:
+                    return None
+                return index, self._empty_chunk
+            position = bisect_right(self._chunks, index, key=lambda chunk: chunk[0]) - 1
+            first, messages, _, _ = self._chunks[max(position, 0)]
+            return first, messages
+
+    def message(self, index: int) -> mido.Message:
+        """Returns the message at the given index, which must be within a chunk that is currently held."""
+        first, messages = self.message_chunk(index)
+        return messages.message(index - first)
+
+    def message_index_at(self, time: float) -> int:
+        """Returns the index of the first message after the given time in seconds, among the messages read so far."""
+        with self._lock:
+            for first, messages, _, _ in self._chunks:
+                if len(messages) and messages.times[-1] > time:
+                    return first + int(np.searchsorted(messages.times, time, side='right'))
+            return self._read_count
+
+    def visible(self, time: float, note_time: float) -> np.ndarray:
+        """Returns all notes that have been read which are on screen at the given time.
+
+        Notes that haven't ended by the time up to which the file has been read are
+        returned as ending at that time, which is always above the top of the screen.
+
+        Parameters
+        ----------
+        time : float
+            The current song time in seconds.
+        note_time : float
+            The time in seconds for a note to scroll through the display.
+
+        Returns
+        -------
+        np.ndarray
+            The visible notes, sorted by start time.
+        """
+        scrolled_time = time - note_time
+        with self._lock:
+            found = [notes.visible(time, note_time) for _, _, notes, end in self._chunks if end >= scrolled_time]
+            open_notes = self._open_snapshot
+        found.append(open_notes[(open_notes["start"] <= time) & (open_notes["end"] >= scrolled_time)])
+
+        notes = np.concatenate(found)
+        return notes[np.argsort(notes["start"], kind='stable')]
+
+    def _start_reader(self) -> None:
+        """Starts the reader thread if it isn't running and there is more of the file to read."""
+        if self.exhausted or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._read, name="song-stream", daemon=True)
+        self._thread.start()
+
+    def _stop_reader(self) -> None:
+        """Stops the reader thread, waiting for it to finish its current chunk."""
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+
+    def _read(self) -> None:
+        """Reads chunks until the read ahead window is full or the file has been fully read."""
+        try:
+            while not self._stop_event.is_set() and not self.exhausted and self.loaded_until < self._playhead + self.read_ahead:
+                self._read_chunk()
+        except Exception as e:
+            # Ends the song after the last chunk that could be read
+            print(f"Failed to read MIDI file '{self.file_name}': {e}.")
+            with self._lock:
+                self.end_time = self.loaded_until
+                self.loaded_until = math.inf
+
+    def _read_chunk(self) -> tuple[int, MessageTable, NoteTable, float]:
+        """Reads the next chunk of messages, compiling the notes that end within it."""
+        rows = list(islice(self._messages, self.chunk_size))
+        last_chunk = len(rows) < self.chunk_size
+        end_time = self._file_stream.end_time if last_chunk else rows[-1][0]
+
+        # Tracks which notes are open, closing them on note off messages or when the same note starts again
+        open_notes = self._open_notes
+        keys, channels, starts, ends = [], [], [], []
+        for message_time, message_bytes in rows:
+            status = message_bytes[0] & 0xF0
+            if status != 0x80 and status != 0x90:
+                continue
+            note = message_bytes[1]
+            closed = open_notes.pop(note, None)
+            if closed is not None:
+                keys.append(closed[0])
+                channels.append(closed[1])
+                starts.append(closed[2])
+                ends.append(message_time)
+            if status == 0x90 and message_bytes[2] > 0:
+                open_notes[note] = (note - 21, message_bytes[0] & 0x0F, message_time)
+
+        # Closes all remaining notes at the end of the file
+        if last_chunk:
+            for key, channel, start in open_notes.values():
+                keys.append(key)
+                channels.append(channel)
+                starts.append(start)
+                ends.append(end_time)
+            open_notes.clear()
+
+        chunk = (
+            self._read_count,
+            MessageTable.from_bytes(rows, end_time),
+            NoteTable(self._note_array(keys, channels, starts, ends)),
+            end_time
+        )
+        snapshot = self._note_array(*zip(*open_notes.values()), [end_time] * len(open_notes)) if open_notes else self._open_snapshot[:0]
+
+        # Publishes the chunk to other threads
+        with self._lock:
+            self._chunks.append(chunk)
+            self._open_snapshot = snapshot
+            self._read_count += len(rows)
+            self.loaded_until = math.inf if last_chunk else end_time
+            if last_chunk:
+                self.end_time = end_time
+        return chunk
+
+    def _note_array(self, keys: list[int], channels: list[int], starts: list[float], ends: list[float]) -> np.ndarray:
+        """Creates a note array sorted by start time, calculating lengths in the same way as `NoteTable.from_message_table`."""
+        notes = np.empty(len(keys), dtype=NOTE_DTYPE)
+        notes["key"] = keys
+        notes["channel"] = channels
+        notes["start"] = starts
+        notes["length"] = np.array(ends, dtype=np.float64) - notes["start"]
+        notes["end"] = notes["start"] + notes["length"]
+        return notes[np.argsort(notes["start"], kind='stable')]
+
+    def _discard(self, time: float, message_index: int) -> None:
+        """Discards chunks whose messages have all been played and whose notes had all scrolled past the piano by the given time."""
+        with self._lock:
+            while (
+                self._chunks
+                and self._chunks[0][3] < time - self.KEEP_BEHIND
+                and self._chunks[0][0] + len(self._chunks[0][1]) <= message_index
+            ):
+                self._chunks.pop(0)
+                self._discarded = True
@@ -0,0 +1,59 @@
+import time
+from collections.abc import Callable
+
+class StartupProfile:
+    """
+    Class which records how long each stage of starting the visualiser takes, so cold start
+    times can be broken down and kept within a budget.
+
+    Stages run in order on the main thread are recorded with `mark`, each ending where the
+    next begins. Stages run in the background alongside them are recorded with `record`, and
+    one-off events such as the first frame being presented are recorded with `milestone`.
+    """
+
+    def __init__(self, enabled: bool = True, clock: Callable[[], float] = time.perf_counter) -> None:
+        """Initialises the profile, starting its timer."""
+        self.enabled = enabled
+        self.clock = clock
+        self.start_time = clock()
+        self.finished = False
+
+        self.stages: list[tuple[str, float, float, bool]] = []
+        """Each stage's name, duration and finish time in seconds since the start, and whether it ran in the background."""
+
+        self.milestones: dict[str, float] = {}
+        """The time in seconds since the start at which each milestone was reached."""
+
+        self._last_mark = self.start_time
+
+    def mark(self, stage: str) -> None:
+        """Records that a stage on the main thread has finished, having started when the previous one finished."""
+        now = self.clock()
+        self.stages.append((stage, now - self._last_mark, now - self.start_time, False))
+        self._last_mark = now
+
+    def record(self, stage: str, started: float) -> None:
+        """Records that a stage running in the background has finished, having started at the given clock time."""
+        now = self.clock()
+        self.stages.append((stage, now - started, now - self.start_time, True))
+
+    def milestone(self, name: str) -> None:
+        """Records the time a milestone is first reached, ignoring it if it has been reached before."""
+        if name not in self.milestones:
+            self.milestones[name] = self.clock() - self.start_time
+
+    def report(self) -> str:
+        """Returns a table of the duration and finish time of every stage, followed by the milestones."""
+        lines = [f"{'stage':<32} {'took':>9} {'done at':>9}"]
+        for stage, duration, finished, background in self.stages:
+            name = f"{stage} (background)" if background else stage
+            lines.append(f"{name:<32} {duration * 1000:7.1f}ms {finished * 1000:7.1f}ms")
+        for name, reached in self.milestones.items():
+            lines.append(f"{name:<32} {'':>9} {reached * 1000:7.1f}ms")
+        return "\n".join(lines)
+
+    def finish(self) -> None:
+        """Prints the report if profiling is enabled, the first time it is called."""
+        if self.enabled and not self.finished:
+            print(f"Startup profile:\n{self.report()}")
+        self.finished = True
@@ -0,0 +1,69 @@
+import math
+import mido
+from .song import Song
+from .song_cache import SongCache
+from .message_table import MessageTable
+from .playback_state import PlaybackState
+from .song_stream import SongStream
+
+class StreamingSong(Song):
+    """
+    Class representing a song which is read from its MIDI file while it plays, rather than
+    loaded up front, so that very large files start instantly and use bounded memory.
+
+    The song's duration is unknown until the whole file has been read, and seeking
+    reads the file again from the start up to the target time.
+    """
+
+    def _initialise_song_data(self, file_name: str, cache: SongCache | None) -> None:
+        """Opens the stream of the song's messages and notes, which are never cached."""
+        self.stream = SongStream(file_name)
+        self.note_table = self.stream
+
+    def _analyse(self) -> None:
+        """Streamed songs aren't analysed, as their notes are only read while they play."""
+        return None
+
+    def __len__(self) -> int:
+        """Returns the number of MIDI messages read so far."""
+        return self.stream.message_count
+
+    def __getitem__(self, index: int) -> mido.Message:
+        """Returns the message at a given index, which must not have been discarded."""
+        return self.stream.message(index)
+
+    @property
+    def duration(self) -> float:
+        """The total length of the song in seconds, including the starting buffer, or infinity until the file has been read."""
+        return self.buffer_time + (self.stream.end_time if self.stream.exhausted else math.inf)
+
+    @property
+    def nbytes(self) -> int:
+        """The approximate memory used by the chunks of the song currently held, in bytes."""
+        return self.stream.nbytes
+
+    def message_chunk(self, index: int) -> tuple[int, MessageTable] | None:
+        """
+        Returns the index of the first message and the messages of the chunk containing the given
+        index, which is empty if it hasn't been read yet, or None if the index is past the end of the song.
+        """
+        return self.stream.message_chunk(index)
+
+    def reset(self) -> None:
+        """Stops and resets the song, reading the file again from the start."""
+        super().reset()
+        self.stream.restart()
+
+    def _playback_state_at(self, target_time: float) -> PlaybackState:
+        """Returns the playback state at the given time, reading the file again from the start up to it."""
+        return self.stream.restart(target_time, self.buffer_time)
+
+    def update(self) -> None:
+        """Updates the song's state, then moves the stream's window to the new playhead."""
+        super().update()
+        if self.playing:
+            self.stream.advance(self.time, self.buffer_time, self._message_index)
+
+    def _message_index_at(self, song_time: float) -> int:
+        """Returns the index of the first message that should be sent after the given song time, among those read so far."""
+        return self.stream.message_index_at(song_time - self.buffer_time)
@@ -0,0 +1,139 @@
+import pygame
+from collections import OrderedDict
+from pygame._sdl2.video import Renderer, Texture
+from .song import Song
+from .piano_display import PianoDisplay
+
+class TextureDisplay:
+    """
+    Class which draws a piano display through an SDL renderer instead of blitting surfaces.
+
+    The static layers of the piano, the pressed key sprites and the piano roll tiles are each
+    uploaded to a texture once, and every frame is composited from those textures by the
+    renderer. This works with SDL's software renderer as well as with a GPU, although the
+    software renderer redraws the whole window every frame rather than only the changed regions.
+    """
+
+    EXTRA_TILE_TEXTURES = 4
+    """The number of tile textures kept beyond the piano roll's tile cache, for tiles that are on screen but not cached."""
+
+    def __init__(self, display: PianoDisplay, renderer: Renderer) -> None:
+        """Initialises the texture display and uploads the static layers of the given piano display."""
+        self.display = display
+        self.renderer = renderer
+        self.settings = display.settings
+
+        # Static layers, drawn in the same places as the piano display draws their surfaces
+        self.white_fill_texture = Texture.from_surface(renderer, display.white_fill_surface)
+        self.white_outline_texture = Texture.from_surface(renderer, display.white_outline_surface)
+        self.black_fill_texture = Texture.from_surface(renderer, display.black_fill_surface)
+        self.black_outline_texture = Texture.from_surface(renderer, display.black_outline_surface)
+        self.octave_divider_texture = Texture.from_surface(renderer, display.octave_divider_surface)
+        self.piano_divider_texture = Texture.from_surface(renderer, display.piano_divider_surface)
+        if self.settings.show_play_icon:
+            self.play_texture = Texture.from_surface(renderer, display.play_icon)
+            self.pause_texture = Texture.from_surface(renderer, display.pause_icon)
+
+        # Textures uploaded on demand, keyed by the surface they were uploaded from
+        self._key_textures: dict[tuple[bool, tuple[int, int, int]], Texture] = {}
+        self._tile_textures: OrderedDict[pygame.Surface, Texture] = OrderedDict()
+        self._overlay: tuple[pygame.Surface, Texture] | None = None
+
+        self.pixels_pushed = 0
+
+    def _tile_texture(self, tile: pygame.Surface) -> Texture:
+        """Returns the texture of a piano roll tile, uploading it if the tile is new."""
+        if tile in self._tile_textures:
+            self._tile_textures.move_to_end(tile)
+            return self._tile_textures[tile]
+
+        texture = Texture.from_surface(self.renderer, tile)
+        self._tile_textures[tile] = texture
+        while len(self._tile_textures) > self.display.piano_roll.cache_size + self.EXTRA_TILE_TEXTURES:
+            self._tile_textures.popitem(last=False)
+        return texture
+
+    def _key_texture(self, key: int, colour: tuple[int, int, int]) -> Texture:
+        """Returns the texture of the given key pressed in the given colour, uploading it if it is new."""
+        black = key in self.display.black_key_indices
+        if (black, colour) not in self._key_textures:
+            self._key_textures[(black, colour)] = Texture.from_surface(
+                self.renderer, self.display._pressed_key_sprite(key, colour)
+            )
+        return self._key_textures[(black, colour)]
+
+    def _draw_scrolling_area(self, song: Song | None) -> None:
+        """Draws the scrolling notes from the piano roll tiles, or the empty background if there are none."""
+        display = self.display
+        if song and self.settings.scrolling_notes:
+            # Tiles overlapping the piano are covered when it is drawn
+            tiles = display.piano_roll.tiles(song.note_table, song.time, display.scrolling_height, song.analytics)
+            for tile, y in tiles:
+                self._tile_texture(tile).draw(dstrect=(0, y))
+            return
+
+        self.renderer.draw_color = pygame.Color(self.settings.background_colour)
+        self.renderer.fill_rect(display.scrolling_rect)
+        if self.settings.show_octave_divider:
+            self.octave_divider_texture.draw(dstrect=(0, 0))
+
+    def _draw_piano(self, song: Song | None) -> None:
+        """Draws the piano, including all actively coloured keys."""
+        display = self.display
+        piano_rect = display.piano_rect
+
+        # Draws the background visible around the key corners
+        self.renderer.draw_color = pygame.Color(self.settings.background_colour)
+        self.renderer.fill_rect(piano_rect)
+        if self.settings.show_octave_divider:
+            self.octave_divider_texture.draw(srcrect=piano_rect, dstrect=piano_rect)
+
+        # Draws white keys, followed by black keys on top
+        key_states = display._key_states(song)
+        channel_colours = self.settings.channel_colours
+        for key_indices, fill_texture, outline_texture, black in (
+            (display.white_key_indices, self.white_fill_texture, self.white_outline_texture, False),
+            (display.black_key_indices, self.black_fill_texture, self.black_outline_texture, True),
+        ):
+            fill_texture.draw(dstrect=piano_rect.topleft)
+            for key in key_indices:
+                channel = key_states[key]
+                if channel is None:
+                    continue
+                colours = channel_colours[channel]
+                colour = colours.black_key_pressed_colour if black else colours.white_key_pressed_colour
+                self._key_texture(key, colour).draw(dstrect=display.key_rects[key].move(piano_rect.topleft))
+            outline_texture.draw(dstrect=piano_rect.topleft)
+
+        # Draws piano divider
+        if self.settings.show_piano_divider:
+            self.piano_divider_texture.draw(dstrect=piano_rect.topleft)
+
+    def draw(self, song: Song | None, overlay: pygame.Surface | None = None) -> None:
+        """Composites the whole display for a given song, ready to be presented by the renderer.
+
+        Parameters
+        ----------
+        song : Song | None
+            The song to draw, or None to draw an empty piano.
+        overlay : pygame.Surface | None
+            A surface drawn over the top left of the display, such as the performance HUD.
+            It is only uploaded again when a different surface is given.
+        """
+        self._draw_scrolling_area(song)
+        self._draw_piano(song)
+        if song and self.settings.show_play_icon:
+            icon = self.play_texture if song.playing else self.pause_texture
+            icon.draw(dstrect=self.display.icon_rect)
+
+        if overlay is not None:
+            if self._overlay is None or self._overlay[0] is not overlay:
+                self._overlay = (overlay, Texture.from_surface(self.renderer, overlay))
+            self._overlay[1].draw(dstrect=(0, 0))
+
+        # Every pixel of the window is drawn again each frame
+        self.pixels_pushed = int(self.display.width * self.display.height)
+
+    def present(self) -> None:
+        """Shows the composited frame in the window."""
+        self.renderer.present()
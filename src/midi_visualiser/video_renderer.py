@@ -0,0 +1,179 @@
+import os
+import math
+import queue
+import shutil
+import subprocess
+import threading
+import time
+from collections.abc import Callable
+import mido
+import pygame
+from .song import Song
+from .piano_display import PianoDisplay
+from .piano_display_settings import PianoDisplaySettings
+from .song_cache import SongCache
+from .software_synth import SoftwareSynth
+from .clock import SimulatedClock
+
+FrameWriter = tuple[Callable[[bytes], object], Callable[[], None]]
+
+class VideoRenderer:
+    """Renders a song's visualisation offline to a video file or frame sequence without a display."""
+
+    FRAME_FORMAT = "RGB"
+    """The pixel format of the raw frames passed to the encoder."""
+
+    def __init__(
+        self, settings: PianoDisplaySettings | None = None, fps: int = 60, queue_size: int = 8,
+        cache: SongCache | None = None
+    ) -> None:
+        """Initialises the renderer using SDL's dummy video driver."""
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        if not pygame.get_init():
+            pygame.init()
+
+        self.settings = settings or PianoDisplaySettings()
+        self.display = PianoDisplay(self.settings)
+        self.win = pygame.display.set_mode((self.display.width, self.display.height))
+        self.size = self.win.get_size()
+
+        self.fps = fps
+        self.queue_size = queue_size
+        self.cache = cache
+
+    def render(self, midi_path: str, output_path: str, audio_path: str | None = None) -> dict[str, float]:
+        """Renders the given MIDI file to the output path and returns throughput statistics.
+
+        The output type is chosen from the path: an existing directory or a path ending
+        in a separator produces a PNG sequence, a `.raw` or `.rgb` file stores raw RGB
+        frames, and any other path is encoded as a video by an `ffmpeg` subprocess.
+        Audio is rendered by the software synth, and included in encoded videos.
+
+        Parameters
+        ----------
+        midi_path : str
+            The path to the MIDI file to render.
+        output_path : str
+            The path to write the rendered frames to.
+        audio_path : str | None
+            The path to write the song's audio to as a WAV file, or None to render no audio.
+
+        Returns
+        -------
+        dict[str, float]
+            The number of frames rendered, the elapsed wall time, and the achieved
+            frames per second and speed relative to real time, along with the time
+            taken to render the audio if it was rendered.
+        """
+        # Renders the audio first so it can be passed to the encoder, delayed to match the song's starting buffer
+        audio_stats = None
+        if audio_path is not None:
+            audio_stats = SoftwareSynth().render_file(midi_path, audio_path, self.settings.note_time, self.cache)
+
+        clock = SimulatedClock()
+        song = Song(midi_path, mido.ports.BaseOutput(), self.settings, clock=clock, cache=self.cache)
+        frame_count = math.ceil(song.duration * self.fps) + 1
+        frame_time = 1 / self.fps
+
+        # Encodes frames on a separate thread, fed through a bounded queue
+        frames: queue.Queue[bytes | None] = queue.Queue(maxsize=self.queue_size)
+        writer = self._open_writer(output_path, audio_path)
+        errors: list[Exception] = []
+        encoder = threading.Thread(target=self._encode_frames, args=(frames, writer, errors), daemon=True)
+
+        start_time = time.perf_counter()
+        encoder.start()
+        song.start()
+        try:
+            for _ in range(frame_count):
+                if errors:
+                    break
+                song.update()
+                self.display.draw(self.win, song)
+                frames.put(pygame.image.tobytes(self.win, self.FRAME_FORMAT))
+                clock.tick(frame_time)
+        finally:
+            frames.put(None)
+            encoder.join()
+        elapsed = time.perf_counter() - start_time
+
+        if errors:
+            raise errors[0]
+
+        stats = {
+            "frames": frame_count,
+            "elapsed": elapsed,
+            "fps": frame_count / elapsed,
+            "realtime_factor": frame_count / self.fps / elapsed,
+        }
+        if audio_stats is not None:
+            stats["audio_elapsed"] = audio_stats["elapsed"]
+        return stats
+
+    def _open_writer(self, output_path: str, audio_path: str | None = None) -> FrameWriter:
+        """
+        Returns a function that writes a single frame to the given output, and a function to close it.
+        Encoded videos include the audio at the given path, cut to the length of the video.
+        """
+        if output_path.endswith(os.sep) or os.path.isdir(output_path):
+            os.makedirs(output_path, exist_ok=True)
+            frame_index = 0
+
+            def write_png(frame: bytes) -> None:
+                nonlocal frame_index
+                surface = pygame.image.frombytes(frame, self.size, self.FRAME_FORMAT)
+                pygame.image.save(surface, os.path.join(output_path, f"frame_{frame_index:06d}.png"))
+                frame_index += 1
+
+            return write_png, lambda: None
+
+        if output_path.lower().endswith((".raw", ".rgb")):
+            file = open(output_path, "wb")
+            return file.write, file.close
+
+        ffmpeg = shutil.which("ffmpeg")
+        if ffmpeg is None:
+            raise RuntimeError("Could not find 'ffmpeg' to encode video; use a directory or a .raw output instead.")
+        process = subprocess.Popen(self._ffmpeg_command(ffmpeg, output_path, audio_path), stdin=subprocess.PIPE)
+
+        def close_ffmpeg() -> None:
+            process.stdin.close()
+            if process.wait() != 0:
+                raise RuntimeError(f"ffmpeg exited with code {process.returncode}")
+
+        return process.stdin.write, close_ffmpeg
+
+    def _ffmpeg_command(self, ffmpeg: str, output_path: str, audio_path: str | None = None) -> list[str]:
+        """
+        Returns the command which encodes raw frames from its standard input to a video at the output path,
+        including the audio at the given path if there is one.
+        """
+        audio_arguments = ["-i", audio_path, "-shortest"] if audio_path is not None else []
+        return [
+            ffmpeg, "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "rgb24",
+            "-s", f"{self.size[0]}x{self.size[1]}", "-r", str(self.fps),
+            "-i", "-", *audio_arguments,
+
+            # Pads frames to an even size, since most encoders need it for their chroma subsampling
+            "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2",
+            "-pix_fmt", "yuv420p", output_path,
+        ]
+
+    @staticmethod
+    def _encode_frames(frames: queue.Queue, writer: FrameWriter, errors: list[Exception]) -> None:
+        """Writes frames from the queue until a `None` sentinel is received, then closes the output."""
+        write, close = writer
+        try:
+            while (frame := frames.get()) is not None:
+                write(frame)
+        except Exception as e:
+            errors.append(e)
+            # Drains the queue so the renderer is never blocked on a failed encoder
+            while frames.get() is not None:
+                pass
+
+        try:
+            close()
+        except Exception as e:
+            errors.append(e)
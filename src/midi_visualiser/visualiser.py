@@ -1,9 +1,28 @@
 import os
+import math
+import time
 import mido
 import pygame
-from .song import Song
+from typing import TYPE_CHECKING
+from concurrent.futures import Future, ThreadPoolExecutor
+from .song_pool import SongPool
+from .frame_pacer import FramePacer
+from .frame_stats import FrameStats
+from .performance_hud import PerformanceHud
 from .piano_display import PianoDisplay
 from .piano_display_settings import PianoDisplaySettings
+from .startup_profile import StartupProfile
+from .clock import Clock, FrameClock
+from .session_recorder import SessionRecorder
+
+if TYPE_CHECKING:
+    from pygame._sdl2.video import Window
+    from .song import Song
+    from .song_cache import SongCache
+    from .library_index import LibraryIndex
+    from .live_input import LiveInput
+    from .midi_input_listener import MidiInputListener
+    from .scripted_midi_input import ScriptedMidiInput
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -11,45 +30,187 @@ class Visualiser:
     """Manages the Pygame visualiser window and main application loop."""
 
     DEFAULT_SONGS_FOLDER = os.path.join(BASE_DIR, "songs")
+    SCRUB_SECONDS = 5.0
+    PRELOAD_RADIUS = 1
+    TARGET_FPS = 60
+
+    def __init__(
+        self, path: str | None, cache: 'SongCache | None' = None, trace_path: str | None = None, streaming: bool = False,
+        target_fps: float = TARGET_FPS, vsync: bool = False, frame_skipping: bool = True,
+        live_port: str | None = None, live_replay: str | None = None, library: 'LibraryIndex | None' = None,
+        renderer: str = "software", profile: StartupProfile | None = None, clock: Clock = time.perf_counter,
+        output: mido.ports.BaseOutput | None = None, threaded_output: bool = True, recorder: SessionRecorder | None = None
+    ):
+        """
+        Initialises the visualiser and loads the initial song(s). A target frame rate of zero leaves the
+        frame rate uncapped, and with `vsync` each frame waits for the display to refresh instead.
+
+        If `live_port` is given, notes played on the MIDI input port with that name (or the default
+        input port, if empty) are shown instead of songs. If `live_replay` is given, the MIDI file
+        at that path is replayed as if it were being played live.
+
+        If a library index is given, directories are searched recursively and files that can't be
+        loaded are skipped, using the index's catalogue of song metadata.
 
-    def __init__(self, path: str | None):
-        """Initialises the visualiser and loads the initial song(s)."""
-        # Creates Piano Display
+        The `renderer` is either "software", which blits only the changed regions of the display to
+        the window surface, or "texture", which composites the whole display from textures through an
+        SDL renderer every frame.
+
+        Startup is staged so the window appears as soon as possible: it is opened first, then the
+        display's surfaces are pre-rendered in the background while the MIDI output is opened and
+        the songs are found, and the first song is loaded in the background while the main loop runs.
+        Each stage is recorded in the given startup profile.
+
+        Songs and live input are timed by the given clock, and MIDI is sent to the given output
+        instead of the default output port if one is given. If `threaded_output` is False, songs send
+        their messages when updated each frame rather than from a scheduler thread, so their output
+        depends only on the clock. If a recorder is given, every frame of the session is recorded,
+        along with the MIDI it sent. While recording, songs send their messages when updated and the
+        clock is held at the start time of each frame, exactly as when the session is replayed, so
+        the replay can be checked against the recorded output. Messages may then be sent up to a
+        frame late, rather than at their exact times.
+        """
+        self.profile = profile or StartupProfile(enabled=False)
         self.settings = PianoDisplaySettings()
-        self.display = PianoDisplay(self.settings)
-        
-        # Mido sound output setup
-        self.sound_output = mido.open_output()
 
-        # Attempts to find and store all song filenames found at the given path
-        self.current_song_index = 0
-        self.song_files = self._get_song_files(path or Visualiser.DEFAULT_SONGS_FOLDER)
-        if len(self.song_files) == 0:
-            raise RuntimeError(f"No MIDI files found at the path: {path}")
-        self.song = self._load_song(self.song_files[self.current_song_index]) 
+        # Preprocessed song cache and library index, if enabled, and whether songs are streamed from their files instead
+        self.cache = cache
+        self.library = library
+        self.streaming = streaming
+        self.clock = FrameClock(clock) if recorder else clock
+        self.threaded_output = threaded_output and not recorder
+        self.recorder = recorder
+
+        self.song: 'Song | LiveInput | None' = None
+        self.song_files: list[str] = []
+        self._pending_song: Future | None = None
+        self.live_input: 'LiveInput | None' = None
+        self.live_source: 'MidiInputListener | ScriptedMidiInput | None' = None
+        self.window: 'Window | None' = None
+
+        # Opens the window before anything else, showing the background until the display is ready
+        self._open_window(renderer, vsync)
+        self.profile.mark("window")
+
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="display-loader") as executor:
+            # Pre-renders the display's static surfaces in the background
+            display_future = executor.submit(self._create_display)
+
+            # Mido sound output setup
+            self.sound_output = mido.open_output() if output is None else output
+            if self.recorder:
+                # Captures the messages sent while recording, imported here as it is rarely used
+                from .benchmark.captured_output import CapturedOutput
+                self.sound_output = CapturedOutput(self.sound_output)
+            self.profile.mark("midi output")
+
+            self.song_pool = SongPool(self._load_song)
+            if live_port is not None or live_replay is not None:
+                # Shows live input in place of songs
+                self._open_live_input(live_port, live_replay)
+                self.profile.mark("live input")
+            else:
+                # Attempts to find and store all song filenames found at the given path
+                self.song_files = Visualiser.get_song_files(path or Visualiser.DEFAULT_SONGS_FOLDER, library)
+                if len(self.song_files) == 0:
+                    raise RuntimeError(f"No MIDI files found at the path: {path}")
+                self.profile.mark("song files")
+                if self.recorder:
+                    self.recorder.begin(path, self.song_files, streaming, library is not None)
+
+                # Starts loading the initial song and its neighbours in the background
+                self._select_song(0)
+
+            self.display = display_future.result()
+            if self.window:
+                from .texture_display import TextureDisplay
+                self.texture_display = TextureDisplay(self.display, self.renderer)
+            self.profile.mark("display")
 
-        # Pygame initialisation and setup
+        # Paces frames to the target rate, only sleeping between them if presenting doesn't wait for the display
+        self.pacer = FramePacer(target_fps, sleep=not self.vsync, frame_skipping=frame_skipping)
+
+        # Frame timing instrumentation, with a full trace kept only if it will be written
+        self.trace_path = trace_path
+        self.stats = FrameStats(target_fps, trace=trace_path is not None)
+        self.hud = PerformanceHud(self.stats)
+        self.show_hud = False
+        
+        # Application state
+        self.running = False
+        self.profile.mark("frame setup")
+
+    def _open_window(self, renderer: str, vsync: bool):
+        """Opens the window with the chosen renderer, clears it to the background colour and sets its caption and icon."""
         if not pygame.get_init():
             pygame.init()
-        self.win = pygame.display.set_mode((self.display.width, self.display.height))
-        pygame.display.set_caption("Piano MIDI Visualiser")
+        if renderer == "texture":
+            self.win = None
+            self.window = self._create_renderer_window(vsync)
+            self.renderer.draw_color = pygame.Color(self.settings.background_colour)
+            self.renderer.clear()
+            self.renderer.present()
+        else:
+            self.win = self._create_window(vsync)
+            self.win.fill(self.settings.background_colour)
+            pygame.display.flip()
+
+        self._update_caption()
         try:
             icon_img = pygame.image.load(os.path.join(BASE_DIR, "imgs", "icon.png"))
-            pygame.display.set_icon(icon_img)
+            if self.window:
+                self.window.set_icon(icon_img)
+            else:
+                pygame.display.set_icon(icon_img)
         except pygame.error as e:
             print(f"Could not load window icon: {e}")
-        self.clock = pygame.time.Clock()
-        
-        # Application state
-        self.running = False
 
-    def _get_song_files(self, path: str) -> list[str]:
-        """Gets a list of MIDI song files from the given path."""
+        # Lets the window appear while the rest of startup runs
+        pygame.event.pump()
+
+    def _create_display(self) -> PianoDisplay:
+        """Creates the piano display, pre-rendering its static surfaces, and records how long it took."""
+        started = self.profile.clock()
+        display = PianoDisplay(self.settings)
+        self.profile.record("display surfaces", started)
+        return display
+
+    def _create_window(self, vsync: bool) -> pygame.Surface:
+        """Opens the window, synchronised with the display's refresh if requested and supported."""
+        size = PianoDisplay.window_size(self.settings)
+        self.vsync = False
+        if vsync:
+            try:
+                # Vsync requires a window drawn through a renderer, which SDL only creates for scaled windows
+                window = pygame.display.set_mode(size, pygame.SCALED, vsync=1)
+                self.vsync = True
+                return window
+            except pygame.error as e:
+                print(f"Could not enable vsync: {e}")
+        return pygame.display.set_mode(size)
+
+    def _create_renderer_window(self, vsync: bool) -> 'Window':
+        """Opens a window drawn to by an SDL renderer, imported here as it is only used by the texture renderer."""
+        from pygame._sdl2.video import Window, Renderer
+        width, height = PianoDisplay.window_size(self.settings)
+        window = Window("Piano MIDI Visualiser", size=(int(width), int(height)))
+        self.vsync = vsync
+        self.renderer = Renderer(window, vsync=vsync)
+        return window
+
+    @staticmethod
+    def get_song_files(path: str, library: 'LibraryIndex | None' = None) -> list[str]:
+        """
+        Gets a list of MIDI song files from the given path, which may be a single file or a directory.
+        Directories are searched recursively using the library index if one is given.
+        """
         # Handles erroneous paths
         if not path or not os.path.exists(path):
             raise FileNotFoundError(f"Could not find MIDI song files at the path: {path}")
 
-        if os.path.isdir(path):
+        if os.path.isdir(path) and library:
+            return Visualiser._index_song_files(path, library)
+        elif os.path.isdir(path):
             song_files = []
             for file in sorted(os.listdir(path)):
                 if file.lower().endswith(".mid"):
@@ -60,10 +221,39 @@ class Visualiser:
         
         return []
 
-    def _load_song(self, file_path: str, verbose: bool = True) -> Song | None:
+    @staticmethod
+    def _index_song_files(path: str, library: 'LibraryIndex') -> list[str]:
+        """Gets the MIDI song files in a directory tree from the library index, skipping files that can't be loaded."""
+        start = time.perf_counter()
+        song_files = library.scan(path)
+        elapsed = time.perf_counter() - start
+
+        invalid = [file for file in song_files if not library.metadata[file].valid]
+        print(f"Indexed {len(song_files)} MIDI files in {elapsed:.2f}s.")
+        for file in invalid:
+            print(f"Skipping MIDI file '{file}', which can't be loaded: {library.metadata[file].error}.")
+        return [file for file in song_files if file not in invalid]
+
+    def _open_live_input(self, live_port: str | None, live_replay: str | None) -> None:
+        """Opens live input from the given MIDI input port, or from a replayed file, imported here as it is rarely used."""
+        from .live_input import LiveInput
+        self.song = self.live_input = LiveInput(self.settings, self.clock)
+        if live_replay is not None:
+            from .scripted_midi_input import ScriptedMidiInput
+            self.live_source = ScriptedMidiInput(live_replay, self.live_input.receive, self.clock)
+        else:
+            from .midi_input_listener import MidiInputListener
+            self.live_source = MidiInputListener(mido.open_input(live_port or None), self.live_input.receive)
+
+    def _load_song(self, file_path: str, verbose: bool = True) -> 'Song | None':
         """Attempts to load a Song object from a given file path."""
+        from .song import Song
+        from .streaming_song import StreamingSong
         try:
-            song = Song(file_path, self.sound_output, self.settings)
+            song_type = StreamingSong if self.streaming else Song
+            song = song_type(
+                file_path, self.sound_output, self.settings, self.clock, cache=self.cache, threaded_output=self.threaded_output
+            )
             if verbose:
                 print(f"MIDI file '{file_path}' loaded successfully.")
             return song
@@ -76,59 +266,204 @@ class Visualiser:
         """Contains the main loop for the application."""
         self.running = True
         while self.running:
-            # Handles Pygame events
-            self._handle_events()
+            self.run_frame()
+            self.pacer.wait()
 
-            # Updates the current song, if one exists
-            if self.song:
-                self.song.update()
+        # Cleans up necessary resources
+        self._cleanup()
 
-            # Draws the current state to the Pygame window
-            self.display.draw(self.win, self.song)
-            pygame.display.update()
+    def run_frame(
+        self, events: list[pygame.event.Event] | None = None, load_song: bool | None = None, render: bool | None = None
+    ) -> None:
+        """Handles events, updates the current song and draws a single frame.
 
-            self.clock.tick(60)
+        Parameters
+        ----------
+        events : list[pygame.event.Event] | None
+            The events to handle, or None to handle the events in Pygame's queue.
+        load_song : bool | None
+            Whether to wait for the selected song to finish loading and switch to it, or to leave it
+            loading, or None to switch to it if it has finished loading.
+        render : bool | None
+            Whether to draw the frame, or None to let the frame pacer decide.
+        """
+        self.stats.start_frame()
+        frame_time = self.clock.start_frame() if self.recorder else self.clock()
 
-        # Cleans up necessary resources
-        self._cleanup()
+        # Handles Pygame events
+        if events is None:
+            events = pygame.event.get()
+        self._handle_events(events)
+        self.stats.mark("events")
+
+        # Switches to the selected song once it has finished loading
+        if load_song is None:
+            song_loaded = self._update_pending_song()
+        else:
+            song_loaded = load_song and self._update_pending_song(wait=True)
+
+        # Updates the current song, if one exists
+        if self.song:
+            self.song.update()
+        self.stats.mark("update")
+
+        # Draws the current state to the Pygame window, only updating the changed regions,
+        # unless the frame is skipped to catch up after frames that ran long
+        if render is None:
+            render = self.pacer.should_render()
+        if render:
+            pixels_pushed = self._draw_textures() if self.window else self._draw_surfaces()
+            if self.live_input:
+                self.live_input.frame_presented()
+            self._profile_frame()
+        else:
+            self.stats.skip_frame()
+            pixels_pushed = 0
+
+        # Records per-frame counters, only counting the visible notes when they are shown or traced
+        if self.show_hud or self.stats.trace:
+            self.stats.count("visible_notes", self.song.visible_note_count() if self.song else 0)
+        self.stats.count("pixels_pushed", pixels_pushed)
+
+        if self.recorder:
+            notes_pressed = self.song.notes_pressed if self.song else {}
+            output = SessionRecorder.hash_frame(self.sound_output.take(), notes_pressed)
+            self.recorder.record_frame(frame_time, events, song_loaded, render, output)
+
+    def _profile_frame(self):
+        """Records the first frame to be presented in the startup profile, finishing it once the first song is shown."""
+        if self.profile.finished:
+            return
+        self.profile.milestone("first frame")
+        if self._pending_song is None:
+            self.profile.milestone("first song shown")
+            self.profile.finish()
+
+    def _draw_surfaces(self) -> int:
+        """Draws and presents a frame by blitting the changed regions to the window, returning the pixels pushed."""
+        dirty_rects = self.display.draw(self.win, self.song)
+        if self.show_hud:
+            dirty_rects.append(self.hud.draw(self.win, self.song))
+        self.stats.mark("draw")
+
+        pygame.display.update(dirty_rects)
+        self.stats.mark("present")
+        return self.display.pixels_pushed
 
-    def _handle_events(self):
+    def _draw_textures(self) -> int:
+        """Draws and presents a frame by compositing textures with the renderer, returning the pixels pushed."""
+        self.texture_display.draw(self.song, self.hud.render(self.song) if self.show_hud else None)
+        self.stats.mark("draw")
+
+        self.texture_display.present()
+        self.stats.mark("present")
+        return self.texture_display.pixels_pushed
+
+    def _handle_events(self, events: list[pygame.event.Event]):
         """Processes all Pygame events for the application."""
-        for event in pygame.event.get():
+        for event in events:
             # Handles quitting the Pygame window
             if event.type == pygame.QUIT:
                 self.running = False
             # Stops song if the window is moved to prevent audio misalignment
-            elif event.type == pygame.WINDOWMOVED and self.song:
+            elif event.type == pygame.WINDOWMOVED and self.song and not self.live_input:
                 self.song.stop()
+            # Redraws the whole window when its contents may have been lost
+            elif event.type in (pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED, pygame.VIDEOEXPOSE):
+                self.display.invalidate()
             # Handles any key presses
             elif event.type == pygame.KEYDOWN:
                 self._handle_keypress(event.key)
     
     def _handle_keypress(self, key: int):
         """Handles all Pygame key press events."""
+        # Live input can only be cleared, as it can't be paused, scrubbed or switched
+        if self.live_input and key not in (pygame.K_q, pygame.K_r, pygame.K_h):
+            return
+
         # Quitting the game with 'Q'
         if key == pygame.K_q:
             self.running = False
         # Resetting the current song with 'R'
         elif key == pygame.K_r and self.song:
             self.song.reset()
+        # Toggling the performance HUD with 'H', redrawing the window to remove it
+        elif key == pygame.K_h:
+            self.show_hud = not self.show_hud
+            self.display.invalidate()
         # Playing/pausing the current song with space
         elif key == pygame.K_SPACE and self.song:
             self.song.toggle_playing()
+        # Scrubbing backwards and forwards through the current song with ',' and '.'
+        elif key in (pygame.K_COMMA, pygame.K_PERIOD) and self.song:
+            delta = Visualiser.SCRUB_SECONDS if key == pygame.K_PERIOD else -Visualiser.SCRUB_SECONDS
+            self.song.seek(self.song.time + delta)
+        # Jumping to a tenth of the way through the current song with the number keys, once its length is known
+        elif pygame.K_0 <= key <= pygame.K_9 and self.song and math.isfinite(self.song.duration):
+            self.song.seek(self.song.duration * (key - pygame.K_0) / 10)
         # Cycling through loaded songs with the arrow keys
         elif key in (pygame.K_LEFT, pygame.K_RIGHT):
-            # Stops the current song
-            if self.song:
-                self.song.stop()
-
-            # Loads the next song
             delta = 1 if key == pygame.K_RIGHT else -1
-            self.current_song_index = (self.current_song_index + delta) % len(self.song_files)
-            self.song = self._load_song(self.song_files[self.current_song_index]) 
+            self._select_song((self.current_song_index + delta) % len(self.song_files))
+
+    def _select_song(self, index: int):
+        """Switches to the song at the given index, preloading the songs around it."""
+        # Stops the current song
+        if self.song:
+            self.song.stop()
+        self.song = None
+
+        # Requests the new song from the pool, which is switched to in the same frame if it was preloaded
+        self.current_song_index = index
+        self._pending_song = self.song_pool.request(self.song_files[index])
+
+        # Preloads the neighbouring songs in the background
+        self.song_pool.preload([
+            self.song_files[(index + offset) % len(self.song_files)]
+            for offset in range(-Visualiser.PRELOAD_RADIUS, Visualiser.PRELOAD_RADIUS + 1) if offset
+        ])
+
+    def _update_pending_song(self, wait: bool = False) -> bool:
+        """Sets the current song once the selected song has finished loading, or waits for it to, returning whether it was set."""
+        if self._pending_song is None or not (wait or self._pending_song.done()):
+            return False
+
+        self.song = self._pending_song.result()
+        self._pending_song = None
+        if self.song:
+            self.song.reset()
+        self._update_caption()
+        return True
+
+    def _update_caption(self):
+        """Sets the window caption, including the current song's details if it has been indexed."""
+        caption = "Piano MIDI Visualiser"
+        metadata = self.library.metadata.get(self.song_files[self.current_song_index]) if self.library and self.song_files else None
+        if metadata:
+            minutes, seconds = divmod(round(metadata.duration), 60)
+            name = os.path.basename(self.song_files[self.current_song_index])
+            caption += f" - {name} ({minutes}:{seconds:02d}, {metadata.note_count} notes)"
+
+        # The caption is only set once the window has been created
+        if self.window:
+            self.window.title = caption
+        elif pygame.display.get_surface() is not None:
+            pygame.display.set_caption(caption)
 
     def _cleanup(self):
         """Ensures all resources are closed properly."""
+        # Stops the current song or live input first, so no other thread uses a closed port
+        if self.live_source:
+            self.live_source.close()
+        elif self.song:
+            self.song.stop()
+        self.song_pool.shutdown()
+        if self.trace_path:
+            self.stats.write_trace(self.trace_path)
+            print(f"Frame trace written to '{self.trace_path}'.")
+        if self.recorder:
+            self.recorder.save()
+            print(f"Session recorded to '{self.recorder.path}'.")
         if self.sound_output:
             self.sound_output.close()
         if pygame.get_init():
@@ -0,0 +1,48 @@
+import os
+import sys
+import pytest
+
+SONGS_DIRECTORY = os.path.join(os.path.dirname(__file__), "..", "src", "midi_visualiser", "songs")
+"""The directory of example songs packaged with the visualiser."""
+
+SONG_FILES = sorted(name for name in os.listdir(SONGS_DIRECTORY) if name.endswith(".mid"))
+"""The file names of the example songs."""
+
+@pytest.fixture(params=SONG_FILES)
+def song_path(request) -> str:
+    """The path to each of the example songs in turn."""
+    return os.path.join(SONGS_DIRECTORY, request.param)
+
+@pytest.fixture
+def short_song_path() -> str:
+    """The path to the shortest example song, for tests which render a whole song."""
+    return os.path.join(SONGS_DIRECTORY, "3_tetris.mid")
+
+FAKE_FFMPEG = '''#!{python}
+"""Stands in for ffmpeg, checking its input and writing an empty output, and failing like libx264 on odd frame sizes."""
+import sys
+
+arguments = sys.argv[1:]
+width, height = map(int, arguments[arguments.index("-s") + 1].split("x"))
+if "-vf" in arguments and arguments[arguments.index("-vf") + 1] == "pad=ceil(iw/2)*2:ceil(ih/2)*2":
+    width, height = width + width % 2, height + height % 2
+if "yuv420p" in arguments[arguments.index("-i") + 1:] and (width % 2 or height % 2):
+    sys.exit(f"height not divisible by 2 ({{width}}x{{height}})")
+
+frame_bytes = sys.stdin.buffer.read()
+if not frame_bytes or len(frame_bytes) % (int(arguments[arguments.index("-s") + 1].split("x")[0]) * 3):
+    sys.exit("incomplete frames")
+with open(arguments[-1], "w") as f:
+    f.write(" ".join(arguments))
+'''
+
+@pytest.fixture
+def fake_ffmpeg(tmp_path, monkeypatch) -> str:
+    """Puts a stand-in for ffmpeg first on the `PATH`, and returns its path."""
+    directory = tmp_path / "bin"
+    directory.mkdir()
+    path = directory / "ffmpeg"
+    path.write_text(FAKE_FFMPEG.format(python=sys.executable))
+    path.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{directory}{os.pathsep}{os.environ['PATH']}")
+    return str(path)
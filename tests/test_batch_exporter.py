@@ -0,0 +1,23 @@
+import os
+import shutil
+from midi_visualiser.batch_exporter import BatchExporter
+from midi_visualiser.library_index import LibraryIndex
+
+def test_default_format_exports_and_skips_up_to_date_songs(fake_ffmpeg, short_song_path, tmp_path):
+    library = tmp_path / "songs"
+    (library / "album").mkdir(parents=True)
+    shutil.copy(short_song_path, library / "album" / "song.mid")
+    output_directory = tmp_path / "output"
+    index = LibraryIndex(str(tmp_path / "library.json"), workers=1)
+
+    exporter = BatchExporter(str(output_directory), fps=2, workers=1)
+    assert exporter.format == "mp4"
+    stats = exporter.export(str(library), index)
+
+    assert (stats["exported"], stats["failed"]) == (1, 0)
+    assert os.path.exists(output_directory / "album" / "song.mp4")
+    assert not [name for name in os.listdir(output_directory / "album") if ".partial" in name]
+
+    # A second export finds the output recorded in the manifest and skips it
+    stats = BatchExporter(str(output_directory), fps=2, workers=1).export(str(library), index)
+    assert (stats["skipped"], stats["exported"]) == (1, 0)
@@ -0,0 +1,77 @@
+import pytest
+from midi_visualiser import frame_pacer
+from midi_visualiser.clock import SimulatedClock
+from midi_visualiser.frame_pacer import FramePacer
+
+class SleepingClock(SimulatedClock):
+    """A simulated clock which records each sleep, advancing the time instead of waiting."""
+
+    def __init__(self) -> None:
+        """Initialises the clock at zero, with no sleeps recorded."""
+        super().__init__()
+        self.sleeps: list[float] = []
+
+    def sleep(self, seconds: float) -> None:
+        """Records a sleep and advances the time by its length."""
+        self.sleeps.append(seconds)
+        self.tick(seconds)
+
+@pytest.fixture
+def clock(monkeypatch) -> SleepingClock:
+    """A simulated clock which the pacer sleeps on."""
+    clock = SleepingClock()
+    monkeypatch.setattr(frame_pacer.time, "sleep", clock.sleep)
+    return clock
+
+def _run(pacer: FramePacer, clock: SleepingClock, frame_costs: list[float]) -> list[bool]:
+    """Runs frames taking the given times in seconds to process, returning whether each was rendered."""
+    rendered = []
+    for cost in frame_costs:
+        rendered.append(pacer.should_render())
+        clock.tick(cost)
+        pacer.wait()
+    return rendered
+
+def _longest_skipped_run(rendered: list[bool]) -> int:
+    """Returns the most frames skipped in a row."""
+    longest = run = 0
+    for frame_rendered in rendered:
+        run = 0 if frame_rendered else run + 1
+        longest = max(longest, run)
+    return longest
+
+def test_light_frames_are_rendered_and_paced_to_the_target(clock):
+    pacer = FramePacer(60, clock=clock)
+    rendered = _run(pacer, clock, [0.005] * 120)
+
+    assert all(rendered)
+    assert clock() == pytest.approx(120 / 60, abs=1 / 60)
+    assert len(clock.sleeps) >= 119
+
+def test_at_most_three_frames_are_skipped_in_a_row(clock):
+    # A stall leaves the loop behind, and frames taking a whole frame time never catch up
+    pacer = FramePacer(60, clock=clock)
+    rendered = _run(pacer, clock, [0.005] * 10 + [0.045] + [1 / 60] * 20 + [0.005] * 30)
+
+    assert not all(rendered)
+    assert _longest_skipped_run(rendered) == FramePacer.MAX_SKIPPED_FRAMES
+    assert all(rendered[-10:])
+
+def test_no_frames_are_skipped_without_frame_skipping(clock):
+    pacer = FramePacer(60, frame_skipping=False, clock=clock)
+    assert all(_run(pacer, clock, [0.005] * 10 + [0.03] * 60))
+
+def test_zero_fps_is_uncapped(clock):
+    pacer = FramePacer(0, clock=clock)
+    rendered = _run(pacer, clock, [0.001] * 10 + [0.1] * 10)
+
+    assert pacer.frame_time == 0
+    assert all(rendered)
+    assert clock.sleeps == []
+
+def test_vsync_never_sleeps(clock):
+    pacer = FramePacer(60, sleep=False, clock=clock)
+    rendered = _run(pacer, clock, [0.001] * 60)
+
+    assert all(rendered)
+    assert clock.sleeps == []
@@ -0,0 +1,67 @@
+import os
+import shutil
+import pytest
+from midi_visualiser.library_index import LibraryIndex
+
+@pytest.fixture
+def library(tmp_path, short_song_path) -> str:
+    """A library of two songs, one in a subdirectory, and a file which isn't a MIDI file."""
+    root = tmp_path / "library"
+    (root / "album").mkdir(parents=True)
+    shutil.copy(short_song_path, root / "first.mid")
+    shutil.copy(short_song_path, root / "album" / "second.mid")
+    (root / "broken.mid").write_bytes(b"not a MIDI file")
+    return str(root)
+
+def _indexed_paths(monkeypatch) -> list[list[str]]:
+    """Records the names of the files indexed by each scan."""
+    scans = []
+    index_files = LibraryIndex._index
+    def record(index: LibraryIndex, paths: list[str]):
+        scans.append(sorted(os.path.basename(path) for path in paths))
+        return index_files(index, paths)
+    monkeypatch.setattr(LibraryIndex, "_index", record)
+    return scans
+
+def test_rescans_only_index_new_and_changed_files(library, tmp_path, monkeypatch):
+    catalogue = str(tmp_path / "library.json")
+    scans = _indexed_paths(monkeypatch)
+    first, second, broken = (os.path.join(library, name) for name in ("first.mid", "album/second.mid", "broken.mid"))
+
+    index = LibraryIndex(catalogue, workers=1)
+    assert index.scan(library) == [second, broken, first]
+    assert scans[-1] == ["broken.mid", "first.mid", "second.mid"]
+    assert index.metadata[first].valid and index.metadata[first].note_count > 0
+    assert not index.metadata[broken].valid and index.metadata[broken].error
+
+    # A new index loads the catalogue, so unchanged files, including the unloadable one, aren't read again
+    index = LibraryIndex(catalogue, workers=1)
+    index.scan(library)
+    assert scans[-1] == []
+    assert not index.metadata[broken].valid
+
+    # Files whose modification time or size has changed are indexed again
+    stat = os.stat(first)
+    os.utime(first, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    with open(broken, "ab") as f:
+        f.write(b"!")
+    index.scan(library)
+    assert scans[-1] == ["broken.mid", "first.mid"]
+    assert index.metadata[first].modified == os.stat(first).st_mtime_ns
+    assert index.metadata[broken].size == os.path.getsize(broken)
+
+    # Removed files are forgotten
+    os.remove(second)
+    assert index.scan(library) == [broken, first]
+    assert scans[-1] == []
+    assert second not in LibraryIndex(catalogue, workers=1).metadata
+
+def test_rescan_after_clearing_indexes_every_file(library, tmp_path, monkeypatch):
+    catalogue = str(tmp_path / "library.json")
+    scans = _indexed_paths(monkeypatch)
+    LibraryIndex(catalogue, workers=1).scan(library)
+
+    index = LibraryIndex(catalogue, workers=1)
+    index.clear()
+    index.scan(library)
+    assert scans[-1] == ["broken.mid", "first.mid", "second.mid"]
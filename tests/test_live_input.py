@@ -0,0 +1,62 @@
+import time
+import mido
+import numpy as np
+from midi_visualiser.clock import SimulatedClock
+from midi_visualiser.live_input import LiveInput
+from midi_visualiser.piano_display_settings import PianoDisplaySettings
+from midi_visualiser.scripted_midi_input import ScriptedMidiInput
+
+def _write_song(path: str) -> None:
+    """Writes a song where, at 120 bpm, C4 is held from 0s to 1s, E4 from 0.5s to 1.5s, and G4 from 1.5s onwards."""
+    track = mido.MidiTrack([
+        mido.Message("note_on", note=60, velocity=64, time=0),
+        mido.Message("note_on", note=64, velocity=64, time=480),
+        mido.Message("note_off", note=60, velocity=0, time=480),
+        mido.Message("note_on", note=64, velocity=0, time=480),
+        mido.Message("note_on", note=67, velocity=64, channel=2, time=0),
+    ])
+    mido.MidiFile(tracks=[track], ticks_per_beat=480).save(path)
+
+def _replay_until(clock: SimulatedClock, source: ScriptedMidiInput, received: list, end_time: float) -> None:
+    """Advances the clock in steps up to the given time, waiting at each step for the input to catch up."""
+    times = source.messages.times
+    while clock() < end_time:
+        clock.tick(0.25)
+        due = int(np.searchsorted(times, clock() - source.start_time, side='right'))
+        deadline = time.monotonic() + 5
+        while len(received) < due and time.monotonic() < deadline:
+            time.sleep(0.001)
+        assert len(received) == due
+
+def test_notes_are_paired_on_the_flipped_time_axis(tmp_path):
+    path = str(tmp_path / "song.mid")
+    _write_song(path)
+    clock = SimulatedClock()
+    settings = PianoDisplaySettings()
+    live_input = LiveInput(settings, clock)
+
+    received = []
+    def receive(message: mido.Message) -> None:
+        live_input.receive(message)
+        received.append(message)
+
+    source = ScriptedMidiInput(path, receive, clock)
+    try:
+        _replay_until(clock, source, received, 1.0)
+        live_input.update()
+        assert live_input.notes_pressed == {60: (0, False), 64: (0, True)}
+
+        _replay_until(clock, source, received, 2.0)
+        live_input.update()
+    finally:
+        source.close()
+
+    assert live_input.notes_pressed == {60: (0, False), 64: (0, False), 67: (2, True)}
+
+    # Display time runs backwards, with notes ending at the piano and starting above it
+    assert live_input.time == settings.note_time - 2.0
+    visible = live_input.visible(live_input.time, settings.note_time)
+    notes = sorted(zip(visible["key"].tolist(), visible["channel"].tolist(), visible["start"].tolist(), visible["end"].tolist()))
+    assert notes == [(39, 0, -1.0, 0.0), (43, 0, -1.5, -0.5), (46, 2, -2.0, -1.5)]
+    assert np.array_equal(visible["length"], visible["end"] - visible["start"])
+    assert live_input.dropped_events == 0
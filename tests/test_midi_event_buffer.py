@@ -0,0 +1,33 @@
+from midi_visualiser.midi_event_buffer import MidiEventBuffer
+
+def _push(buffer: MidiEventBuffer, notes: range) -> None:
+    """Pushes a note on event for each of the given notes, at times matching the notes."""
+    for note in notes:
+        buffer.push(float(note), 0x90, note, 64)
+
+def test_read_returns_events_in_order_across_the_wrap_around():
+    buffer = MidiEventBuffer(capacity=4)
+    _push(buffer, range(3))
+    assert buffer.read()["data1"].tolist() == [0, 1, 2]
+
+    # The next events wrap around to the start of the array
+    _push(buffer, range(3, 7))
+    events = buffer.read()
+    assert events["data1"].tolist() == [3, 4, 5, 6]
+    assert events["time"].tolist() == [3.0, 4.0, 5.0, 6.0]
+    assert len(buffer.read()) == 0
+    assert buffer.dropped_events == 0
+
+def test_read_drops_the_oldest_events_when_the_writer_laps_the_reader():
+    buffer = MidiEventBuffer(capacity=4)
+    _push(buffer, range(2))
+    buffer.read()
+
+    _push(buffer, range(2, 12))
+    assert buffer.read()["data1"].tolist() == [8, 9, 10, 11]
+    assert buffer.dropped_events == 6
+
+    # Reading carries on normally after an overflow
+    _push(buffer, range(12, 14))
+    assert buffer.read()["data1"].tolist() == [12, 13]
+    assert buffer.dropped_events == 6
@@ -0,0 +1,81 @@
+import mido
+import numpy as np
+import pytest
+from midi_visualiser.message_table import MessageTable
+from midi_visualiser.midi_file_parser import MidiFileParser
+from midi_visualiser.midi_file_stream import MidiFileStream
+from midi_visualiser.note_table import NoteTable, NOTE_DTYPE
+
+def _mido_messages(path: str) -> tuple[list[tuple[float, list[int]]], float]:
+    """Returns the time in seconds and raw bytes of each playable message read by Mido, and the time of the final event."""
+    rows = []
+    current_time = 0
+    for msg in mido.MidiFile(path, clip=True):
+        current_time += msg.time
+        if not msg.is_meta:
+            rows.append((current_time, msg.bytes()))
+    return rows, float(current_time)
+
+def _mido_notes(rows: list[tuple[float, list[int]]], duration: float) -> np.ndarray:
+    """
+    Pairs note messages one at a time to find every note, where a note lasts until the next
+    note on or off message for its key, or until the end of the song if there is none.
+    """
+    open_notes: dict[int, int] = {}
+    keys, channels, starts, lengths = [], [], [], []
+    for message_time, message_bytes in rows:
+        msg = mido.Message.from_bytes(message_bytes)
+        if not msg.type.startswith("note"):
+            continue
+
+        if msg.type == "note_on" and msg.velocity > 0:
+            # A note started again while playing ends the previous one
+            if (existing := open_notes.get(msg.note)) is not None:
+                lengths[existing] = message_time - starts[existing]
+            open_notes[msg.note] = len(keys)
+            keys.append(msg.note - 21)
+            channels.append(msg.channel)
+            starts.append(message_time)
+            lengths.append(0.0)
+        elif (note_to_end := open_notes.pop(msg.note, None)) is not None:
+            lengths[note_to_end] = message_time - starts[note_to_end]
+
+    for index in open_notes.values():
+        lengths[index] = duration - starts[index]
+
+    notes = np.empty(len(keys), dtype=NOTE_DTYPE)
+    notes["key"] = keys
+    notes["channel"] = channels
+    notes["start"] = starts
+    notes["length"] = lengths
+    notes["end"] = notes["start"] + notes["length"]
+    return notes
+
+@pytest.fixture
+def mido_song(song_path) -> tuple[str, list[tuple[float, list[int]]], float]:
+    """Each example song's path, along with its messages and duration as read by Mido."""
+    return song_path, *_mido_messages(song_path)
+
+def test_parser_matches_mido(mido_song):
+    path, rows, duration = mido_song
+    expected = MessageTable.from_bytes(rows, duration)
+    table = MidiFileParser(path).parse()
+
+    assert np.array_equal(table.messages, expected.messages)
+    assert np.array_equal(table.sysex_data, expected.sysex_data)
+    assert np.array_equal(table.sysex_offsets, expected.sysex_offsets)
+    assert table.duration == expected.duration
+
+def test_stream_matches_mido(mido_song):
+    path, rows, duration = mido_song
+    stream = MidiFileStream(path)
+
+    assert list(stream) == rows
+    assert stream.end_time == duration
+
+def test_notes_match_pairing_mido_messages(mido_song):
+    path, rows, duration = mido_song
+    notes = NoteTable.from_message_table(MidiFileParser(path).parse()).notes
+    expected = _mido_notes(rows, duration)
+
+    assert np.array_equal(notes, expected)
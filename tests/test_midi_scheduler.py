@@ -0,0 +1,36 @@
+import sys
+import mido
+from midi_visualiser.clock import SimulatedClock
+from midi_visualiser.piano_display_settings import PianoDisplaySettings
+from midi_visualiser.song import Song
+
+def _threaded_song(song_path: str) -> Song:
+    """Loads a song which sends its messages from a scheduler thread."""
+    return Song(song_path, mido.ports.BaseOutput(), PianoDisplaySettings(), SimulatedClock(), threaded_output=True)
+
+def test_switch_interval_is_restored_once_every_scheduler_stops(short_song_path):
+    previous_interval = sys.getswitchinterval()
+    first, second = _threaded_song(short_song_path), _threaded_song(short_song_path)
+
+    first.start()
+    second.start()
+    assert sys.getswitchinterval() == first.scheduler.SWITCH_INTERVAL
+
+    # Stays shortened while any scheduler is still running
+    first.stop()
+    assert sys.getswitchinterval() == first.scheduler.SWITCH_INTERVAL
+    second.stop()
+    assert sys.getswitchinterval() == previous_interval
+
+def test_switch_interval_is_restored_when_the_song_ends(short_song_path):
+    previous_interval = sys.getswitchinterval()
+    song = _threaded_song(short_song_path)
+    song.start()
+    song.update()
+
+    # The scheduler sends every message once they are all due, then finishes by itself
+    song.clock.tick(song.duration + 1)
+    song.scheduler._thread.join(timeout=5)
+    assert not song.scheduler.running
+    assert sys.getswitchinterval() == previous_interval
+    song.stop()
@@ -0,0 +1,53 @@
+import numpy as np
+from midi_visualiser.midi_file_parser import MidiFileParser
+from midi_visualiser.note_table import NOTE_DTYPE, NoteTable
+
+def _note_table(starts: list[float], lengths: list[float]) -> NoteTable:
+    """Returns a note table of notes with the given start times and lengths, sorted by start time."""
+    order = np.argsort(starts, kind='stable')
+    notes = np.zeros(len(starts), dtype=NOTE_DTYPE)
+    notes["key"] = np.arange(len(starts)) % 88
+    notes["start"] = np.asarray(starts, dtype=np.float64)[order]
+    notes["length"] = np.asarray(lengths, dtype=np.float64)[order]
+    notes["end"] = notes["start"] + notes["length"]
+    return NoteTable(notes)
+
+def _brute_force_visible(table: NoteTable, time: float, note_time: float) -> np.ndarray:
+    """Returns the visible notes by checking every note's interval."""
+    return table.notes[(table.starts <= time) & (table.ends >= time - note_time)]
+
+def test_visible_matches_brute_force_on_random_notes():
+    rng = np.random.default_rng(0)
+    starts = rng.uniform(0, 60, 5000).round(3)
+    lengths = np.concatenate((rng.exponential(0.3, 4990), rng.uniform(20, 60, 10))).round(3)
+    table = _note_table(starts.tolist(), lengths.tolist())
+
+    for time in np.linspace(-5, 130, 271).tolist():
+        for note_time in (0.5, 3.0):
+            assert np.array_equal(table.visible(time, note_time), _brute_force_visible(table, time, note_time))
+
+def test_visible_finds_notes_longer_than_most_length_classes():
+    # A single long note is far longer than every other note, and starts long before the window
+    table = _note_table([0.0, 50.0, 50.25, 50.5], [1000.0, 0.0, 0.125, 0.25])
+
+    visible = table.visible(400.0, 2.0)
+    assert visible["start"].tolist() == [0.0]
+    assert np.array_equal(table.visible(51.0, 2.0), _brute_force_visible(table, 51.0, 2.0))
+    assert len(table.visible(51.0, 2.0)) == 4
+
+def test_visible_includes_notes_exactly_on_the_window_edges():
+    # Notes that start exactly at the time, end exactly as they finish scrolling, or miss either edge
+    table = _note_table([10.0, 5.0, 4.0, 10.5, 6.0], [1.0, 1.0, 0.5, 0.5, 4.0])
+
+    visible = table.visible(10.0, 4.0)
+    assert visible["start"].tolist() == [5.0, 6.0, 10.0]
+    assert np.array_equal(visible, _brute_force_visible(table, 10.0, 4.0))
+
+def test_visible_returns_no_notes_from_an_empty_table():
+    table = _note_table([], [])
+    assert len(table.visible(1.0, 1.0)) == 0
+
+def test_visible_matches_brute_force_on_songs(song_path):
+    table = NoteTable.from_message_table(MidiFileParser(song_path).parse())
+    for time in np.linspace(0, table.ends.max() + 3, 200).tolist():
+        assert np.array_equal(table.visible(time, 3.0), _brute_force_visible(table, time, 3.0))
@@ -0,0 +1,40 @@
+from midi_visualiser.message_table import MessageTable
+from midi_visualiser.midi_file_parser import MidiFileParser
+from midi_visualiser.playback_state import PlaybackState
+
+def _encoded(state: PlaybackState) -> tuple:
+    """Returns a playback state's contents with its messages as bytes, in order, so states can be compared."""
+    return (
+        state.message_index,
+        list(state.notes_pressed.items()),
+        [(note, msg.bytes()) for note, msg in state.held_notes.items()],
+        [(key, msg.bytes()) for key, msg in state.channel_messages.items()],
+    )
+
+def test_from_message_table_matches_applying_every_message(song_path):
+    message_table = MidiFileParser(song_path).parse()
+    indices = list(range(0, len(message_table), 997)) + [len(message_table)]
+    states = PlaybackState.from_message_table(message_table, indices)
+
+    state = PlaybackState()
+    for index, computed in zip(indices, states):
+        for i in range(state.message_index, index):
+            state.apply(message_table.message(i))
+        state.message_index = index
+        assert _encoded(computed) == _encoded(state)
+
+def test_from_message_table_keeps_held_notes_in_the_order_first_pressed():
+    message_table = MessageTable.from_bytes([
+        (0.0, [0x90, 60, 64]),
+        (0.1, [0x90, 64, 64]),
+        (0.2, [0x90, 60, 80]),
+        (0.3, [0x90, 67, 64]),
+        (0.4, [0x80, 64, 0]),
+        (0.5, [0xC2, 5]),
+        (0.6, [0xB2, 7, 100]),
+    ], 0.6)
+    state = PlaybackState.from_message_table(message_table, [len(message_table)])[0]
+
+    assert state.notes_pressed == {60: (0, True), 64: (0, False), 67: (0, True)}
+    assert [(note, msg.velocity) for note, msg in state.held_notes.items()] == [(60, 80), (67, 64)]
+    assert list(state.channel_messages) == [(2, "program_change"), (2, "control_change", 7)]
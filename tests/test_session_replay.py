@@ -0,0 +1,62 @@
+import os
+import json
+import shutil
+import pygame
+from midi_visualiser.benchmark.captured_output import CapturedOutput
+from midi_visualiser.benchmark.session_replay import SessionReplay
+from midi_visualiser.session_recorder import SessionRecorder
+from midi_visualiser.visualiser import Visualiser
+
+class JitteryClock:
+    """A clock which advances by an uneven amount every time it is read, like a real clock during a frame."""
+
+    def __init__(self) -> None:
+        self.time = 100.0
+        self.reads = 0
+
+    def __call__(self) -> float:
+        self.reads += 1
+        self.time += 0.004 + 0.003 * (self.reads % 5)
+        return self.time
+
+def _record_session(song_directory: str, session_path: str) -> None:
+    """Records a short session which plays, seeks, pauses and switches songs."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    visualiser = Visualiser(
+        song_directory, clock=JitteryClock(), output=CapturedOutput(), recorder=SessionRecorder(session_path)
+    )
+    key_presses = {20: pygame.K_PERIOD, 60: pygame.K_SPACE, 80: pygame.K_SPACE, 120: pygame.K_RIGHT, 150: pygame.K_5}
+    try:
+        for frame in range(200):
+            events = [pygame.event.Event(pygame.KEYDOWN, key=key_presses[frame])] if frame in key_presses else []
+            visualiser.run_frame(events, load_song=frame % 10 == 0 or None)
+    finally:
+        visualiser._cleanup()
+
+def test_replay_matches_recorded_session(short_song_path, tmp_path):
+    song_directory = tmp_path / "songs"
+    song_directory.mkdir()
+    shutil.copy(short_song_path, song_directory / "a.mid")
+    shutil.copy(short_song_path, song_directory / "b.mid")
+    session_path = str(tmp_path / "session.json")
+    _record_session(str(song_directory), session_path)
+
+    replay = SessionReplay(session_path)
+    results = replay.run()
+    assert results["messages"] > 0
+    assert replay.first_mismatch(results["hashes"]) is None
+
+def test_replay_detects_output_differing_from_recording(short_song_path, tmp_path):
+    session_path = str(tmp_path / "session.json")
+    _record_session(short_song_path, session_path)
+
+    # Changes the output recorded for a frame partway through the session
+    with open(session_path) as f:
+        session = json.load(f)
+    session["frames"][50][4] = "0" * 16
+    with open(session_path, "w") as f:
+        json.dump(session, f)
+
+    replay = SessionReplay(session_path)
+    assert replay.first_mismatch(replay.run()["hashes"]) == 50
@@ -0,0 +1,58 @@
+import math
+import wave
+import numpy as np
+from midi_visualiser.midi_file_parser import MidiFileParser
+from midi_visualiser.note_table import NOTE_DTYPE, NoteTable
+from midi_visualiser.software_synth import SoftwareSynth
+
+def _note_table(notes: list[tuple[int, float, float]]) -> NoteTable:
+    """Returns a note table of the given notes as (key, start, length) tuples, on the first channel."""
+    table = np.zeros(len(notes), dtype=NOTE_DTYPE)
+    for i, (key, start, length) in enumerate(notes):
+        table[i] = (key, 0, start, length, start + length)
+    return NoteTable(table)
+
+def test_parallel_segments_match_rendering_in_one_process(short_song_path):
+    message_table = MidiFileParser(short_song_path).parse()
+    note_table = NoteTable.from_message_table(message_table)
+    velocities = message_table.data2[message_table.note_on]
+
+    single = SoftwareSynth(workers=1, segment_seconds=2.0).render(note_table, message_table.duration, velocities, 1.0)
+    parallel = SoftwareSynth(workers=2, segment_seconds=2.0).render(note_table, message_table.duration, velocities, 1.0)
+    assert len(single) == len(parallel)
+
+    # Notes crossing from one segment into the next must sound the same on either side of the boundary
+    segment_samples = 2 * 44100
+    for boundary in range(segment_samples, len(single), segment_samples):
+        window = slice(boundary - 2000, boundary + 2000)
+        np.testing.assert_allclose(parallel[window], single[window], atol=1e-5)
+    np.testing.assert_allclose(parallel, single, atol=1e-5)
+
+def test_audio_lasts_for_the_song_duration_and_start_delay():
+    synth = SoftwareSynth()
+    samples = synth.render(_note_table([(39, 0.0, 0.5), (43, 2.0, 1.0)]), 8.0, start_delay=1.0)
+
+    assert len(samples) == math.ceil(9.0 * synth.sample_rate)
+    assert np.abs(samples[:synth.sample_rate]).max() == 0
+    assert np.abs(samples).max() > 0
+
+def test_audio_continues_until_notes_at_the_end_fade_out():
+    synth = SoftwareSynth()
+    samples = synth.render(_note_table([(39, 3.5, 0.5)]), 4.0)
+
+    release_seconds = synth.RELEASE_TIME * -math.log(synth.SILENCE)
+    assert len(samples) == math.ceil(4.0 * synth.sample_rate) + math.ceil(release_seconds * synth.sample_rate) + 1
+    assert np.abs(samples[-100:]).max() < 0.01
+
+def test_render_file_writes_the_song_duration(short_song_path, tmp_path):
+    synth = SoftwareSynth()
+    output_path = str(tmp_path / "song.wav")
+    stats = synth.render_file(short_song_path, output_path, start_delay=2.0)
+
+    with wave.open(output_path, "rb") as f:
+        frame_count = f.getnframes()
+    assert stats["seconds"] == frame_count / synth.sample_rate
+
+    # The audio only runs past the end of the song while the final notes fade out
+    duration = MidiFileParser(short_song_path).parse().duration + 2.0
+    assert duration <= stats["seconds"] <= duration + synth.RELEASE_TIME * -math.log(synth.SILENCE) + 0.01
@@ -0,0 +1,67 @@
+import numpy as np
+from midi_visualiser.message_table import MessageTable
+from midi_visualiser.note_table import NOTE_DTYPE, NoteTable
+from midi_visualiser.song_analytics import SongAnalytics
+
+def _note_table(notes: list[tuple[int, int, float, float]]) -> NoteTable:
+    """Returns a note table of the given notes as (key, channel, start, end) tuples, sorted by start time."""
+    table = np.zeros(len(notes), dtype=NOTE_DTYPE)
+    for i, (key, channel, start, end) in enumerate(sorted(notes, key=lambda note: note[2])):
+        table[i] = (key, channel, start, end - start, end)
+    return NoteTable(table)
+
+def _message_table(notes: NoteTable, duration: float) -> MessageTable:
+    """Returns a message table with a note on and note off message for each note, in time order."""
+    keys, channels = notes.keys.tolist(), notes.channels.tolist()
+    events = [(start, [0x90 | channel, key + 21, 64]) for key, channel, start in zip(keys, channels, notes.starts.tolist())]
+    events += [(end, [0x80 | channel, key + 21, 0]) for key, channel, end in zip(keys, channels, notes.ends.tolist())]
+    return MessageTable.from_bytes(sorted(events, key=lambda event: event[0]), duration)
+
+def _brute_force_notes_on_screen(notes: NoteTable, note_time: float, resolution: float, bin_count: int) -> list[int]:
+    """Counts the notes on screen at the start of each span and at every time within it that a note appears or leaves."""
+    leaves = notes.ends + note_time
+    peaks = []
+    for i in range(bin_count):
+        start, end = i * resolution, (i + 1) * resolution
+        changes = np.concatenate((notes.starts, leaves))
+        times = [start] + [t for t in changes.tolist() if start <= t < end]
+        peaks.append(max(int(((notes.starts <= t) & (leaves >= t)).sum()) for t in times))
+    return peaks
+
+def _brute_force_polyphony(notes: NoteTable) -> int:
+    """Counts the notes sounding as each note starts, where notes stop sounding at their end times."""
+    return max((int(((notes.starts <= t) & (notes.ends > t)).sum()) for t in notes.starts.tolist()), default=0)
+
+def test_from_tables_matches_brute_force_counts_on_hand_built_notes():
+    # Includes chords, notes starting as others end, a long note, and notes ending on span edges
+    notes = _note_table([
+        (39, 0, 0.0, 1.0), (43, 0, 0.0, 1.0), (46, 0, 0.0, 0.5),
+        (39, 0, 1.0, 1.5), (60, 3, 1.0, 2.0), (50, 1, 1.25, 4.0), (51, 2, 2.0, 2.25),
+        (52, 2, 2.25, 2.5), (53, 2, 2.5, 3.5), (54, 9, 3.5, 3.75),
+    ])
+    messages = _message_table(notes, 4.0)
+    note_time, resolution = 1.0, 0.5
+    analytics = SongAnalytics.from_tables(messages, notes, note_time, resolution)
+
+    bin_count = len(analytics.notes_on_screen)
+    assert bin_count == 11
+    assert analytics.notes_on_screen.tolist() == _brute_force_notes_on_screen(notes, note_time, resolution, bin_count)
+    assert analytics.notes_on_screen.tolist() == [3, 3, 6, 6, 6, 6, 5, 4, 3, 3, 1]
+    assert analytics.peak_notes_on_screen == 6
+    assert analytics.peak_polyphony == _brute_force_polyphony(notes) == 3
+
+    assert analytics.messages_per_second.tolist() == [4, 6, 6, 3, 1]
+    assert analytics.channel_note_counts.tolist()[:10] == [4, 1, 3, 1, 0, 0, 0, 0, 0, 1]
+    assert analytics.channel_message_counts.sum() == 2 * len(notes)
+
+def test_from_tables_matches_brute_force_counts_on_random_notes():
+    rng = np.random.default_rng(0)
+    starts = rng.integers(0, 20 * 64, 300) / 64
+    ends = starts + rng.integers(0, 3 * 64, 300) / 64
+    notes = _note_table([(int(key), 0, start, end) for key, start, end in zip(rng.integers(0, 88, 300), starts, ends)])
+    messages = _message_table(notes, float(notes.ends.max()))
+    analytics = SongAnalytics.from_tables(messages, notes, 2.0, 0.25)
+
+    bin_count = len(analytics.notes_on_screen)
+    assert analytics.notes_on_screen.tolist() == _brute_force_notes_on_screen(notes, 2.0, 0.25, bin_count)
+    assert analytics.peak_polyphony == _brute_force_polyphony(notes)
@@ -0,0 +1,84 @@
+import os
+import shutil
+import mido
+import numpy as np
+from midi_visualiser.midi_file_parser import MidiFileParser
+from midi_visualiser.note_table import NoteTable
+from midi_visualiser.piano_display_settings import PianoDisplaySettings
+from midi_visualiser.song import Song
+from midi_visualiser.song_cache import SongCache
+
+def _tables(path: str):
+    """Parses a song into its message and note tables."""
+    message_table = MidiFileParser(path).parse()
+    return message_table, NoteTable.from_message_table(message_table)
+
+def _assert_tables_equal(loaded, expected) -> None:
+    """Checks that loaded message and note tables match the expected ones."""
+    (loaded_messages, loaded_notes), (messages, notes) = loaded, expected
+    assert np.array_equal(loaded_messages.messages, messages.messages)
+    assert np.array_equal(loaded_messages.sysex_data, messages.sysex_data)
+    assert np.array_equal(loaded_messages.sysex_offsets, messages.sysex_offsets)
+    assert loaded_messages.duration == messages.duration
+    assert np.array_equal(loaded_notes.notes, notes.notes)
+
+def test_store_and_load_round_trip(tmp_path, short_song_path):
+    cache = SongCache(str(tmp_path))
+    tables = _tables(short_song_path)
+    key = cache.key(short_song_path)
+
+    assert cache.load(key) is None
+    cache.store(key, *tables)
+    _assert_tables_equal(cache.load(key), tables)
+
+def test_key_changes_with_the_version_and_file_contents(tmp_path, short_song_path, monkeypatch):
+    cache = SongCache(str(tmp_path / "cache"))
+    song_path = str(tmp_path / "song.mid")
+    shutil.copyfile(short_song_path, song_path)
+    key = cache.key(song_path)
+    cache.store(key, *_tables(song_path))
+
+    # Changing the file's contents gives a new key with no entry
+    with open(song_path, "ab") as f:
+        f.write(b"\0")
+    assert cache.key(song_path) != key
+    assert cache.load(cache.key(song_path)) is None
+
+    # Changing the data format version does too
+    shutil.copyfile(short_song_path, song_path)
+    assert cache.key(song_path) == key
+    monkeypatch.setattr(SongCache, "VERSION", SongCache.VERSION + 1)
+    assert cache.key(song_path) != key
+    assert cache.load(cache.key(song_path)) is None
+
+def test_corrupt_entries_fall_back_to_parsing(tmp_path, short_song_path):
+    cache = SongCache(str(tmp_path))
+    key = cache.key(short_song_path)
+    cache.store(key, *_tables(short_song_path))
+
+    # Truncates the stored notes, as if writing them had been interrupted
+    notes_path = os.path.join(cache.directory, key, "notes.npy")
+    with open(notes_path, "r+b") as f:
+        f.truncate(os.path.getsize(notes_path) // 2)
+    assert cache.load(key) is None
+
+    # The song is parsed instead, and stored again for next time
+    song = Song(short_song_path, mido.ports.BaseOutput(), PianoDisplaySettings(), cache=cache)
+    _assert_tables_equal((song.message_table, song.note_table), _tables(short_song_path))
+    _assert_tables_equal(cache.load(key), _tables(short_song_path))
+
+def test_least_recently_used_entries_are_evicted(tmp_path, short_song_path):
+    tables = _tables(short_song_path)
+    cache = SongCache(str(tmp_path))
+    cache.store("a", *tables)
+    entry_size = cache._entry_size(os.path.join(cache.directory, "a"))
+    cache.max_size = 2 * entry_size
+
+    cache.store("b", *tables)
+    os.utime(os.path.join(cache.directory, "a"), (1, 1))
+    os.utime(os.path.join(cache.directory, "b"), (2, 2))
+
+    # Loading the oldest entry makes it the most recently used, so the other is evicted
+    assert cache.load("a") is not None
+    cache.store("c", *tables)
+    assert sorted(os.listdir(cache.directory)) == ["a", "c"]
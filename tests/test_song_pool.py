@@ -0,0 +1,26 @@
+from types import SimpleNamespace
+from midi_visualiser.song_pool import SongPool
+
+def test_failed_loads_are_retried_when_requested_again():
+    attempts = []
+
+    def loader(file_path: str):
+        attempts.append(file_path)
+        if len(attempts) == 1:
+            return None
+        if len(attempts) == 2:
+            raise OSError("file is busy")
+        return SimpleNamespace(nbytes=1)
+
+    pool = SongPool(loader, workers=1)
+    try:
+        assert pool.request("song.mid").result() is None
+        assert isinstance(pool.request("song.mid").exception(), OSError)
+        song = pool.request("song.mid").result()
+        assert song is not None
+
+        # Loaded songs are kept, so requesting them again doesn't load them again
+        assert pool.request("song.mid").result() is song
+        assert len(attempts) == 3
+    finally:
+        pool.shutdown()
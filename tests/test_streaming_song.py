@@ -0,0 +1,61 @@
+import time
+import pytest
+from midi_visualiser.benchmark.captured_output import CapturedOutput
+from midi_visualiser.clock import SimulatedClock
+from midi_visualiser.piano_display_settings import PianoDisplaySettings
+from midi_visualiser.song import Song
+from midi_visualiser.streaming_song import StreamingSong
+
+FRAME_TIME = 1 / 60
+
+def _wait_for_stream(song: StreamingSong) -> None:
+    """Waits until the stream has read well past the playhead, so no messages are missing when they are due."""
+    deadline = time.monotonic() + 5
+    while not song.stream.exhausted and song.stream.loaded_until < song.time + 1.0 and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+def _play(song: Song, output: CapturedOutput, clock: SimulatedClock, frames: int) -> list:
+    """Updates the song for a number of frames, returning the messages sent and keys pressed on each."""
+    results = []
+    for _ in range(frames):
+        clock.tick(FRAME_TIME)
+        if isinstance(song, StreamingSong):
+            _wait_for_stream(song)
+        song.update()
+        results.append((output.take(), dict(song.notes_pressed)))
+    return results
+
+def test_streaming_song_plays_like_a_loaded_song(short_song_path):
+    runs = []
+    for song_type in (Song, StreamingSong):
+        clock = SimulatedClock()
+        output = CapturedOutput()
+        song = song_type(short_song_path, output, PianoDisplaySettings(), clock)
+        song.start()
+        output.take()
+
+        # Plays from the start, then after seeking forwards and backwards
+        results = _play(song, output, clock, 600)
+        for target_time in (30.0, 5.0):
+            song.seek(target_time)
+            results.append((output.take(), dict(song.notes_pressed)))
+            results += _play(song, output, clock, 300)
+
+        # Plays from the start again after resetting
+        song.reset()
+        song.start()
+        results.append((output.take(), dict(song.notes_pressed)))
+        results += _play(song, output, clock, 300)
+        runs.append(results)
+        song.stop()
+
+    loaded, streamed = runs
+    assert sum(len(messages) for messages, _ in loaded) > 0
+    for frame, (expected, actual) in enumerate(zip(loaded, streamed)):
+        assert actual == expected, f"frame {frame} differs"
+
+def test_invalid_files_raise_when_loaded(tmp_path):
+    path = tmp_path / "invalid.mid"
+    path.write_bytes(b"not a MIDI file")
+    with pytest.raises(OSError):
+        StreamingSong(str(path), CapturedOutput(), PianoDisplaySettings())
@@ -0,0 +1,23 @@
+import os
+from midi_visualiser.video_renderer import VideoRenderer
+
+def test_default_window_size_is_odd():
+    # The default window is an odd number of pixels tall, so encoded videos must be padded
+    assert VideoRenderer().size[1] % 2 == 1
+
+def test_ffmpeg_command_pads_frames_to_an_even_size():
+    renderer = VideoRenderer(fps=30)
+    width, height = renderer.size
+    command = renderer._ffmpeg_command("ffmpeg", "out.mp4", "out.wav")
+
+    assert command[command.index("-s") + 1] == f"{width}x{height}"
+    assert command[command.index("-vf") + 1] == "pad=ceil(iw/2)*2:ceil(ih/2)*2"
+    assert command[-3:] == ["-pix_fmt", "yuv420p", "out.mp4"]
+    assert command[command.index("-shortest") - 1] == "out.wav"
+
+def test_render_encodes_default_size_video(fake_ffmpeg, short_song_path, tmp_path):
+    output_path = str(tmp_path / "out.mp4")
+    stats = VideoRenderer(fps=2).render(short_song_path, output_path)
+
+    assert stats["frames"] > 0
+    assert os.path.exists(output_path)